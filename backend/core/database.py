@@ -4,17 +4,126 @@ Supports PostgreSQL with SQLAlchemy for user management and application data
 """
 
 import logging
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, exc, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from typing import Generator
+from typing import Any, Dict, Generator, Optional
 from contextlib import contextmanager
 
 from backend.core.auto_esc_config import get_config_value
+from backend.core.pool_sizing import AdaptivePoolSizer
+
+# Try to import prometheus_client
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+if PROMETHEUS_AVAILABLE:
+    POOL_CHECKOUT_SECONDS = Histogram(
+        "sophia_db_pool_checkout_seconds",
+        "Time spent waiting for a pooled database connection",
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+    )
+    POOL_TIMEOUTS = Counter("sophia_db_pool_timeouts_total", "Connection checkouts that timed out")
+    POOL_CHECKED_OUT = Gauge("sophia_db_pool_checked_out", "Connections checked out")
+    POOL_LIMIT = Gauge("sophia_db_pool_limit", "Current pool_size + max_overflow")
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records checkout waits and timeouts
+    
+    With a sizer attached, the overflow allowance is adapted so that
+    pool_size + max_overflow follows the sizer's limit; overflow
+    connections beyond a lowered limit are closed as they are returned.
+    """
+    
+    sizer: Optional[AdaptivePoolSizer] = None
+    
+    def __init__(self, *args: Any, **kw: Any):
+        super().__init__(*args, **kw)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            if PROMETHEUS_AVAILABLE:
+                POOL_TIMEOUTS.inc()
+            if self.sizer:
+                self.sizer.record_timeout()
+                self._maybe_resize()
+            raise
+        
+        wait = time.perf_counter() - start
+        self.checkouts += 1
+        self.total_wait_ms += wait * 1000
+        self.max_wait_ms = max(self.max_wait_ms, wait * 1000)
+        checked_out = self.checkedout()
+        if PROMETHEUS_AVAILABLE:
+            POOL_CHECKOUT_SECONDS.observe(wait)
+            POOL_CHECKED_OUT.set(checked_out)
+        if self.sizer:
+            self.sizer.record_acquire(wait * 1000, checked_out)
+            self._maybe_resize()
+        return record
+    
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        if PROMETHEUS_AVAILABLE:
+            POOL_CHECKED_OUT.set(self.checkedout())
+    
+    def attach_sizer(self, sizer: AdaptivePoolSizer):
+        self.sizer = sizer
+        self._max_overflow = sizer.limit - self.size()
+        if PROMETHEUS_AVAILABLE:
+            POOL_LIMIT.set(sizer.limit)
+    
+    def _maybe_resize(self):
+        limit = self.sizer.maybe_resize()
+        if limit is None:
+            return
+        logger.info(
+            f"🔧 Database pool limit {self.size() + self._max_overflow} -> {limit} "
+            f"(p95 wait {self.sizer.last_p95_ms:.1f}ms)"
+        )
+        # QueuePool reads _max_overflow on every checkout, so this takes effect immediately
+        self._max_overflow = limit - self.size()
+        if PROMETHEUS_AVAILABLE:
+            POOL_LIMIT.set(limit)
+    
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        if self.sizer:
+            pool.attach_sizer(self.sizer)
+        return pool
+    
+    def describe(self) -> Dict[str, Any]:
+        """Pool occupancy, checkout waits and timeouts, for health output"""
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+            "max_wait_ms": self.max_wait_ms,
+            "adaptive": self.sizer.describe() if self.sizer else None
+        }
+
+
 # Database configuration
 DATABASE_URL = None
 engine = None
@@ -36,17 +145,31 @@ def init_database():
         # Construct database URL
         DATABASE_URL = f"postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
         
+        # Pool sizing; adaptive mode moves the overflow allowance within [0, db_max_overflow]
+        pool_size = int(get_config_value("db_pool_size", "20") or "20")
+        max_overflow = int(get_config_value("db_max_overflow", "30") or "30")
+        
         # Create engine with connection pooling
         engine = create_engine(
             DATABASE_URL,
-            poolclass=QueuePool,
-            pool_size=20,
-            max_overflow=30,
+            poolclass=InstrumentedQueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=float(get_config_value("db_pool_timeout", "30") or "30"),
             pool_pre_ping=True,
-            pool_recycle=3600,
+            pool_recycle=int(get_config_value("db_pool_recycle", "3600") or "3600"),
             echo=False  # Set to True for SQL debugging
         )
         
+        if str(get_config_value("db_pool_adaptive", "false")).lower() == "true":
+            engine.pool.attach_sizer(AdaptivePoolSizer(
+                pool_size,
+                pool_size + max_overflow,
+                interval=float(get_config_value("db_pool_adapt_interval", "10") or "10"),
+                grow_wait_ms=float(get_config_value("db_pool_grow_wait_ms", "50") or "50"),
+                shrink_wait_ms=float(get_config_value("db_pool_shrink_wait_ms", "5") or "5")
+            ))
+        
         # Create session factory
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         
@@ -122,14 +245,15 @@ def check_database_health() -> dict:
             init_database()
             
         with engine.connect() as conn:
-            result = conn.execute("SELECT 1")
+            result = conn.execute(text("SELECT 1"))
             result.fetchone()
             
         return {
             "status": "healthy",
             "database_url": DATABASE_URL.split("@")[1] if "@" in DATABASE_URL else "sqlite",
             "pool_size": engine.pool.size() if hasattr(engine.pool, 'size') else "N/A",
-            "checked_out": engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else "N/A"
+            "checked_out": engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else "N/A",
+            "pool": engine.pool.describe() if isinstance(engine.pool, InstrumentedQueuePool) else None
         }
         
     except Exception as e:
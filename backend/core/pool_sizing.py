@@ -0,0 +1,98 @@
+"""
+Adaptive connection pool sizing for Sophia AI
+Grows or shrinks a pool's connection limit within bounds from observed acquire waits
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class AdaptivePoolSizer:
+    """
+    Connection limit driven by how long callers wait to acquire
+
+    Every ``interval`` seconds the limit grows by a quarter (at least one
+    connection) when an acquire timed out or the p95 wait exceeded
+    ``grow_wait_ms``, and shrinks by the same step when the p95 wait stayed
+    under ``shrink_wait_ms`` and peak usage stayed under half the limit.
+    The limit never leaves ``[min_size, max_size]`` and never drops below
+    the observed peak. Safe to share between threads.
+    """
+
+    def __init__(self, min_size: int, max_size: int, initial: Optional[int] = None,
+                 interval: float = 10.0, grow_wait_ms: float = 50.0, shrink_wait_ms: float = 5.0,
+                 min_samples: int = 20):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.limit = self._clamp(self.max_size if initial is None else initial)
+        self.interval = interval
+        self.grow_wait_ms = grow_wait_ms
+        self.shrink_wait_ms = shrink_wait_ms
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._waits: "deque[float]" = deque(maxlen=4096)
+        self._peak_in_use = 0
+        self._timeouts = 0
+        self._window_start = time.monotonic()
+        self.grows = 0
+        self.shrinks = 0
+        self.last_p95_ms = 0.0
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(self.max_size, size))
+
+    def record_acquire(self, wait_ms: float, in_use: int):
+        with self._lock:
+            self._waits.append(wait_ms)
+            if in_use > self._peak_in_use:
+                self._peak_in_use = in_use
+
+    def record_timeout(self):
+        with self._lock:
+            self._timeouts += 1
+
+    def maybe_resize(self, now: Optional[float] = None) -> Optional[int]:
+        """Close the current window if it is due; return the new limit when it changed"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._window_start < self.interval:
+                return None
+
+            waits = sorted(self._waits)
+            p95 = waits[max(0, int(round(0.95 * len(waits))) - 1)] if waits else 0.0
+            step = max(1, self.limit // 4)
+            target = self.limit
+
+            if self._timeouts or (len(waits) >= self.min_samples and p95 > self.grow_wait_ms):
+                target = self._clamp(self.limit + step)
+            elif p95 <= self.shrink_wait_ms and self._peak_in_use * 2 < self.limit:
+                target = self._clamp(max(self.limit - step, self._peak_in_use))
+
+            self.last_p95_ms = p95
+            self._waits.clear()
+            self._peak_in_use = 0
+            self._timeouts = 0
+            self._window_start = now
+
+            if target == self.limit:
+                return None
+            if target > self.limit:
+                self.grows += 1
+            else:
+                self.shrinks += 1
+            self.limit = target
+            return target
+
+    def describe(self) -> Dict[str, Any]:
+        """Current limit and resize history, for stats output"""
+        return {
+            "limit": self.limit,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "grows": self.grows,
+            "shrinks": self.shrinks,
+            "last_p95_wait_ms": self.last_p95_ms
+        }
@@ -22,7 +22,7 @@ from backend.services.lambda_inference_service import LambdaInferenceService
 # Import MCP servers
 from mcp_servers.qdrant.qdrant_mcp_server import QdrantMCPServer
 from mcp_servers.mem0.mem0_orchestrator import Mem0OrchestratorMCPServer, MemoryContext
-from mcp_servers.redis.redis_cache_layer import RedisCacheMCPServer, CacheType
+from mcp_servers.redis.redis_cache_layer import RedisCacheMCPServer, CacheType, ComputeSource
 from mcp_servers.postgresql.structured_data_store import PostgreSQLMCPServer, DataSchema
 
 
@@ -76,6 +76,9 @@ class UnifiedMemoryService:
         self.redis = RedisCacheMCPServer()
         self.postgresql = PostgreSQLMCPServer()
         
+        # Queued Mem0 adds become searchable later than _handle_add returns
+        self.mem0.add_write_behind_listener(self._on_memory_written)
+        
         # Performance tracking
         self.stats = {
             "total_requests": 0,
@@ -180,9 +183,10 @@ class UnifiedMemoryService:
         tiers_used.append("mem0")
         self.stats["tier_usage"]["mem0"] += 1
         
-        # 4. Invalidate relevant caches (Tier 3)
+        # 4. Invalidate relevant caches (Tier 3); a queued Mem0 add invalidates
+        # again once written (_on_memory_written)
         cache_type = CacheType.CODING if request.memory_type == MemoryType.CODING else CacheType.BUSINESS
-        await self.redis.invalidate_pattern(cache_type, f"*{request.user_id}*")
+        await self.redis.invalidate_tags(cache_type, [self._user_tag(request.user_id)])
         tiers_used.append("redis")
         self.stats["tier_usage"]["redis"] += 1
         
@@ -208,65 +212,68 @@ class UnifiedMemoryService:
     
     async def _handle_search(self, request: MemoryRequest) -> MemoryResult:
         """Handle memory search with intelligent caching"""
-        # Check cache first (Tier 3)
+        # Check cache first (Tier 3); concurrent misses share one computation
         cache_key = self._generate_cache_key(request)
         cache_type = CacheType.CODING if request.memory_type == MemoryType.CODING else CacheType.BUSINESS
         
-        cached_result = await self.redis.get(cache_type, cache_key)
-        if cached_result:
+        async def compute_results() -> Dict[str, Any]:
+            # Generate embeddings for query (Tier 0)
+            query_embeddings = await self._generate_embeddings(request.content)
+            self.stats["tier_usage"]["gpu"] += 1
+            
+            # Search in Qdrant (Tier 1)
+            collection = "coding_memory" if request.memory_type == MemoryType.CODING else "business_memory"
+            qdrant_results = await self.qdrant.handle_call_tool(
+                "search",
+                {
+                    "collection_name": collection,
+                    "query_vector": query_embeddings.tolist(),
+                    "limit": request.limit,
+                    "filters": request.filters
+                }
+            )
+            self.stats["tier_usage"]["qdrant"] += 1
+            
+            # Enhance with Mem0 context (Tier 2)
+            context = MemoryContext.CODING if request.memory_type == MemoryType.CODING else MemoryContext.BUSINESS
+            mem0_results = await self.mem0.search_memories(
+                query=request.content,
+                context=context,
+                user_id=request.user_id,
+                filters=request.filters,
+                limit=request.limit
+            )
+            self.stats["tier_usage"]["mem0"] += 1
+            
+            # Combine results
+            return self._merge_search_results(
+                qdrant_results.get("results", []),
+                mem0_results
+            )
+        
+        # Cache the results (Tier 3)
+        combined_results, source = await self.redis.get_or_compute_with_source(
+            cache_type, cache_key, compute_results, ttl=300, tags=[self._user_tag(request.user_id)]
+        )
+        # Waiting on another request's computation is not a cache hit
+        if source in (ComputeSource.HIT, ComputeSource.STALE):
             self.stats["cache_hits"] += 1
             self.stats["tier_usage"]["redis"] += 1
             return MemoryResult(
                 success=True,
-                data=cached_result,
+                data=combined_results,
                 tier_used="redis",
                 processing_time_ms=1.0,
                 cache_hit=True
             )
         
-        # Generate embeddings for query (Tier 0)
-        query_embeddings = await self._generate_embeddings(request.content)
-        self.stats["tier_usage"]["gpu"] += 1
-        
-        # Search in Qdrant (Tier 1)
-        collection = "coding_memory" if request.memory_type == MemoryType.CODING else "business_memory"
-        qdrant_results = await self.qdrant.handle_call_tool(
-            "search",
-            {
-                "collection_name": collection,
-                "query_vector": query_embeddings.tolist(),
-                "limit": request.limit,
-                "filters": request.filters
-            }
-        )
-        self.stats["tier_usage"]["qdrant"] += 1
-        
-        # Enhance with Mem0 context (Tier 2)
-        context = MemoryContext.CODING if request.memory_type == MemoryType.CODING else MemoryContext.BUSINESS
-        mem0_results = await self.mem0.search_memories(
-            query=request.content,
-            context=context,
-            user_id=request.user_id,
-            filters=request.filters,
-            limit=request.limit
-        )
-        self.stats["tier_usage"]["mem0"] += 1
-        
-        # Combine results
-        combined_results = self._merge_search_results(
-            qdrant_results.get("results", []),
-            mem0_results
-        )
-        
-        # Cache the results (Tier 3)
-        await self.redis.set(cache_type, cache_key, combined_results, ttl=300)
-        
         # Add structured context if available (Tier 4)
         if request.memory_type == MemoryType.CODING and request.filters and "repository" in request.filters:
             patterns = await self.postgresql.get_repository_patterns(
-                repository_name=request.filters["repository"]
+                repository_name=request.filters["repository"],
+                limit=20
             )
-            combined_results["patterns"] = patterns
+            combined_results = {**combined_results, "patterns": patterns}
             self.stats["tier_usage"]["postgresql"] += 1
         
         return MemoryResult(
@@ -289,7 +296,7 @@ class UnifiedMemoryService:
         
         # Invalidate caches
         cache_type = CacheType.CODING if request.memory_type == MemoryType.CODING else CacheType.BUSINESS
-        await self.redis.invalidate_pattern(cache_type, f"*{request.user_id}*")
+        await self.redis.invalidate_tags(cache_type, [self._user_tag(request.user_id)])
         
         # Determine success based on mem0_result
         if mem0_result is not None and isinstance(mem0_result, dict):
@@ -326,7 +333,7 @@ class UnifiedMemoryService:
         
         # Invalidate caches
         cache_type = CacheType.CODING if request.memory_type == MemoryType.CODING else CacheType.BUSINESS
-        await self.redis.invalidate_pattern(cache_type, f"*{request.user_id}*")
+        await self.redis.invalidate_tags(cache_type, [self._user_tag(request.user_id)])
         
         # Determine success based on mem0_result
         if mem0_result is not None and isinstance(mem0_result, dict):
@@ -359,6 +366,16 @@ class UnifiedMemoryService:
         
         return embeddings
     
+    @staticmethod
+    def _user_tag(user_id: Optional[str]) -> str:
+        """Cache tag of a user's search results (no user is Mem0's default user)"""
+        return f"user:{user_id or 'default'}"
+    
+    async def _on_memory_written(self, context: MemoryContext, user_id: str):
+        """A write-behind add reached Mem0: drop searches cached while it was still queued"""
+        cache_type = CacheType.CODING if context == MemoryContext.CODING else CacheType.BUSINESS
+        await self.redis.invalidate_tags(cache_type, [self._user_tag(user_id)])
+    
     def _generate_cache_key(self, request: MemoryRequest) -> str:
         """Generate cache key for request"""
         import hashlib
@@ -4,9 +4,10 @@ Intelligent memory orchestration with clear separation between coding and busine
 """
 
 import asyncio
+import heapq
 import json
 import time
-from typing import Dict, List, Any, Optional, Union
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -17,6 +18,10 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from backend.core.auto_esc_config import get_config_value
+from mcp_servers.mem0.memory_executor import MemoryExecutor, MemoryExecutorFull
+from mcp_servers.mem0.semantic_cache import SemanticCache, normalize_query
+from mcp_servers.mem0.session_store import SessionStore
+from mcp_servers.mem0.write_behind import WriteBehindQueue
 
 # Try to import mem0
 try:
@@ -24,6 +29,7 @@ try:
     MEM0_AVAILABLE = True
 except ImportError:
     MEM0_AVAILABLE = False
+    Memory = None  # Only referenced in annotations without mem0
     print("⚠️  Mem0 not installed. Install with: pip install mem0ai")
 
 
@@ -73,8 +79,17 @@ class Mem0OrchestratorMCPServer:
         self.coding_memory: Optional[Memory] = None
         self.business_memory: Optional[Memory] = None
         
-        # Active sessions
+        # Active sessions, also indexed by (user_id, context) oldest first, with
+        # a min-heap of start times so cleanup only touches expired sessions
         self.sessions: Dict[str, MemorySession] = {}
+        self._sessions_by_key: Dict[Tuple[str, MemoryContext], Dict[str, MemorySession]] = {}
+        self._session_expiry: List[Tuple[datetime, str]] = []
+        
+        # Optional persistence: sessions are saved on creation, counter changes
+        # are flushed on cleanup and shutdown
+        self.session_store_path = get_config_value("mem0_session_store_path", "") or ""
+        self.session_store: Optional[SessionStore] = None
+        self._dirty_sessions: Set[str] = set()
         
         # Usage metrics
         self.metrics = {
@@ -86,9 +101,51 @@ class Mem0OrchestratorMCPServer:
         self.response_times: List[float] = []
         self.max_response_history = 1000
         
+        # Memory calls are synchronous (LLM extraction, vector writes), so each
+        # context runs them on its own bounded threads, reads apart from writes
+        self.executors: Dict[MemoryContext, MemoryExecutor] = {
+            context: self._create_executor(context)
+            for context in (MemoryContext.CODING, MemoryContext.BUSINESS)
+        }
+        
+        # Recent search results per context, matched by normalized query or query embedding
+        self.semantic_caches: Dict[MemoryContext, SemanticCache] = {
+            context: self._create_semantic_cache(context)
+            for context in (MemoryContext.CODING, MemoryContext.BUSINESS)
+        }
+        
+        # Hybrid search: both contexts are searched concurrently, each fetching
+        # overfetch x limit, and the lists are merged by reciprocal rank fusion
+        self.hybrid_overfetch = float(get_config_value("mem0_hybrid_overfetch", "2") or "2")
+        self.hybrid_rrf_k = int(get_config_value("mem0_hybrid_rrf_k", "60") or "60")
+        self.hybrid_context_timeout = float(get_config_value("mem0_hybrid_context_timeout", "5") or "5")
+        self.hybrid_stats = {"searches": 0, "partial": 0, "timeouts": {"coding": 0, "business": 0}}
+        
+        # Write-behind: adds are persisted locally, acknowledged with a provisional
+        # id and written to Mem0 by background workers
+        self.write_behind_enabled = str(get_config_value("mem0_write_behind", "false")).lower() == "true"
+        self.write_behind_path = get_config_value("mem0_write_behind_path", "mem0_write_behind.db") or "mem0_write_behind.db"
+        self.write_behind_workers = int(get_config_value("mem0_write_behind_workers", "2") or "2")
+        self.write_behind_batch_size = int(get_config_value("mem0_write_behind_batch", "20") or "20")
+        self.write_behind_max_attempts = int(get_config_value("mem0_write_behind_max_attempts", "5") or "5")
+        self.write_behind_retry_delay = float(get_config_value("mem0_write_behind_retry_delay", "1") or "1")
+        self.write_behind_poll_interval = float(get_config_value("mem0_write_behind_poll_interval", "1") or "1")
+        self.write_behind_retention = float(get_config_value("mem0_write_behind_retention", "86400") or "86400")
+        self.write_behind: Optional[WriteBehindQueue] = None
+        self._write_behind_tasks: List[asyncio.Task] = []
+        self._write_behind_wakeup: Optional[asyncio.Event] = None
+        self._write_behind_pruned_at = 0.0
+        
+        # Awaited with (context, user_id) once a queued add has landed in Mem0,
+        # so callers caching results derived from searches can invalidate them
+        self.write_behind_listeners: List[Callable[[MemoryContext, str], Awaitable[None]]] = []
+        
     async def initialize(self):
         """Initialize Mem0 orchestrator"""
         try:
+            if self.session_store_path:
+                await self._load_sessions()
+            
             if not MEM0_AVAILABLE:
                 print("❌ Mem0 not available, running in mock mode")
                 return
@@ -99,12 +156,61 @@ class Mem0OrchestratorMCPServer:
             # Initialize business memory (comprehensive, persistent)
             self.business_memory = self._create_business_memory()
             
+            if self.write_behind_enabled:
+                self._start_write_behind()
+            
             print(f"✅ Mem0 Orchestrator MCP Server initialized on port {self.port}")
             
         except Exception as e:
             print(f"❌ Failed to initialize Mem0 Orchestrator: {e}")
             raise
     
+    @staticmethod
+    def _context_setting(context: MemoryContext, key: str, default: str) -> str:
+        """mem0_<context>_<key>, falling back to the shared mem0_<key>"""
+        return get_config_value(f"mem0_{context.value}_{key}") or get_config_value(f"mem0_{key}", default) or default
+    
+    def _create_executor(self, context: MemoryContext) -> MemoryExecutor:
+        """Thread pools for one context"""
+        return MemoryExecutor(
+            context.value,
+            read_workers=int(self._context_setting(context, "read_workers", "4")),
+            write_workers=int(self._context_setting(context, "write_workers", "2")),
+            max_queue=int(self._context_setting(context, "executor_queue", "32")),
+            timeout=float(self._context_setting(context, "call_timeout", "30"))
+        )
+    
+    def _create_semantic_cache(self, context: MemoryContext) -> SemanticCache:
+        """Search result cache for one context"""
+        cache = SemanticCache(
+            context.value,
+            capacity=int(self._context_setting(context, "semantic_cache_size", "1024")),
+            threshold=float(self._context_setting(context, "semantic_cache_threshold", "0.97")),
+            ttl=float(self._context_setting(context, "semantic_cache_ttl", "300"))
+        )
+        cache.enabled = self._context_setting(context, "semantic_cache", "false").lower() == "true"
+        return cache
+    
+    @staticmethod
+    def _memory_context(context: MemoryContext) -> MemoryContext:
+        """Context whose memory serves a call; hybrid updates and deletes go to business memory"""
+        return MemoryContext.CODING if context == MemoryContext.CODING else MemoryContext.BUSINESS
+    
+    async def _run_memory_call(self, context: MemoryContext, lane: str, operation: str,
+                               fn, *args, **kwargs) -> Any:
+        """Run a blocking Memory method on the context's executor"""
+        return await self.executors[self._memory_context(context)].run(lane, operation, fn, *args, **kwargs)
+    
+    def _memory_written(self, context: MemoryContext, user_id: Optional[str]):
+        """Invalidate cached searches a successful write could change"""
+        self.semantic_caches[self._memory_context(context)].record_write(user_id)
+    
+    def _overload_response(self, error: Exception, context: MemoryContext, **extra: Any) -> Dict[str, Any]:
+        """Error payload for a shed or timed-out memory call"""
+        if isinstance(error, MemoryExecutorFull):
+            return {"status": "rejected", "error": str(error), "context": context.value, **extra}
+        return {"status": "timeout", "error": "Mem0 call timed out", "context": context.value, **extra}
+    
     def _create_coding_memory(self) -> Optional[Memory]:
         """Create memory instance optimized for coding context"""
         if not MEM0_AVAILABLE:
@@ -194,17 +300,102 @@ class Mem0OrchestratorMCPServer:
             metadata=metadata or {}
         )
         
-        self.sessions[session_id] = session
-        self.metrics[context].active_sessions += 1
+        # Session ids are per millisecond: a same-millisecond repeat replaces the earlier one
+        if session_id in self.sessions:
+            self._remove_session(session_id)
+        self._index_session(session)
+        
+        if self.session_store:
+            await asyncio.to_thread(self.session_store.save_many, [self._session_row(session)])
         
         return session_id
     
+    def _index_session(self, session: MemorySession):
+        self.sessions[session.session_id] = session
+        self._sessions_by_key.setdefault((session.user_id, session.context), {})[session.session_id] = session
+        heapq.heappush(self._session_expiry, (session.started_at, session.session_id))
+        self.metrics[session.context].active_sessions += 1
+    
+    def _remove_session(self, session_id: str) -> Optional[MemorySession]:
+        """Drop a session from the id and key indexes; its heap entry is skipped lazily"""
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        key = (session.user_id, session.context)
+        by_key = self._sessions_by_key.get(key)
+        if by_key is not None:
+            by_key.pop(session_id, None)
+            if not by_key:
+                del self._sessions_by_key[key]
+        self._dirty_sessions.discard(session_id)
+        self.metrics[session.context].active_sessions -= 1
+        return session
+    
+    def _find_session(self, user_id: str, context: MemoryContext) -> Optional[MemorySession]:
+        """The user's oldest active session in a context"""
+        by_key = self._sessions_by_key.get((user_id, context))
+        return next(iter(by_key.values())) if by_key else None
+    
+    @staticmethod
+    def _session_row(session: MemorySession) -> Dict[str, Any]:
+        return {
+            "session_id": session.session_id,
+            "context": session.context.value,
+            "user_id": session.user_id,
+            "started_at": session.started_at.isoformat(),
+            "memories_added": session.memories_added,
+            "memories_recalled": session.memories_recalled,
+            "metadata": session.metadata
+        }
+    
+    async def _load_sessions(self):
+        """Open the session store and restore its sessions"""
+        self.session_store = SessionStore(self.session_store_path)
+        rows = await asyncio.to_thread(self.session_store.load_all)
+        for row in rows:
+            self._index_session(MemorySession(
+                session_id=row["session_id"],
+                context=MemoryContext(row["context"]),
+                user_id=row["user_id"],
+                started_at=datetime.fromisoformat(row["started_at"]),
+                memories_added=row["memories_added"],
+                memories_recalled=row["memories_recalled"],
+                metadata=row["metadata"]
+            ))
+        if rows:
+            print(f"♻️  Restored {len(rows)} memory sessions from {self.session_store_path}")
+    
+    async def flush_sessions(self):
+        """Persist counter changes of sessions touched since the last flush"""
+        if not self.session_store or not self._dirty_sessions:
+            return
+        rows = [self._session_row(self.sessions[sid]) for sid in self._dirty_sessions if sid in self.sessions]
+        self._dirty_sessions.clear()
+        await asyncio.to_thread(self.session_store.save_many, rows)
+    
+    async def close(self):
+        """Stop write-behind, persist sessions and release the executor threads"""
+        await self.stop_write_behind()
+        await self.flush_sessions()
+        for executor in self.executors.values():
+            executor.shutdown(cancel_futures=True)
+        if self.session_store:
+            self.session_store.close()
+            self.session_store = None
+    
     async def add_memory(self,
                         content: str,
                         context: MemoryContext,
                         user_id: str,
-                        metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Add memory with intelligent context routing"""
+                        metadata: Optional[Dict[str, Any]] = None,
+                        write_behind: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Add memory with intelligent context routing
+        
+        With the write-behind queue enabled the memory is persisted locally and
+        acknowledged at once with a provisional id (status "queued"); pass
+        write_behind=False to wait for Mem0 instead.
+        """
         start_time = time.time()
         
         try:
@@ -217,31 +408,29 @@ class Mem0OrchestratorMCPServer:
                 # Mock mode or hybrid context
                 return self._mock_add_memory(content, context, user_id, metadata)
             
-            # Enrich metadata
-            enriched_metadata = {
-                "context": context.value,
-                "timestamp": datetime.utcnow().isoformat(),
-                "user_id": user_id,
-                **(metadata or {})
-            }
+            if self.write_behind and write_behind is not False:
+                entry = await asyncio.to_thread(
+                    self.write_behind.enqueue, context.value, user_id, content, metadata or {}
+                )
+                self._write_behind_wakeup.set()
+                self._note_memory_added(context, user_id)
+                
+                return {
+                    "status": "queued",
+                    "memory_id": entry["id"],
+                    "provisional": True,
+                    "duplicate": entry["duplicate"],
+                    "context": context.value,
+                    "processing_time_ms": (time.time() - start_time) * 1000
+                }
             
-            # Add to memory
-            result = memory.add(
-                content,
-                user_id=user_id,
-                metadata=enriched_metadata
-            )
+            result = await self._write_memory(memory, context, content, user_id, metadata)
             
             # Update metrics
             self.metrics[context].total_adds += 1
             self._track_response_time(time.time() - start_time)
-            
-            # Update session if exists
-            session_key = f"{context.value}_{user_id}"
-            for sid, session in self.sessions.items():
-                if session.user_id == user_id and session.context == context:
-                    session.memories_added += 1
-                    break
+            self._note_memory_added(context, user_id)
+            self._memory_written(context, user_id)
             
             return {
                 "status": "success",
@@ -250,6 +439,9 @@ class Mem0OrchestratorMCPServer:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
             
+        except (MemoryExecutorFull, asyncio.TimeoutError) as e:
+            print(f"⚠️  Mem0 {context.value} add shed: {str(e) or 'timed out'}")
+            return self._overload_response(e, context)
         except Exception as e:
             print(f"❌ Error adding memory: {e}")
             return {
@@ -258,6 +450,146 @@ class Mem0OrchestratorMCPServer:
                 "context": context.value
             }
     
+    async def _write_memory(self,
+                            memory: Memory,
+                            context: MemoryContext,
+                            content: str,
+                            user_id: str,
+                            metadata: Optional[Dict[str, Any]],
+                            timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Write one memory to Mem0 with enriched metadata"""
+        # Enrich metadata
+        enriched_metadata = {
+            "context": context.value,
+            "timestamp": (datetime.utcfromtimestamp(timestamp) if timestamp else datetime.utcnow()).isoformat(),
+            "user_id": user_id,
+            **(metadata or {})
+        }
+        
+        # Add to memory
+        return await self._run_memory_call(
+            context, "write", "add", memory.add,
+            content,
+            user_id=user_id,
+            metadata=enriched_metadata
+        )
+    
+    def _note_memory_added(self, context: MemoryContext, user_id: str):
+        """Count an add against the user's session in that context, if any"""
+        session = self._find_session(user_id, context)
+        if session:
+            session.memories_added += 1
+            self._dirty_sessions.add(session.session_id)
+    
+    def _start_write_behind(self):
+        """Open the write-behind queue and start its workers"""
+        self.write_behind = WriteBehindQueue(
+            self.write_behind_path,
+            max_attempts=self.write_behind_max_attempts,
+            retry_base_delay=self.write_behind_retry_delay
+        )
+        self._write_behind_wakeup = asyncio.Event()
+        self._write_behind_tasks = [
+            asyncio.create_task(self._write_behind_worker(worker_id))
+            for worker_id in range(self.write_behind_workers)
+        ]
+        print(f"✅ Mem0 write-behind queue at {self.write_behind_path} "
+              f"({self.write_behind_workers} workers, batches of {self.write_behind_batch_size})")
+    
+    async def stop_write_behind(self):
+        """Stop the workers; entries they had claimed are requeued when the queue reopens"""
+        for task in self._write_behind_tasks:
+            task.cancel()
+        await asyncio.gather(*self._write_behind_tasks, return_exceptions=True)
+        self._write_behind_tasks = []
+        if self.write_behind:
+            self.write_behind.close()
+            self.write_behind = None
+    
+    async def _write_behind_worker(self, worker_id: int):
+        """Drain due entries in batches until cancelled"""
+        queue = self.write_behind
+        while True:
+            try:
+                if worker_id == 0:
+                    await self._write_behind_housekeeping()
+                
+                batch = await asyncio.to_thread(queue.claim_batch, self.write_behind_batch_size)
+                if not batch:
+                    due_in = await asyncio.to_thread(queue.next_due_in)
+                    idle = self.write_behind_poll_interval if due_in is None else min(due_in, self.write_behind_poll_interval)
+                    self._write_behind_wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._write_behind_wakeup.wait(), idle)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                
+                completed: Dict[str, str] = {}
+                failed: Dict[str, str] = {}
+                written: Set[Tuple[MemoryContext, str]] = set()
+                try:
+                    for entry in batch:
+                        context = MemoryContext(entry["context"])
+                        memory = self.coding_memory if context == MemoryContext.CODING else self.business_memory
+                        try:
+                            if memory is None:
+                                raise RuntimeError(f"{context.value} memory not available")
+                            result = await self._write_memory(
+                                memory, context, entry["content"], entry["user_id"],
+                                entry["metadata"], entry["enqueued_at"]
+                            )
+                            completed[entry["id"]] = str(result.get("id", "unknown"))
+                            self.metrics[context].total_adds += 1
+                            self._memory_written(context, entry["user_id"])
+                            written.add((context, entry["user_id"]))
+                        except Exception as e:
+                            failed[entry["id"]] = str(e) or type(e).__name__
+                except asyncio.CancelledError:
+                    # Record what this batch already wrote so it is not replayed
+                    queue.finish_batch(completed, failed)
+                    raise
+                
+                await asyncio.to_thread(queue.finish_batch, completed, failed)
+                await self._notify_write_behind_listeners(written)
+                if failed:
+                    print(f"⚠️  Write-behind: {len(failed)} of {len(batch)} memories failed, will retry")
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Write-behind worker {worker_id} error: {e}")
+                await asyncio.sleep(self.write_behind_poll_interval)
+    
+    def add_write_behind_listener(self, listener: Callable[[MemoryContext, str], Awaitable[None]]):
+        """Call listener(context, user_id) after each batch for every user whose queued add was written"""
+        self.write_behind_listeners.append(listener)
+    
+    async def _notify_write_behind_listeners(self, written: Set[Tuple[MemoryContext, str]]):
+        for context, user_id in written:
+            for listener in self.write_behind_listeners:
+                try:
+                    await listener(context, user_id)
+                except Exception as e:
+                    print(f"⚠️  Write-behind listener failed for {context.value}/{user_id}: {e}")
+    
+    async def _write_behind_housekeeping(self):
+        """Refresh the lag and depth gauges; drop old done entries hourly"""
+        await asyncio.to_thread(self.write_behind.describe)
+        if time.time() - self._write_behind_pruned_at > 3600:
+            self._write_behind_pruned_at = time.time()
+            await asyncio.to_thread(self.write_behind.prune, self.write_behind_retention)
+    
+    async def get_memory_status(self, memory_id: str) -> Dict[str, Any]:
+        """Status of a write-behind add by its provisional id"""
+        if not self.write_behind:
+            return {"error": "Write-behind queue not enabled"}
+        
+        status = await asyncio.to_thread(self.write_behind.status, memory_id)
+        if status is None:
+            return {"error": "Memory not found"}
+        return status
+    
     async def search_memories(self,
                             query: str,
                             context: MemoryContext,
@@ -271,30 +603,20 @@ class Mem0OrchestratorMCPServer:
             results = []
             
             if context == MemoryContext.HYBRID:
-                # Search both contexts
-                if self.coding_memory:
-                    coding_results = await self._search_single_memory(
-                        self.coding_memory, query, user_id, limit // 2
-                    )
-                    results.extend([{**r, "context": "coding"} for r in coding_results])
-                    
-                if self.business_memory:
-                    business_results = await self._search_single_memory(
-                        self.business_memory, query, user_id, limit // 2
-                    )
-                    results.extend([{**r, "context": "business"} for r in business_results])
+                # Search both contexts at once; filters apply before the merge
+                results = await self._search_hybrid(query, user_id, filters, limit)
             else:
                 # Search specific context
                 memory = self.coding_memory if context == MemoryContext.CODING else self.business_memory
                 if memory:
-                    results = await self._search_single_memory(memory, query, user_id, limit)
+                    results = await self._search_single_memory(memory, context, query, user_id, limit)
                     results = [{**r, "context": context.value} for r in results]
                 else:
                     # Mock mode
                     results = self._mock_search_memories(query, context, limit)
             
             # Apply additional filters
-            if filters:
+            if filters and context != MemoryContext.HYBRID:
                 results = self._apply_filters(results, filters)
             
             # Update metrics
@@ -303,10 +625,10 @@ class Mem0OrchestratorMCPServer:
             
             # Update session if exists
             if user_id:
-                for sid, session in self.sessions.items():
-                    if session.user_id == user_id and session.context == context:
-                        session.memories_recalled += len(results)
-                        break
+                session = self._find_session(user_id, context)
+                if session:
+                    session.memories_recalled += len(results)
+                    self._dirty_sessions.add(session.session_id)
             
             return results
             
@@ -314,15 +636,98 @@ class Mem0OrchestratorMCPServer:
             print(f"❌ Error searching memories: {e}")
             return []
     
+    async def _search_hybrid(self,
+                             query: str,
+                             user_id: Optional[str],
+                             filters: Optional[Dict[str, Any]],
+                             limit: int) -> List[Dict[str, Any]]:
+        """
+        Top-limit results across coding and business memory
+        
+        Each context over-fetches so the merged top-limit survives filtering,
+        and has its own timeout: a context that does not answer in time is
+        left out and the other context's results are returned on their own.
+        """
+        sources = [
+            (ctx, memory)
+            for ctx, memory in ((MemoryContext.CODING, self.coding_memory),
+                                (MemoryContext.BUSINESS, self.business_memory))
+            if memory
+        ]
+        if not sources:
+            return []
+        
+        fetch = max(limit, int(limit * self.hybrid_overfetch + 0.5))
+        outcomes = await asyncio.gather(*(
+            asyncio.wait_for(
+                self._search_single_memory(memory, ctx, query, user_id, fetch),
+                self.hybrid_context_timeout
+            )
+            for ctx, memory in sources
+        ), return_exceptions=True)
+        
+        self.hybrid_stats["searches"] += 1
+        ranked_lists = []
+        for (ctx, _), outcome in zip(sources, outcomes):
+            if isinstance(outcome, asyncio.TimeoutError):
+                self.hybrid_stats["timeouts"][ctx.value] += 1
+                print(f"⚠️  Hybrid search: {ctx.value} memory timed out, returning partial results")
+                continue
+            if isinstance(outcome, BaseException):
+                print(f"⚠️  Hybrid search: {ctx.value} memory failed: {outcome}")
+                continue
+            ranked = [{**r, "context": ctx.value} for r in outcome]
+            if filters:
+                ranked = self._apply_filters(ranked, filters)
+            ranked_lists.append(ranked)
+        
+        if len(ranked_lists) < len(sources):
+            self.hybrid_stats["partial"] += 1
+        
+        return self._fuse_ranked(ranked_lists, limit)
+    
+    def _fuse_ranked(self, ranked_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+        """
+        Reciprocal rank fusion: a result scores sum(1 / (k + rank)) over the lists it appears in
+        
+        Raw scores from different collections and embedding models are not
+        comparable, ranks are. Ties go to the higher raw score.
+        """
+        fused: Dict[Any, Dict[str, Any]] = {}
+        for ranked in ranked_lists:
+            for rank, result in enumerate(ranked, start=1):
+                key = (result["context"], result.get("id")) if result.get("id") is not None else id(result)
+                entry = fused.setdefault(key, {**result, "fused_score": 0.0})
+                entry["fused_score"] += 1.0 / (self.hybrid_rrf_k + rank)
+        
+        merged = sorted(fused.values(), key=lambda r: (r["fused_score"], r.get("score") or 0.0), reverse=True)
+        return merged[:limit]
+    
     async def _search_single_memory(self, 
                                   memory: Memory,
+                                  context: MemoryContext,
                                   query: str,
                                   user_id: Optional[str],
                                   limit: int) -> List[Dict[str, Any]]:
-        """Search a single memory instance"""
+        """Search a single memory instance, through the context's semantic cache"""
+        cache = self.semantic_caches[self._memory_context(context)]
+        cached = cache.lookup(query, user_id, limit)
+        if cached is not None:
+            return cached
+        # Taken before searching, so a write that lands meanwhile keeps the result out of the cache
+        version = cache.version_token(user_id)
+        
+        vector = None
+        if cache.enabled:
+            vector = await self._embed_query(memory, context, normalize_query(query))
+            cached = cache.lookup_similar(vector, user_id, limit)
+            if cached is not None:
+                return cached
+        
         try:
             # Mem0 search
-            results = memory.search(
+            results = await self._run_memory_call(
+                context, "read", "search", memory.search,
                 query=query,
                 user_id=user_id,
                 limit=limit
@@ -339,12 +744,31 @@ class Mem0OrchestratorMCPServer:
                     "created_at": r.get("created_at")
                 })
             
+            cache.store(query, user_id, limit, formatted_results, version, vector)
             return formatted_results
             
+        except MemoryExecutorFull as e:
+            print(f"⚠️  Mem0 search shed: {e}")
+            return []
+        except asyncio.TimeoutError:
+            print(f"⚠️  Mem0 {context.value} search timed out")
+            return []
         except Exception as e:
             print(f"⚠️  Error in memory search: {e}")
             return []
     
+    async def _embed_query(self, memory: Memory, context: MemoryContext, text: str) -> Optional[Any]:
+        """Embed a normalized query with the memory's own embedding model, on the read lane"""
+        model = getattr(memory, "embedding_model", None)
+        if model is None:
+            return None
+        try:
+            return await self._run_memory_call(context, "read", "embed", model.embed, text, "search")
+        except Exception as e:
+            # Without an embedding the lookup is a miss and the search runs as usual
+            print(f"⚠️  Mem0 {context.value} query embedding failed: {e}")
+            return None
+    
     def _apply_filters(self, results: List[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Apply additional filters to search results"""
         filtered = []
@@ -383,13 +807,15 @@ class Mem0OrchestratorMCPServer:
             
             if memory:
                 # Mem0 update
-                result = memory.update(
+                result = await self._run_memory_call(
+                    context, "write", "update", memory.update,
                     memory_id=memory_id,
                     data=content,
                     user_id=user_id
                 )
                 
-                self.metrics[context].total_updates += 1
+                self.metrics[self._memory_context(context)].total_updates += 1
+                self._memory_written(context, user_id)
                 
                 return {
                     "status": "success",
@@ -402,6 +828,8 @@ class Mem0OrchestratorMCPServer:
                     "error": "Memory instance not available"
                 }
                 
+        except (MemoryExecutorFull, asyncio.TimeoutError) as e:
+            return self._overload_response(e, context, memory_id=memory_id)
         except Exception as e:
             return {
                 "status": "error",
@@ -418,9 +846,13 @@ class Mem0OrchestratorMCPServer:
             
             if memory:
                 # Mem0 delete
-                memory.delete(memory_id=memory_id, user_id=user_id)
+                await self._run_memory_call(
+                    context, "write", "delete", memory.delete,
+                    memory_id=memory_id, user_id=user_id
+                )
                 
-                self.metrics[context].total_deletes += 1
+                self.metrics[self._memory_context(context)].total_deletes += 1
+                self._memory_written(context, user_id)
                 
                 return {
                     "status": "success",
@@ -433,12 +865,29 @@ class Mem0OrchestratorMCPServer:
                     "error": "Memory instance not available"
                 }
                 
+        except (MemoryExecutorFull, asyncio.TimeoutError) as e:
+            return self._overload_response(e, context, memory_id=memory_id)
         except Exception as e:
             return {
                 "status": "error",
                 "error": str(e)
             }
     
+    async def tune_semantic_cache(self,
+                                  context: MemoryContext,
+                                  enabled: Optional[bool] = None,
+                                  ttl_seconds: Optional[float] = None,
+                                  threshold: Optional[float] = None) -> Dict[str, Any]:
+        """Adjust a context's semantic cache at runtime"""
+        if context not in self.semantic_caches:
+            return {"error": "Semantic caches are per context: use coding or business"}
+        cache = self.semantic_caches[context]
+        try:
+            cache.configure(enabled=enabled, ttl=ttl_seconds, threshold=threshold)
+        except ValueError as e:
+            return {"error": str(e)}
+        return cache.describe()
+    
     async def get_session_stats(self, session_id: str) -> Dict[str, Any]:
         """Get statistics for a session"""
         if session_id not in self.sessions:
@@ -462,13 +911,18 @@ class Mem0OrchestratorMCPServer:
         cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
         sessions_to_remove = []
         
-        for session_id, session in self.sessions.items():
-            if session.started_at < cutoff_time:
-                sessions_to_remove.append(session_id)
-                self.metrics[session.context].active_sessions -= 1
+        # Oldest first off the heap; entries for replaced sessions are stale
+        while self._session_expiry and self._session_expiry[0][0] < cutoff_time:
+            started_at, session_id = heapq.heappop(self._session_expiry)
+            session = self.sessions.get(session_id)
+            if session is None or session.started_at != started_at:
+                continue
+            self._remove_session(session_id)
+            sessions_to_remove.append(session_id)
         
-        for session_id in sessions_to_remove:
-            del self.sessions[session_id]
+        if self.session_store:
+            await asyncio.to_thread(self.session_store.delete_many, sessions_to_remove)
+            await self.flush_sessions()
         
         return {
             "sessions_removed": len(sessions_to_remove),
@@ -539,7 +993,23 @@ class Mem0OrchestratorMCPServer:
                 }
             },
             "avg_response_time_ms": avg_response_time,
+            "executors": {
+                context.value: executor.describe()
+                for context, executor in self.executors.items()
+            },
+            "write_behind": await asyncio.to_thread(self.write_behind.describe) if self.write_behind else None,
+            "semantic_cache": {
+                context.value: cache.describe()
+                for context, cache in self.semantic_caches.items()
+            },
+            "hybrid_search": {
+                **self.hybrid_stats,
+                "overfetch": self.hybrid_overfetch,
+                "rrf_k": self.hybrid_rrf_k,
+                "context_timeout_s": self.hybrid_context_timeout
+            },
             "total_active_sessions": len(self.sessions),
+            "session_store": self.session_store_path or None,
             "mem0_available": MEM0_AVAILABLE
         }
     
@@ -574,8 +1044,12 @@ class Mem0OrchestratorMCPServer:
             context = MemoryContext(arguments.get("context", "coding"))
             user_id = arguments.get("user_id", "default")
             metadata = arguments.get("metadata", {})
+            write_behind = arguments.get("write_behind")
             
-            return await self.add_memory(content, context, user_id, metadata)
+            return await self.add_memory(content, context, user_id, metadata, write_behind)
+            
+        elif name == "get_memory_status":
+            return await self.get_memory_status(arguments.get("memory_id", ""))
             
         elif name == "search_memories":
             query = arguments.get("query", "")
@@ -587,6 +1061,15 @@ class Mem0OrchestratorMCPServer:
             results = await self.search_memories(query, context, user_id, filters, limit)
             return {"results": results, "count": len(results)}
             
+        elif name == "tune_semantic_cache":
+            context = MemoryContext(arguments.get("context", "coding"))
+            return await self.tune_semantic_cache(
+                context,
+                enabled=arguments.get("enabled"),
+                ttl_seconds=arguments.get("ttl_seconds"),
+                threshold=arguments.get("threshold")
+            )
+            
         elif name == "create_session":
             user_id = arguments.get("user_id", "default")
             context = MemoryContext(arguments.get("context", "coding"))
@@ -621,11 +1104,26 @@ class Mem0OrchestratorMCPServer:
                             "description": "Memory context"
                         },
                         "user_id": {"type": "string", "description": "User identifier"},
-                        "metadata": {"type": "object", "description": "Additional metadata"}
+                        "metadata": {"type": "object", "description": "Additional metadata"},
+                        "write_behind": {
+                            "type": "boolean",
+                            "description": "Queue the write and acknowledge at once (default: server setting)"
+                        }
                     },
                     "required": ["content", "context"]
                 }
             },
+            {
+                "name": "get_memory_status",
+                "description": "Get the status of a queued (write-behind) memory by its provisional id",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "memory_id": {"type": "string", "description": "Provisional memory id"}
+                    },
+                    "required": ["memory_id"]
+                }
+            },
             {
                 "name": "search_memories",
                 "description": "Search memories with context awareness",
@@ -645,6 +1143,27 @@ class Mem0OrchestratorMCPServer:
                     "required": ["query", "context"]
                 }
             },
+            {
+                "name": "tune_semantic_cache",
+                "description": "Tune a context's semantic search cache (similarity threshold, TTL, on/off)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "context": {
+                            "type": "string",
+                            "enum": ["coding", "business"],
+                            "description": "Memory context"
+                        },
+                        "enabled": {"type": "boolean", "description": "Turn the cache on or off"},
+                        "ttl_seconds": {"type": "number", "description": "Maximum age of cached results"},
+                        "threshold": {
+                            "type": "number",
+                            "description": "Minimum cosine similarity between query embeddings for a hit"
+                        }
+                    },
+                    "required": ["context"]
+                }
+            },
             {
                 "name": "create_session",
                 "description": "Create a new memory session",
@@ -699,8 +1218,10 @@ async def main():
             await asyncio.sleep(3600)  # Cleanup every hour
             stats = await server.cleanup_old_sessions()
             print(f"🧹 Session cleanup: {stats}")
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n👋 Shutting down Mem0 Orchestrator")
+    finally:
+        await server.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""
+Bounded executors for Mem0 calls
+Runs the synchronous Memory API on worker threads with per-call timeouts and load shedding
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Try to import prometheus_client
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+if PROMETHEUS_AVAILABLE:
+    EXECUTOR_QUEUED = Gauge(
+        "sophia_mem0_executor_queue_depth",
+        "Mem0 calls waiting for a worker thread",
+        ["context", "lane"]
+    )
+    EXECUTOR_RUNNING = Gauge(
+        "sophia_mem0_executor_running",
+        "Mem0 calls running on a worker thread",
+        ["context", "lane"]
+    )
+    EXECUTOR_REJECTED = Counter(
+        "sophia_mem0_executor_rejected_total",
+        "Mem0 calls shed because the executor queue was full",
+        ["context", "lane"]
+    )
+    EXECUTOR_TIMEOUTS = Counter(
+        "sophia_mem0_executor_timeouts_total",
+        "Mem0 calls that outlived their timeout",
+        ["context", "lane"]
+    )
+    MEM0_CALL_SECONDS = Histogram(
+        "sophia_mem0_call_seconds",
+        "Time Mem0 calls spend on a worker thread",
+        ["context", "operation"],
+        buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    )
+
+
+class MemoryExecutorFull(RuntimeError):
+    """Raised when an executor lane has no room for another call"""
+
+
+class _Lane:
+    """One thread pool and its admission counters"""
+
+    def __init__(self, context: str, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"mem0-{context}-{name}")
+
+        self.queued = 0
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.busy_ms = 0.0
+
+
+class MemoryExecutor:
+    """
+    Worker threads for one memory context, with separate read and write lanes
+
+    ``Memory.add`` runs LLM fact extraction and can take seconds, so writes
+    get their own threads and never occupy the ones searches run on. A lane
+    admits at most ``workers + max_queue`` calls; beyond that ``run`` raises
+    MemoryExecutorFull immediately rather than queueing. A call past its
+    timeout raises asyncio.TimeoutError: if it had not started it is
+    cancelled, otherwise it keeps its thread (and its admission slot)
+    until Mem0 returns.
+    """
+
+    LANES = ("read", "write")
+
+    def __init__(self, context: str, read_workers: int = 4, write_workers: int = 2,
+                 max_queue: int = 32, timeout: Optional[float] = 30.0):
+        self.context = context
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._lanes = {
+            "read": _Lane(context, "read", read_workers, max_queue),
+            "write": _Lane(context, "write", write_workers, max_queue)
+        }
+
+    async def run(self, lane: str, operation: str, fn: Callable[..., Any], *args: Any,
+                  timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) on the lane's threads and await its result"""
+        state = self._lanes[lane]
+        with self._lock:
+            admitted = state.queued + state.running < state.workers + state.max_queue
+            if admitted:
+                state.queued += 1
+                state.submitted += 1
+            else:
+                state.rejected += 1
+        if not admitted:
+            if PROMETHEUS_AVAILABLE:
+                EXECUTOR_REJECTED.labels(self.context, lane).inc()
+            raise MemoryExecutorFull(
+                f"Mem0 {self.context} {lane} executor is full "
+                f"({state.workers} workers, {state.max_queue} queued)"
+            )
+        self._update_gauges(state)
+
+        future = state.pool.submit(self._call, state, operation, fn, args, kwargs)
+        future.add_done_callback(lambda f: self._dequeue_cancelled(state, f))
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # Cancelling the wrapper on timeout also cancels the call if it has not started
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                state.timeouts += 1
+            if PROMETHEUS_AVAILABLE:
+                EXECUTOR_TIMEOUTS.labels(self.context, lane).inc()
+            raise
+
+    def _call(self, state: _Lane, operation: str, fn: Callable[..., Any],
+              args: tuple, kwargs: Dict[str, Any]) -> Any:
+        with self._lock:
+            state.queued -= 1
+            state.running += 1
+        self._update_gauges(state)
+
+        start = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                state.running -= 1
+                state.completed += 1
+                state.errors += failed
+                state.busy_ms += elapsed * 1000
+            if PROMETHEUS_AVAILABLE:
+                MEM0_CALL_SECONDS.labels(self.context, operation).observe(elapsed)
+            self._update_gauges(state)
+
+    def _dequeue_cancelled(self, state: _Lane, future: Future):
+        # Calls cancelled before a thread picked them up never reach _call
+        if future.cancelled():
+            with self._lock:
+                state.queued -= 1
+            self._update_gauges(state)
+
+    def _update_gauges(self, state: _Lane):
+        if PROMETHEUS_AVAILABLE:
+            EXECUTOR_QUEUED.labels(self.context, state.name).set(state.queued)
+            EXECUTOR_RUNNING.labels(self.context, state.name).set(state.running)
+
+    def shutdown(self, wait: bool = False, cancel_futures: bool = True):
+        """Stop both lanes; by default queued calls are cancelled and running ones are not awaited"""
+        for state in self._lanes.values():
+            state.pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def describe(self) -> Dict[str, Any]:
+        """Per-lane occupancy, shedding and timeouts, for stats output"""
+        with self._lock:
+            return {
+                name: {
+                    "workers": state.workers,
+                    "max_queue": state.max_queue,
+                    "queued": state.queued,
+                    "running": state.running,
+                    "submitted": state.submitted,
+                    "completed": state.completed,
+                    "errors": state.errors,
+                    "rejected": state.rejected,
+                    "timeouts": state.timeouts,
+                    "avg_call_ms": state.busy_ms / state.completed if state.completed else 0.0
+                }
+                for name, state in self._lanes.items()
+            }
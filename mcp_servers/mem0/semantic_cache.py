@@ -0,0 +1,275 @@
+"""
+Semantic search result cache for the Mem0 orchestrator
+Serves repeated and near-duplicate queries from recent results, keyed by query embedding
+"""
+
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case-, width- and punctuation-insensitive form of a query"""
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+class VectorIndex:
+    """
+    Approximate cosine index over a fixed number of slots
+
+    Random-hyperplane LSH: each table hashes a unit vector to the signs of
+    ``bits`` projections, and a query is compared exactly only with the
+    slots sharing a bucket in some table. Two vectors at cosine 0.97 share
+    a bucket in at least one of six 8-bit tables about 99% of the time; a
+    missed neighbour is only a cache miss. The dimension is fixed by the
+    first vector added.
+    """
+
+    def __init__(self, capacity: int, tables: int = 6, bits: int = 8, seed: int = 0):
+        self.capacity = capacity
+        self.tables = tables
+        self.bits = bits
+        self.seed = seed
+        self.dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._planes: Optional[np.ndarray] = None
+        self._weights = 1 << np.arange(bits)
+        self._buckets: List[Dict[int, set]] = [{} for _ in range(tables)]
+        self._codes: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @staticmethod
+    def unit(vector: Any) -> Optional[np.ndarray]:
+        """vector as a float32 unit vector, or None if it is empty or zero"""
+        array = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(array))
+        return array / norm if array.size and norm > 0 else None
+
+    def _hash(self, vector: np.ndarray) -> np.ndarray:
+        return ((self._planes @ vector) > 0) @ self._weights
+
+    def accepts(self, vector: np.ndarray) -> bool:
+        return self.dim is None or vector.shape[0] == self.dim
+
+    def add(self, slot: int, vector: np.ndarray):
+        """Index a unit vector under slot, replacing what the slot held"""
+        if self.dim is None:
+            self.dim = vector.shape[0]
+            self._vectors = np.zeros((self.capacity, self.dim), dtype=np.float32)
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.tables, self.bits, self.dim)).astype(np.float32)
+        self.remove(slot)
+        self._vectors[slot] = vector
+        codes = self._hash(vector)
+        for table, code in enumerate(codes):
+            self._buckets[table].setdefault(int(code), set()).add(slot)
+        self._codes[slot] = codes
+
+    def remove(self, slot: int):
+        codes = self._codes.pop(slot, None)
+        if codes is None:
+            return
+        for table, code in enumerate(codes):
+            bucket = self._buckets[table][int(code)]
+            bucket.discard(slot)
+            if not bucket:
+                del self._buckets[table][int(code)]
+
+    def search(self, vector: np.ndarray, threshold: float) -> List[Tuple[float, int]]:
+        """(similarity, slot) of indexed vectors at or above threshold, most similar first"""
+        if self.dim is None or not self.accepts(vector):
+            return []
+        candidates = set()
+        for table, code in enumerate(self._hash(vector)):
+            candidates |= self._buckets[table].get(int(code), set())
+        if not candidates:
+            return []
+        slots = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarities = self._vectors[slots] @ vector
+        order = np.argsort(-similarities)
+        return [
+            (float(similarities[i]), int(slots[i]))
+            for i in order
+            if similarities[i] >= threshold
+        ]
+
+
+class SemanticCache:
+    """
+    Recent search results of one memory context, looked up by query similarity
+
+    Queries are normalized first, and an exact normalized repeat is a
+    dictionary hit (``lookup``). Otherwise the caller embeds the normalized
+    query with the context's embedding model and ``lookup_similar`` finds
+    cached queries at cosine similarity >= ``threshold`` in a VectorIndex.
+    The default threshold is deliberately high: embeddings put "Q4 2023"
+    and "Q4 2024" close together, and a wrong hit returns another
+    question's memories.
+
+    A hit needs the same user, a cached ``limit`` at least as large as the
+    requested one, an entry younger than ``ttl`` seconds and no write since
+    it was computed (``record_write``): a user's write invalidates that
+    user's entries, and any write invalidates searches across all users.
+    Full caches evict the least recently used entry.
+    """
+
+    def __init__(self, context: str, capacity: int = 1024, threshold: float = 0.97, ttl: float = 300.0):
+        self.context = context
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.enabled = True
+
+        # Collection version (any write) and per-user versions (that user's writes)
+        self.version = 0
+        self._user_versions: Dict[str, int] = {}
+
+        # (normalized query, user_id) -> entry, least recently used first;
+        # entries with an embedding also occupy a slot of the vector index
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._index = VectorIndex(capacity)
+        self._slots: Dict[int, tuple] = {}
+        self._free_slots = list(range(capacity - 1, -1, -1))
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.last_hit_similarity: Optional[float] = None
+
+    def version_token(self, user_id: Optional[str]) -> tuple:
+        """Version a search for user_id depends on; capture it before searching"""
+        if user_id is None:
+            return ("*", self.version)
+        return (user_id, self._user_versions.get(user_id, 0))
+
+    def record_write(self, user_id: Optional[str]):
+        """A memory was added, updated or deleted: results that could include it are stale"""
+        self.version += 1
+        if user_id is not None:
+            self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+        self.invalidations += 1
+
+    def _current(self, entry: Dict[str, Any], user_id: Optional[str], now: float) -> bool:
+        return entry["token"] == self.version_token(user_id) and now - entry["stored_at"] < self.ttl
+
+    def _hit(self, key: tuple, limit: int, similarity: float) -> List[Dict[str, Any]]:
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.last_hit_similarity = similarity
+        return list(self._entries[key]["results"][:limit])
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key)
+        slot = entry["slot"]
+        if slot is not None:
+            self._index.remove(slot)
+            del self._slots[slot]
+            self._free_slots.append(slot)
+
+    def lookup(self, query: str, user_id: Optional[str], limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Exact normalized match; a None result is not counted as a miss, lookup_similar decides"""
+        if not self.enabled:
+            return None
+        key = (normalize_query(query), user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not self._current(entry, user_id, time.time()):
+            self._discard(key)
+            return None
+        if entry["limit"] < limit:
+            return None
+        self.exact_hits += 1
+        return self._hit(key, limit, 1.0)
+
+    def lookup_similar(self, vector: Optional[Any], user_id: Optional[str],
+                       limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Most similar usable entry to the query embedding, counting a miss if there is none"""
+        if not self.enabled:
+            return None
+        unit = VectorIndex.unit(vector) if vector is not None else None
+        if unit is not None:
+            now = time.time()
+            for similarity, slot in self._index.search(unit, self.threshold):
+                key = self._slots[slot]
+                entry = self._entries[key]
+                if key[1] == user_id and entry["limit"] >= limit and self._current(entry, user_id, now):
+                    return self._hit(key, limit, similarity)
+
+        self.misses += 1
+        return None
+
+    def store(self, query: str, user_id: Optional[str], limit: int,
+              results: List[Dict[str, Any]], token: tuple, vector: Optional[Any] = None):
+        """
+        Cache results of a search that started at the given version_token
+
+        Without a query embedding the entry only serves exact normalized repeats.
+        """
+        if not self.enabled or not self.capacity or token != self.version_token(user_id):
+            return
+
+        key = (normalize_query(query), user_id)
+        if key in self._entries:
+            self._discard(key)
+        while len(self._entries) >= self.capacity:
+            self._discard(next(iter(self._entries)))
+
+        slot = None
+        unit = VectorIndex.unit(vector) if vector is not None else None
+        if unit is not None and self._index.accepts(unit):
+            slot = self._free_slots.pop()
+            self._index.add(slot, unit)
+            self._slots[slot] = key
+
+        self._entries[key] = {
+            "limit": limit,
+            "results": list(results),
+            "token": token,
+            "stored_at": time.time(),
+            "slot": slot
+        }
+
+    def configure(self, enabled: Optional[bool] = None, ttl: Optional[float] = None,
+                  threshold: Optional[float] = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if ttl is not None:
+            self.ttl = ttl
+        if threshold is not None:
+            if not 0.0 < threshold <= 1.0:
+                raise ValueError(f"Similarity threshold must be in (0, 1], got {threshold}")
+            self.threshold = threshold
+
+    def describe(self) -> Dict[str, Any]:
+        """Hit rate, threshold and occupancy, for stats output"""
+        now = time.time()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "ttl_s": self.ttl,
+            "capacity": self.capacity,
+            "entries": sum(1 for (_, user_id), e in self._entries.items() if self._current(e, user_id, now)),
+            "indexed": len(self._index),
+            "version": self.version,
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.hits - self.exact_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "last_hit_similarity": self.last_hit_similarity,
+            "invalidations": self.invalidations
+        }
@@ -0,0 +1,85 @@
+"""
+Persistent session storage for the Mem0 orchestrator
+SQLite table of memory sessions so they survive restarts
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_sessions (
+    session_id TEXT PRIMARY KEY,
+    context TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    memories_added INTEGER NOT NULL DEFAULT 0,
+    memories_recalled INTEGER NOT NULL DEFAULT 0,
+    metadata TEXT NOT NULL
+);
+"""
+
+COLUMNS = ("session_id", "context", "user_id", "started_at", "memories_added", "memories_recalled", "metadata")
+
+
+class SessionStore:
+    """
+    Sessions as plain rows (context as its value, started_at as ISO text)
+
+    The orchestrator writes a session when it is created, flushes counter
+    changes in batches and deletes sessions as they expire. Methods are
+    blocking; the orchestrator calls them through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def load_all(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM memory_sessions ORDER BY started_at"
+            ).fetchall()
+        return [{**dict(row), "metadata": json.loads(row["metadata"])} for row in rows]
+
+    def save_many(self, sessions: Iterable[Dict[str, Any]]):
+        rows = [
+            tuple(json.dumps(s["metadata"], default=str) if c == "metadata" else s[c] for c in COLUMNS)
+            for s in sessions
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO memory_sessions ({', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete_many(self, session_ids: Iterable[str]):
+        ids = [(session_id,) for session_id in session_ids]
+        if not ids:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("DELETE FROM memory_sessions WHERE session_id = ?", ids)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
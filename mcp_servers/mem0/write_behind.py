@@ -0,0 +1,238 @@
+"""
+Durable write-behind queue for Mem0 adds
+SQLite-backed log of pending memories, drained by background workers with retries and dedup
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Try to import prometheus_client
+try:
+    from prometheus_client import Gauge
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+if PROMETHEUS_AVAILABLE:
+    WRITE_BEHIND_LAG = Gauge(
+        "sophia_mem0_write_behind_lag_seconds",
+        "Age of the oldest memory waiting to be written to Mem0"
+    )
+    WRITE_BEHIND_DEPTH = Gauge(
+        "sophia_mem0_write_behind_depth",
+        "Write-behind entries by status",
+        ["status"]
+    )
+
+
+STATUSES = ("queued", "processing", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_memories (
+    id TEXT PRIMARY KEY,
+    dedup_key TEXT NOT NULL,
+    context TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    memory_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pending_due ON pending_memories (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_pending_dedup ON pending_memories (dedup_key, status);
+"""
+
+
+class WriteBehindQueue:
+    """
+    Memories acknowledged to the caller but not yet written to Mem0
+
+    Entries move queued -> processing -> done, or back to queued with
+    exponential backoff on failure until ``max_attempts``, then to failed.
+    Entries left processing by a crash are requeued on open, so delivery is
+    at-least-once (Mem0's own fact extraction absorbs a replayed add).
+    Enqueueing the same context, user, content and metadata while an
+    earlier copy is still queued or processing returns the earlier id; once
+    that copy is done, the same memory can be added again.
+
+    Methods are blocking; the orchestrator calls them through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 5, retry_base_delay: float = 1.0,
+                 retry_max_delay: float = 300.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        recovered = self._conn.execute(
+            "UPDATE pending_memories SET status = 'queued' WHERE status = 'processing'"
+        ).rowcount
+        if recovered:
+            print(f"♻️  Write-behind: requeued {recovered} in-flight memories from {path}")
+
+    @staticmethod
+    def dedup_key(context: str, user_id: str, content: str, metadata: Dict[str, Any]) -> str:
+        payload = json.dumps([context, user_id, content, metadata], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def enqueue(self, context: str, user_id: str, content: str,
+                metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Persist a memory for later writing; returns its provisional id"""
+        metadata = metadata or {}
+        key = self.dedup_key(context, user_id, content, metadata)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._conn.execute(
+                    "SELECT id, status FROM pending_memories "
+                    "WHERE dedup_key = ? AND status IN ('queued', 'processing') ORDER BY enqueued_at DESC LIMIT 1",
+                    (key,)
+                ).fetchone()
+                if existing:
+                    self._conn.execute("COMMIT")
+                    return {"id": existing["id"], "status": existing["status"], "duplicate": True}
+
+                entry_id = f"pending_{uuid.uuid4().hex}"
+                self._conn.execute(
+                    "INSERT INTO pending_memories "
+                    "(id, dedup_key, context, user_id, content, metadata, next_attempt_at, enqueued_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (entry_id, key, context, user_id, content, json.dumps(metadata, default=str), now, now, now)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"id": entry_id, "status": "queued", "duplicate": False}
+
+    def claim_batch(self, limit: int) -> List[Dict[str, Any]]:
+        """Mark up to limit due entries processing and return them, oldest first"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT * FROM pending_memories WHERE status = 'queued' AND next_attempt_at <= ? "
+                    "ORDER BY enqueued_at LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE pending_memories SET status = 'processing', updated_at = ? WHERE id = ?",
+                    [(now, row["id"]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [{**dict(row), "metadata": json.loads(row["metadata"])} for row in rows]
+
+    def finish_batch(self, completed: Dict[str, str], failed: Dict[str, str]):
+        """Record a batch's outcome: completed maps id -> Mem0 memory id, failed maps id -> error"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE pending_memories SET status = 'done', memory_id = ?, error = NULL, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(memory_id, now, entry_id) for entry_id, memory_id in completed.items()]
+                )
+                for entry_id, error in failed.items():
+                    row = self._conn.execute(
+                        "SELECT attempts FROM pending_memories WHERE id = ?", (entry_id,)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    attempts = row["attempts"] + 1
+                    if attempts >= self.max_attempts:
+                        status, next_attempt = "failed", now
+                    else:
+                        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+                        status, next_attempt = "queued", now + delay
+                    self._conn.execute(
+                        "UPDATE pending_memories SET status = ?, attempts = ?, next_attempt_at = ?, "
+                        "error = ?, updated_at = ? WHERE id = ?",
+                        (status, attempts, next_attempt, error, now, entry_id)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def status(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, context, user_id, status, attempts, memory_id, error, enqueued_at, updated_at "
+                "FROM pending_memories WHERE id = ?",
+                (entry_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            **dict(row),
+            "enqueued_at": datetime.utcfromtimestamp(row["enqueued_at"]).isoformat(),
+            "updated_at": datetime.utcfromtimestamp(row["updated_at"]).isoformat()
+        }
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next queued entry is due (0 if one is due now), None when empty"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) AS due FROM pending_memories WHERE status = 'queued'"
+            ).fetchone()
+        if row["due"] is None:
+            return None
+        return max(0.0, row["due"] - time.time())
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Drop done entries older than the given age; failed ones are kept for inspection"""
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM pending_memories WHERE status = 'done' AND updated_at < ?", (cutoff,)
+            ).rowcount
+
+    def describe(self) -> Dict[str, Any]:
+        """Depth by status and lag of the oldest unwritten entry, for stats output"""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM pending_memories GROUP BY status"
+            ).fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(enqueued_at) FROM pending_memories WHERE status IN ('queued', 'processing')"
+            ).fetchone()[0]
+
+        lag = time.time() - oldest if oldest is not None else 0.0
+        depth = {status: counts.get(status, 0) for status in STATUSES}
+        if PROMETHEUS_AVAILABLE:
+            WRITE_BEHIND_LAG.set(lag)
+            for status, count in depth.items():
+                WRITE_BEHIND_DEPTH.labels(status).set(count)
+        return {"path": self.path, "depth": depth, "lag_seconds": lag, "max_attempts": self.max_attempts}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
@@ -0,0 +1,347 @@
+"""
+In-memory relationship graph for the PostgreSQL tier
+Compressed sparse row (CSR) adjacency of business_data.relationships, with traversal and weighted shortest paths
+"""
+
+import heapq
+import itertools
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+# A graph node is an (entity type, entity id) pair, as stored in relationships
+Node = Tuple[str, int]
+
+DIRECTIONS = ("out", "in", "both")
+
+
+def weighted_shortest_path(start: Node,
+                           goal: Node,
+                           adjacent: Callable[[Node], Iterable[Tuple[Node, str, float]]],
+                           max_hops: int) -> Optional[Dict[str, Any]]:
+    """
+    Cheapest path of at most max_hops edges, where an edge costs 1 / strength
+
+    Stronger relationships are shorter; edges without a positive strength
+    are not traversed. Dijkstra over (node, hops) states, so a cheap path
+    that needs too many hops cannot hide a dearer one that fits.
+    """
+    counter = itertools.count()
+    heap = [(0.0, 0, next(counter), start)]
+    best: Dict[Tuple[Node, int], float] = {(start, 0): 0.0}
+    parents: Dict[Tuple[Node, int], Tuple[Tuple[Node, int], str, float]] = {}
+    settled_hops: Dict[Node, int] = {}
+
+    while heap:
+        cost, hops, _, node = heapq.heappop(heap)
+        if settled_hops.get(node, max_hops + 1) <= hops:
+            continue
+        settled_hops[node] = hops
+
+        if node == goal:
+            path, edges = [node], []
+            state = (node, hops)
+            while state in parents:
+                state, relationship_type, strength = parents[state]
+                path.append(state[0])
+                edges.append({"relationship_type": relationship_type, "strength": strength})
+            return {
+                "cost": cost,
+                "hops": hops,
+                "path": [{"node_type": t, "node_id": i} for t, i in reversed(path)],
+                "edges": edges[::-1]
+            }
+
+        if hops >= max_hops:
+            continue
+        for neighbor, relationship_type, strength in adjacent(node):
+            if not strength or strength <= 0:
+                continue
+            state = (neighbor, hops + 1)
+            next_cost = cost + 1.0 / strength
+            if next_cost < best.get(state, float("inf")):
+                best[state] = next_cost
+                parents[state] = ((node, hops), relationship_type, strength)
+                heapq.heappush(heap, (next_cost, hops + 1, next(counter), neighbor))
+
+    return None
+
+
+class CSRAdjacency:
+    """
+    One direction of the graph in compressed sparse row form
+
+    Edges of node ``i`` occupy ``[offsets[i], offsets[i + 1])`` of the
+    parallel edge arrays, strongest first, so a fan-out limit is a prefix.
+    """
+
+    def __init__(self, node_count: int = 0,
+                 row_edges: Optional[Callable[[int], List[Tuple[int, int, float]]]] = None):
+        # Rows are sorted one node at a time rather than in one big sort, so
+        # no single call holds the GIL long when this runs in a worker thread
+        self.offsets = array("q", [0])
+        self.targets = array("q")
+        self.types = array("l")
+        self.strengths = array("d")
+        for node in range(node_count):
+            row = row_edges(node) if row_edges else []
+            row.sort(key=lambda e: -e[2])
+            for target, type_id, strength in row:
+                self.targets.append(target)
+                self.types.append(type_id)
+                self.strengths.append(strength)
+            self.offsets.append(len(self.targets))
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def row(self, node: int) -> range:
+        # Nodes interned after the last compaction have no row yet
+        if node + 1 >= len(self.offsets):
+            return range(0)
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    def row_edges(self, node: int) -> List[Tuple[int, int, float]]:
+        """(target, type, strength) edges of a node, strongest first"""
+        return [(self.targets[i], self.types[i], self.strengths[i]) for i in self.row(node)]
+
+
+class GraphSnapshot:
+    """
+    CSR snapshot of the relationship graph, optionally limited to some relationship types
+
+    Outgoing and incoming adjacency are both kept so traversals can follow
+    edges either way. New edges land in a small per-node delta that is
+    folded into the CSR arrays once it exceeds ``compact_ratio`` of the
+    snapshot. The caller feeds rows (``add_edges``) and tracks freshness
+    through ``high_water_id``. Compaction re-sorts every edge, so large
+    batches go through ``from_rows`` / ``extended``, which build a new
+    snapshot and can run off the event loop.
+    """
+
+    def __init__(self, relationship_types: Optional[Iterable[str]] = None,
+                 max_edges: int = 1000000, compact_ratio: float = 0.1):
+        self.relationship_types: Optional[frozenset] = frozenset(relationship_types) if relationship_types else None
+        self.max_edges = max_edges
+        self.compact_ratio = compact_ratio
+        self.reset()
+
+    def reset(self):
+        self.nodes: List[Node] = []
+        self.node_index: Dict[Node, int] = {}
+        self.type_names: List[str] = []
+        self.type_index: Dict[str, int] = {}
+        self.outgoing = CSRAdjacency()
+        self.incoming = CSRAdjacency()
+
+        # node -> [(neighbor, type, strength)] not yet compacted into the CSR arrays
+        self._pending_out: Dict[int, List[Tuple[int, int, float]]] = {}
+        self._pending_in: Dict[int, List[Tuple[int, int, float]]] = {}
+        self.pending_edges = 0
+
+        self.high_water_id = 0
+        self.built = False
+        self.compactions = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]], relationship_types: Optional[Iterable[str]] = None,
+                  max_edges: int = 1000000) -> "GraphSnapshot":
+        """A built snapshot of rows, compacted once"""
+        snapshot = cls(relationship_types, max_edges=max_edges)
+        snapshot.add_edges(rows, auto_compact=False)
+        snapshot.compact()
+        snapshot.built = True
+        return snapshot
+
+    def extended(self, rows: Iterable[Mapping[str, Any]]) -> "GraphSnapshot":
+        """
+        A compacted copy with rows added, leaving this snapshot untouched
+
+        The CSR arrays are only ever replaced, never modified, so the copy
+        shares them until its own compaction; this snapshot can keep
+        serving reads meanwhile.
+        """
+        snapshot = GraphSnapshot(self.relationship_types, self.max_edges, self.compact_ratio)
+        snapshot.nodes = list(self.nodes)
+        snapshot.node_index = dict(self.node_index)
+        snapshot.type_names = list(self.type_names)
+        snapshot.type_index = dict(self.type_index)
+        snapshot.outgoing, snapshot.incoming = self.outgoing, self.incoming
+        snapshot._pending_out = {node: list(edges) for node, edges in self._pending_out.items()}
+        snapshot._pending_in = {node: list(edges) for node, edges in self._pending_in.items()}
+        snapshot.pending_edges = self.pending_edges
+        snapshot.high_water_id = self.high_water_id
+        snapshot.built = self.built
+        snapshot.compactions = self.compactions
+
+        snapshot.add_edges(rows, auto_compact=False)
+        snapshot.compact()
+        return snapshot
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.outgoing) + self.pending_edges
+
+    def needs_compaction(self, extra_edges: int = 0) -> bool:
+        """Whether the pending delta (plus extra_edges more) is due to be folded into the CSR arrays"""
+        return self.pending_edges + extra_edges > max(1000, self.compact_ratio * len(self.outgoing))
+
+    def covers(self, relationship_type: Optional[str]) -> bool:
+        """Whether the snapshot holds every edge a query on relationship_type can reach"""
+        if not self.built:
+            return False
+        return self.relationship_types is None or (
+            relationship_type is not None and relationship_type in self.relationship_types
+        )
+
+    def _intern(self, node: Node) -> int:
+        index = self.node_index.get(node)
+        if index is None:
+            index = len(self.nodes)
+            self.node_index[node] = index
+            self.nodes.append(node)
+        return index
+
+    def _intern_type(self, relationship_type: str) -> int:
+        index = self.type_index.get(relationship_type)
+        if index is None:
+            index = len(self.type_names)
+            self.type_index[relationship_type] = index
+            self.type_names.append(relationship_type)
+        return index
+
+    def add_edges(self, rows: Iterable[Mapping[str, Any]], auto_compact: bool = True) -> int:
+        """Append relationship rows (id, source/target type and id, relationship_type, strength)"""
+        added = 0
+        for row in rows:
+            self.high_water_id = max(self.high_water_id, row["id"])
+            if self.relationship_types is not None and row["relationship_type"] not in self.relationship_types:
+                continue
+
+            source = self._intern((row["source_type"], row["source_id"]))
+            target = self._intern((row["target_type"], row["target_id"]))
+            type_id = self._intern_type(row["relationship_type"])
+            strength = float(row["strength"]) if row["strength"] is not None else 0.0
+
+            self._pending_out.setdefault(source, []).append((target, type_id, strength))
+            self._pending_in.setdefault(target, []).append((source, type_id, strength))
+            self.pending_edges += 1
+            added += 1
+
+        if auto_compact and self.needs_compaction():
+            self.compact()
+        return added
+
+    def compact(self):
+        """Fold pending edges into fresh CSR arrays"""
+        if not self.pending_edges:
+            return
+
+        def merged(csr: CSRAdjacency, pending: Dict[int, List[Tuple[int, int, float]]]):
+            return lambda node: csr.row_edges(node) + pending.get(node, [])
+
+        self.outgoing = CSRAdjacency(len(self.nodes), merged(self.outgoing, self._pending_out))
+        self.incoming = CSRAdjacency(len(self.nodes), merged(self.incoming, self._pending_in))
+        self._pending_out.clear()
+        self._pending_in.clear()
+        self.pending_edges = 0
+        self.compactions += 1
+
+    def _adjacent(self, node: int, direction: str, type_id: Optional[int],
+                  limit: Optional[int] = None) -> List[Tuple[int, int, float, str]]:
+        """(neighbor, type, strength, direction) edges of a node, strongest first"""
+        edges = []
+        sides = [("out", self.outgoing, self._pending_out), ("in", self.incoming, self._pending_in)]
+        for side, csr, pending in sides:
+            if direction not in (side, "both"):
+                continue
+            for i in csr.row(node):
+                if type_id is None or csr.types[i] == type_id:
+                    edges.append((csr.targets[i], csr.types[i], csr.strengths[i], side))
+            for neighbor, edge_type, strength in pending.get(node, ()):
+                if type_id is None or edge_type == type_id:
+                    edges.append((neighbor, edge_type, strength, side))
+
+        edges.sort(key=lambda e: -e[2])
+        return edges[:limit] if limit is not None else edges
+
+    def _resolve(self, node: Node, relationship_type: Optional[str]) -> Tuple[Optional[int], Optional[int], bool]:
+        """Node and type indexes; the flag is False when nothing can match"""
+        index = self.node_index.get(node)
+        if relationship_type is None:
+            return index, None, index is not None
+        type_id = self.type_index.get(relationship_type)
+        return index, type_id, index is not None and type_id is not None
+
+    def neighbors(self, node: Node, direction: str = "both",
+                  relationship_type: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        index, type_id, found = self._resolve(node, relationship_type)
+        if not found:
+            return []
+        return [
+            {
+                "node_type": self.nodes[neighbor][0],
+                "node_id": self.nodes[neighbor][1],
+                "relationship_type": self.type_names[edge_type],
+                "strength": strength,
+                "direction": side
+            }
+            for neighbor, edge_type, strength, side in self._adjacent(index, direction, type_id, limit)
+        ]
+
+    def traverse(self, node: Node, direction: str = "out", max_depth: int = 2, fanout: int = 50,
+                 relationship_type: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+        """Breadth-first k-hop neighborhood, following at most fanout strongest edges per node"""
+        index, type_id, found = self._resolve(node, relationship_type)
+        if not found:
+            return []
+
+        seen: Set[int] = {index}
+        frontier = deque([(index, 0)])
+        reached = []
+        while frontier and len(reached) < limit:
+            current, depth = frontier.popleft()
+            if depth >= max_depth:
+                continue
+            for neighbor, edge_type, strength, _ in self._adjacent(current, direction, type_id, fanout):
+                if neighbor in seen:
+                    continue
+                seen.add(neighbor)
+                frontier.append((neighbor, depth + 1))
+                reached.append({
+                    "node_type": self.nodes[neighbor][0],
+                    "node_id": self.nodes[neighbor][1],
+                    "depth": depth + 1,
+                    "via_type": self.nodes[current][0],
+                    "via_id": self.nodes[current][1],
+                    "relationship_type": self.type_names[edge_type],
+                    "strength": strength
+                })
+                if len(reached) >= limit:
+                    break
+        return reached
+
+    def shortest_path(self, source: Node, target: Node, direction: str = "out",
+                      relationship_type: Optional[str] = None, max_hops: int = 4) -> Optional[Dict[str, Any]]:
+        index, type_id, found = self._resolve(source, relationship_type)
+        if not found or target not in self.node_index:
+            return None
+
+        def adjacent(node: Node) -> Iterator[Tuple[Node, str, float]]:
+            for neighbor, edge_type, strength, _ in self._adjacent(self.node_index[node], direction, type_id):
+                yield self.nodes[neighbor], self.type_names[edge_type], strength
+
+        return weighted_shortest_path(source, target, adjacent, max_hops)
+
+    def describe(self) -> Dict[str, Any]:
+        """Snapshot size and freshness, for stats output"""
+        return {
+            "built": self.built,
+            "relationship_types": sorted(self.relationship_types) if self.relationship_types else None,
+            "nodes": len(self.nodes),
+            "edges": self.edge_count,
+            "pending_edges": self.pending_edges,
+            "max_edges": self.max_edges,
+            "high_water_id": self.high_water_id,
+            "compactions": self.compactions
+        }
@@ -0,0 +1,85 @@
+"""
+In-process foreign-key lookup cache for the PostgreSQL tier
+Bounded, TTL-limited LRU of natural key -> surrogate id mappings
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+
+class IdLookupCache:
+    """
+    Bounded LRU of natural keys (project_id, repository name) to row ids
+
+    These mappings almost never change, so writes can skip the
+    ``SELECT id ... WHERE <natural key> = $1`` round trip. Entries expire
+    after ``ttl`` seconds to bound staleness when another process deletes
+    and recreates a parent row; callers also invalidate on upsert and on
+    foreign key violations. Missing keys are never cached.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        # key -> (expires_at, id)
+        self._entries: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, int]:
+        """Cached ids for the keys that are present; absent keys are omitted"""
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value: int):
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set_many(self, values: Dict[Hashable, int]):
+        for key, value in values.items():
+            self.set(key, value)
+
+    def invalidate(self, key: Hashable) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        self._entries.clear()
+
+    def describe(self) -> Dict[str, float]:
+        """Current occupancy and hit rate, for stats output"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,187 @@
+"""
+Connection pool instrumentation for the PostgreSQL tier
+Acquire wait, usage and timeout tracking around asyncpg pools, with an optional adaptive checkout limit
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from backend.core.pool_sizing import AdaptivePoolSizer
+from mcp_servers.postgresql.query_metrics import LatencyWindow
+
+# Try to import prometheus_client
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+if PROMETHEUS_AVAILABLE:
+    POOL_ACQUIRE_SECONDS = Histogram(
+        "sophia_postgres_pool_acquire_seconds",
+        "Time spent waiting for a pooled PostgreSQL connection",
+        ["pool"],
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0)
+    )
+    POOL_TIMEOUTS = Counter(
+        "sophia_postgres_pool_timeouts_total",
+        "Connection acquires that timed out",
+        ["pool"]
+    )
+    POOL_IN_USE = Gauge("sophia_postgres_pool_in_use", "Connections checked out", ["pool"])
+    POOL_SIZE = Gauge("sophia_postgres_pool_size", "Open connections", ["pool"])
+    POOL_LIMIT = Gauge("sophia_postgres_pool_limit", "Current checkout limit", ["pool"])
+
+
+class InstrumentedPool:
+    """
+    asyncpg pool wrapper recording acquire waits, usage and timeouts
+
+    ``acquire()`` is used exactly like ``Pool.acquire()`` in an ``async with``;
+    everything else is delegated to the wrapped pool. With a sizer, checkouts
+    are also gated at the sizer's current limit: the asyncpg pool is created
+    at the sizer's ``max_size`` and connections above the limit close once
+    idle for ``max_inactive_connection_lifetime``.
+    """
+
+    def __init__(self, pool: Any, name: str, acquire_timeout: Optional[float] = None,
+                 sizer: Optional[AdaptivePoolSizer] = None):
+        self._pool = pool
+        self.name = name
+        self.acquire_timeout = acquire_timeout
+        self.sizer = sizer
+
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquires = 0
+        self.timeouts = 0
+        self.waits = LatencyWindow()
+
+        # Checkout slots held (including acquires in flight) and callers queued for one
+        self._held = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._update_gauges()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+    @property
+    def limit(self) -> int:
+        return self.sizer.limit if self.sizer else self._pool.get_max_size()
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None) -> AsyncIterator[Any]:
+        """Check out a connection, timing the wait; raises asyncio.TimeoutError past the timeout"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.perf_counter()
+        try:
+            conn = await asyncio.wait_for(self._checkout(), timeout)
+        except asyncio.TimeoutError:
+            self._record_timeout()
+            raise
+
+        wait = time.perf_counter() - start
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        self.acquires += 1
+        self.waits.record(wait * 1000)
+        if PROMETHEUS_AVAILABLE:
+            POOL_ACQUIRE_SECONDS.labels(self.name).observe(wait)
+        if self.sizer:
+            self.sizer.record_acquire(wait * 1000, self.in_use)
+            self._maybe_resize()
+        self._update_gauges()
+
+        try:
+            yield conn
+        finally:
+            self.in_use -= 1
+            try:
+                await self._pool.release(conn)
+            finally:
+                if self.sizer:
+                    self._free_slot()
+                self._update_gauges()
+
+    async def _checkout(self) -> Any:
+        if not self.sizer:
+            return await self._pool.acquire()
+
+        await self._take_slot()
+        try:
+            return await self._pool.acquire()
+        except BaseException:
+            self._free_slot()
+            raise
+
+    async def _take_slot(self):
+        if self._held < self.sizer.limit and not self._waiters:
+            self._held += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Granted a slot just as we were cancelled: hand it on
+            if waiter.done() and not waiter.cancelled():
+                self._free_slot()
+            raise
+
+    def _free_slot(self):
+        self._held -= 1
+        self._grant_slots()
+
+    def _grant_slots(self):
+        while self._waiters and self._held < self.sizer.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._held += 1
+                waiter.set_result(None)
+
+    def _record_timeout(self):
+        self.timeouts += 1
+        if PROMETHEUS_AVAILABLE:
+            POOL_TIMEOUTS.labels(self.name).inc()
+        if self.sizer:
+            self.sizer.record_timeout()
+            self._maybe_resize()
+
+    def _maybe_resize(self):
+        previous = self.sizer.limit
+        limit = self.sizer.maybe_resize()
+        if limit is None:
+            return
+        print(f"🔧 PostgreSQL pool {self.name}: checkout limit {previous} -> {limit} "
+              f"(p95 wait {self.sizer.last_p95_ms:.1f}ms)")
+        self._grant_slots()
+        self._update_gauges()
+
+    def _update_gauges(self):
+        if PROMETHEUS_AVAILABLE:
+            POOL_IN_USE.labels(self.name).set(self.in_use)
+            POOL_SIZE.labels(self.name).set(self._pool.get_size())
+            POOL_LIMIT.labels(self.name).set(self.limit)
+
+    def describe(self) -> Dict[str, Any]:
+        """Pool occupancy, acquire waits and timeouts, for stats and health output"""
+        return {
+            "pool": self.name,
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "waiting": sum(1 for w in self._waiters if not w.done()),
+            "acquires": self.acquires,
+            "timeouts": self.timeouts,
+            "acquire_wait": self.waits.describe(),
+            "adaptive": self.sizer.describe() if self.sizer else None
+        }
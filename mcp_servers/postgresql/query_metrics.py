@@ -0,0 +1,78 @@
+"""
+Query latency tracking for the PostgreSQL tier
+Fixed-size ring buffers of recent latencies with percentile summaries
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+
+class LatencyWindow:
+    """
+    Latencies of the most recent ``size`` queries
+
+    Appends are O(1) (the deque drops the oldest sample); percentiles sort a
+    snapshot on demand, which only happens when stats are read. Lifetime
+    count, total and max are kept alongside the window.
+    """
+
+    def __init__(self, size: int = 1024):
+        self.samples: "deque[float]" = deque(maxlen=size)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, time_ms: float):
+        self.samples.append(time_ms)
+        self.count += 1
+        self.total_ms += time_ms
+        if time_ms > self.max_ms:
+            self.max_ms = time_ms
+
+    def percentile(self, pct: float) -> float:
+        return percentiles(sorted(self.samples), (pct,))[0]
+
+    def merge(self, other: "LatencyWindow"):
+        """Fold another window in (for per-schema totals over operations)"""
+        self.samples.extend(other.samples)
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def describe(self) -> Dict[str, float]:
+        """Window percentiles plus lifetime count/mean/max, in milliseconds"""
+        p50, p95, p99 = percentiles(sorted(self.samples), (50, 95, 99))
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": self.max_ms
+        }
+
+
+def percentiles(sorted_values: Sequence[float], pcts: Sequence[float]) -> List[float]:
+    """Nearest-rank percentiles of an already sorted sequence"""
+    if not sorted_values:
+        return [0.0 for _ in pcts]
+    last = len(sorted_values) - 1
+    return [sorted_values[max(0, min(last, int(round(p / 100 * len(sorted_values))) - 1))] for p in pcts]
+
+
+def params_shape(args: Sequence[Any]) -> List[str]:
+    """Describe query parameters by type and size, never by value"""
+    shape = []
+    for arg in args:
+        if arg is None:
+            shape.append("null")
+        elif isinstance(arg, (list, tuple)):
+            shape.append(f"{type(arg).__name__}[{len(arg)}]")
+        elif isinstance(arg, (str, bytes)):
+            shape.append(f"{type(arg).__name__}({len(arg)})")
+        elif isinstance(arg, datetime):
+            shape.append("datetime")
+        else:
+            shape.append(type(arg).__name__)
+    return shape
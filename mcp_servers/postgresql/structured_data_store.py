@@ -4,11 +4,15 @@ Relational data storage with separation between coding and business contexts
 """
 
 import asyncio
+import base64
 import json
 import time
-from typing import Dict, List, Any, Optional, Union
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Iterable, List, Any, Optional, Sequence, Set, Tuple, Union
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 import os
 import sys
@@ -17,16 +21,281 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from backend.core.auto_esc_config import get_config_value
+from backend.core.pool_sizing import AdaptivePoolSizer
+from mcp_servers.postgresql.graph_snapshot import DIRECTIONS, GraphSnapshot, weighted_shortest_path
+from mcp_servers.postgresql.lookup_cache import IdLookupCache
+from mcp_servers.postgresql.pool_metrics import InstrumentedPool
+from mcp_servers.postgresql.query_metrics import LatencyWindow, params_shape
 
 # Try to import asyncpg
 try:
     import asyncpg
-    from asyncpg import Pool
     ASYNCPG_AVAILABLE = True
 except ImportError:
     ASYNCPG_AVAILABLE = False
     print("⚠️  asyncpg not installed. Install with: pip install asyncpg")
 
+# Try to import prometheus_client
+try:
+    from prometheus_client import Counter, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+
+# Hot statements, prepared once per pooled connection (see _fetch_prepared)
+PREPARED_STATEMENTS = {
+    "project_pk": 'SELECT id FROM business_data.projects WHERE project_id = $1',
+    "repository_pk": 'SELECT id FROM coding_data.repositories WHERE name = $1',
+    "upsert_repository": '''
+        INSERT INTO coding_data.repositories (name, language, metadata)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (name) DO UPDATE
+        SET language = $2, metadata = $3, updated_at = CURRENT_TIMESTAMP
+        RETURNING id
+    ''',
+    "upsert_project": '''
+        INSERT INTO business_data.projects 
+        (project_id, name, status, priority, metadata)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (project_id) DO UPDATE
+        SET name = $2, status = $3, priority = $4, 
+            metadata = $5, updated_at = CURRENT_TIMESTAMP
+        RETURNING id
+    ''',
+    "upsert_code_pattern": '''
+        INSERT INTO coding_data.code_patterns AS cp
+        (repository_id, pattern_type, pattern_data)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (repository_id, pattern_type, pattern_hash) DO UPDATE
+        SET frequency = cp.frequency + 1, last_seen = CURRENT_TIMESTAMP
+        RETURNING frequency
+    ''',
+    # Repeats within the batch are folded first: ON CONFLICT may touch a row only once per statement
+    "upsert_code_patterns": '''
+        INSERT INTO coding_data.code_patterns AS cp
+        (repository_id, pattern_type, pattern_data, frequency)
+        SELECT repository_id, pattern_type, (array_agg(pattern_data))[1], count(*)
+        FROM unnest($1::integer[], $2::varchar[], $3::jsonb[]) AS u(repository_id, pattern_type, pattern_data)
+        GROUP BY repository_id, pattern_type, md5(pattern_data::text)
+        ORDER BY repository_id, pattern_type, md5(pattern_data::text)
+        ON CONFLICT (repository_id, pattern_type, pattern_hash) DO UPDATE
+        SET frequency = cp.frequency + EXCLUDED.frequency, last_seen = CURRENT_TIMESTAMP
+    ''',
+    "insert_insight": '''
+        INSERT INTO business_data.insights 
+        (project_id, insight_type, content, confidence_score, source, metadata)
+        VALUES ($1, $2, $3, $4, $5, $6)
+    ''',
+    "insert_metric": '''
+        INSERT INTO business_data.metrics 
+        (project_id, metric_name, metric_value, unit, timestamp, metadata)
+        VALUES ($1, $2, $3, $4, $5, $6)
+    ''',
+    "insert_relationship": '''
+        INSERT INTO business_data.relationships 
+        (source_type, source_id, target_type, target_id, 
+         relationship_type, strength, metadata)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+    ''',
+    "relationships_since": '''
+        SELECT id, source_type, source_id, target_type, target_id, relationship_type, strength
+        FROM business_data.relationships
+        WHERE id > $1 AND ($2::varchar[] IS NULL OR relationship_type = ANY($2))
+        ORDER BY id
+        LIMIT $3
+    '''
+}
+
+
+# Metric rollup resolutions, finest first, with their bucket widths
+METRIC_ROLLUPS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+ROLLUP_UPSERT = '''
+    rollup_{name} AS (
+        INSERT INTO business_data.metrics_rollup_{name} AS r
+            (project_id, metric_name, bucket, sample_count, value_sum, value_min, value_max)
+        SELECT project_id, metric_name, date_trunc('{name}', ts),
+               count(*), sum(metric_value), min(metric_value), max(metric_value)
+        FROM points
+        GROUP BY 1, 2, 3
+        -- Every writer locks conflicting rollup rows in key order, so concurrent batches cannot deadlock
+        ORDER BY 1, 2, 3
+        ON CONFLICT (project_id, metric_name, bucket) DO UPDATE SET
+            sample_count = r.sample_count + EXCLUDED.sample_count,
+            value_sum = r.value_sum + EXCLUDED.value_sum,
+            value_min = LEAST(r.value_min, EXCLUDED.value_min),
+            value_max = GREATEST(r.value_max, EXCLUDED.value_max)
+        RETURNING 1
+    )'''
+
+# Folds a batch of new points (parallel arrays) into every rollup in one round trip
+PREPARED_STATEMENTS["rollup_metrics"] = (
+    '''
+    WITH points AS (
+        SELECT * FROM unnest($1::integer[], $2::varchar[], $3::float8[], $4::timestamp[])
+            AS p(project_id, metric_name, metric_value, ts)
+        WHERE p.project_id IS NOT NULL
+    ),'''
+    + ",".join(ROLLUP_UPSERT.format(name=name) for name in METRIC_ROLLUPS)
+    + "\n    SELECT count(*) FROM points"
+)
+
+
+def _insights_query(by_type: bool, paged: bool, limited: bool = True, filtered: bool = False) -> str:
+    """Project insights, newest first, keyset-paginated on (created_at, id)"""
+    conditions = ["p.project_id = $1"]
+    if by_type:
+        conditions.append(f"i.insight_type = ${len(conditions) + 1}")
+    if filtered:
+        conditions.append(f"i.metadata @> ${len(conditions) + 1}::jsonb")
+    if paged:
+        n = len(conditions) + 1
+        conditions.append(f"(i.created_at, i.id) < (${n}, ${n + 1})")
+    limit = f"LIMIT ${len(conditions) + (2 if paged else 1)}" if limited else ""
+    return f'''
+        SELECT i.*, p.name as project_name
+        FROM business_data.insights i
+        JOIN business_data.projects p ON i.project_id = p.id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY i.created_at DESC, i.id DESC
+        {limit}
+    '''
+
+
+def _patterns_query(by_type: bool, paged: bool, limited: bool = True, filtered: bool = False) -> str:
+    """
+    Repository patterns, most frequent first, keyset-paginated on (frequency, id)
+    
+    frequency changes as patterns are re-seen, so pages are approximate: a
+    pattern whose frequency moves across the cursor between pages can be
+    skipped or returned twice.
+    """
+    conditions = ["r.name = $1"]
+    if by_type:
+        conditions.append(f"cp.pattern_type = ${len(conditions) + 1}")
+    if filtered:
+        conditions.append(f"cp.pattern_data @> ${len(conditions) + 1}::jsonb")
+    if paged:
+        n = len(conditions) + 1
+        conditions.append(f"(cp.frequency, cp.id) < (${n}, ${n + 1})")
+    limit = f"LIMIT ${len(conditions) + (2 if paged else 1)}" if limited else ""
+    return f'''
+        SELECT cp.*, r.name as repository_name
+        FROM coding_data.code_patterns cp
+        JOIN coding_data.repositories r ON cp.repository_id = r.id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY cp.frequency DESC, cp.id DESC
+        {limit}
+    '''
+
+
+def _adjacent_edges(direction: str, node_type: str, node_id: str, relationship_type: str, limit: str) -> str:
+    """Strongest edges of one node as (node_type, node_id, relationship_type, strength, direction) rows"""
+    sides = []
+    for side, near, far in (("out", "source", "target"), ("in", "target", "source")):
+        if direction in (side, "both"):
+            sides.append(f'''(
+                SELECT r.{far}_type::varchar AS node_type, r.{far}_id AS node_id,
+                       r.relationship_type::varchar AS relationship_type, r.strength,
+                       '{side}'::varchar AS direction
+                FROM business_data.relationships r
+                WHERE r.{near}_type = {node_type} AND r.{near}_id = {node_id}
+                  AND ({relationship_type}::varchar IS NULL OR r.relationship_type = {relationship_type})
+                ORDER BY r.strength DESC NULLS LAST
+                LIMIT {limit}
+            )''')
+    return f'''
+        SELECT * FROM ({" UNION ALL ".join(sides)}) e
+        ORDER BY e.strength DESC NULLS LAST
+        LIMIT {limit}'''
+
+
+def _neighbors_query(direction: str) -> str:
+    """Neighbors of node ($1, $2), optionally of relationship type $3, strongest $4 first"""
+    return _adjacent_edges(direction, "$1", "$2", "$3", "$4")
+
+
+def _walk_query(direction: str) -> str:
+    """
+    Edges walked breadth first from node ($1, $2) within $4 hops
+    
+    Each node expands its $5 strongest edges (of type $3 if given); paths
+    never revisit a node, and the walk stops after $6 edges.
+    """
+    return f'''
+        WITH RECURSIVE walk AS (
+            SELECT $1::varchar AS node_type, $2::integer AS node_id, 0 AS depth,
+                   NULL::varchar AS via_type, NULL::integer AS via_id,
+                   NULL::varchar AS relationship_type, NULL::float8 AS strength,
+                   ARRAY[$1::varchar || ':' || $2::integer] AS path
+            UNION ALL
+            SELECT e.node_type, e.node_id, w.depth + 1, w.node_type, w.node_id,
+                   e.relationship_type, e.strength, w.path || (e.node_type || ':' || e.node_id)
+            FROM walk w
+            CROSS JOIN LATERAL ({_adjacent_edges(direction, "w.node_type", "w.node_id", "$3", "$5")}) e
+            WHERE w.depth < $4
+              AND NOT (e.node_type || ':' || e.node_id) = ANY(w.path)
+        )
+        SELECT node_type, node_id, depth, via_type, via_id, relationship_type, strength
+        FROM walk
+        WHERE depth > 0
+        LIMIT $6
+    '''
+
+
+def _containment(metadata_filter: Optional[Dict[str, Any]]) -> Optional[str]:
+    """JSON for a jsonb @> filter, or None when there is nothing to filter on"""
+    if not metadata_filter:
+        return None
+    if not isinstance(metadata_filter, dict):
+        raise ValueError("metadata_filter must be a JSON object")
+    return json.dumps(metadata_filter)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor for MCP callers"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(cursor: Union[str, Sequence[Any]]) -> List[Any]:
+    """Cursor values from an encoded cursor or an explicit (value, id) tuple"""
+    if isinstance(cursor, str):
+        try:
+            return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            raise ValueError(f"Invalid cursor '{cursor}'")
+    return list(cursor)
+
+
+# Session reads are routed with read-your-writes consistency (see PostgreSQLMCPServer.session)
+CURRENT_SESSION: ContextVar[Optional[str]] = ContextVar("postgres_session", default=None)
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+if ASYNCPG_AVAILABLE:
+    # Errors that mean a replica is unreachable rather than that the query is wrong
+    REPLICA_FAILOVER_ERRORS = (
+        OSError,
+        asyncio.TimeoutError,
+        asyncpg.PostgresConnectionError,
+        asyncpg.InterfaceError,
+        asyncpg.CannotConnectNowError,
+        asyncpg.TooManyConnectionsError
+    )
+
 
 class DataSchema(Enum):
     """Data schema types"""
@@ -45,6 +314,76 @@ class QueryStats:
     slow_queries: int = 0
 
 
+# Prometheus metrics (module level so several server instances share one registry entry)
+if PROMETHEUS_AVAILABLE:
+    QUERY_LATENCY = Histogram(
+        "sophia_postgres_query_seconds",
+        "PostgreSQL operation latency, including pool acquire",
+        ["schema", "operation"],
+        buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    )
+    SLOW_QUERIES = Counter(
+        "sophia_postgres_slow_queries_total",
+        "Operations slower than postgres_slow_query_ms",
+        ["schema", "operation"]
+    )
+
+
+@dataclass
+class ReplicaState:
+    """A read replica pool and its routing health"""
+    host: str
+    port: int
+    pool: Optional[Any] = None
+    healthy: bool = False
+    lag_seconds: float = 0.0
+    reads: int = 0
+    failures: int = 0
+    last_error: Optional[str] = None
+    
+    @property
+    def name(self) -> str:
+        return f"{self.host}:{self.port}"
+
+
+@dataclass
+class BulkInsertResult:
+    """Per-row outcome of a bulk ingestion call"""
+    success: List[bool]
+    errors: Dict[int, str] = field(default_factory=dict)
+    
+    @property
+    def inserted(self) -> int:
+        return sum(self.success)
+    
+    @property
+    def failed(self) -> int:
+        return len(self.success) - self.inserted
+    
+    def fail(self, index: int, error: str):
+        self.success[index] = False
+        self.errors.setdefault(index, error)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "success": self.success,
+            "errors": [{"index": i, "error": e} for i, e in sorted(self.errors.items())]
+        }
+
+
+def _parse_timestamp(value: Union[str, datetime, None]) -> datetime:
+    """Naive UTC datetime for TIMESTAMP columns; defaults to now"""
+    if value is None:
+        return datetime.utcnow()
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class PostgreSQLMCPServer:
     """
     MCP Server for PostgreSQL structured data operations
@@ -57,16 +396,84 @@ class PostgreSQLMCPServer:
         self.port = 9504  # PostgreSQL MCP server port
         
         # Connection pool
-        self.pool: Optional[Pool] = None
+        self.pool: Optional[InstrumentedPool] = None
+        
+        # Pool sizing; adaptive mode moves each pool's checkout limit within [min, max]
+        self.pool_min_size = int(get_config_value("postgres_pool_min_size", "10") or "10")
+        self.pool_max_size = int(get_config_value("postgres_pool_max_size", "20") or "20")
+        self.pool_acquire_timeout = float(get_config_value("postgres_pool_acquire_timeout", "30") or "30")
+        self.pool_max_inactive_lifetime = float(get_config_value("postgres_pool_max_inactive_lifetime", "300") or "300")
+        self.command_timeout = float(get_config_value("postgres_command_timeout", "30") or "30")
+        self.pool_adaptive = str(get_config_value("postgres_pool_adaptive", "false")).lower() == "true"
+        self.pool_adapt_interval = float(get_config_value("postgres_pool_adapt_interval", "10") or "10")
+        self.pool_grow_wait_ms = float(get_config_value("postgres_pool_grow_wait_ms", "50") or "50")
+        self.pool_shrink_wait_ms = float(get_config_value("postgres_pool_shrink_wait_ms", "5") or "5")
+        
+        # Per-connection prepared statement cache; room for every hot statement plus ad hoc SQL
+        self.statement_cache_size = int(get_config_value("postgres_statement_cache_size", "256") or "256")
         
         # Query statistics
         self.stats: Dict[DataSchema, QueryStats] = {
             schema: QueryStats() for schema in DataSchema
         }
         
-        # Performance tracking
-        self.query_times: List[float] = []
-        self.max_query_history = 1000
+        # Recent latencies per (schema, operation)
+        self.latency: Dict[Tuple[DataSchema, str], LatencyWindow] = {}
+        self.latency_window_size = int(get_config_value("postgres_latency_window", "1024") or "1024")
+        self.slow_query_ms = float(get_config_value("postgres_slow_query_ms", "100") or "100")
+        
+        # Opt-in slow statement log with sampled EXPLAIN (ANALYZE, BUFFERS) plans
+        self.slow_query_log_enabled = str(get_config_value("postgres_slow_query_log", "false")).lower() == "true"
+        self.slow_query_explain_interval = float(get_config_value("postgres_slow_query_explain_interval", "60") or "60")
+        self.slow_query_log: deque = deque(maxlen=int(get_config_value("postgres_slow_query_log_size", "100") or "100"))
+        self._last_explain: Dict[str, float] = {}
+        self._explain_tasks: Set[asyncio.Task] = set()
+        
+        # Optional read replicas (postgres_replica_hosts = "host[:port],...")
+        self.replicas: List[ReplicaState] = []
+        self._replica_cursor = 0
+        self._replica_credentials: Dict[str, Any] = {}
+        self._replica_health_task: Optional[asyncio.Task] = None
+        self.replica_max_lag = float(get_config_value("postgres_replica_max_lag_seconds", "30") or "30")
+        self.replica_health_interval = float(get_config_value("postgres_replica_health_interval", "10") or "10")
+        self.replica_pool_size = int(get_config_value("postgres_replica_pool_size", "10") or "10")
+        
+        # Sessions read from the primary for this long after their last write
+        self.read_your_writes_window = float(get_config_value("postgres_read_your_writes_window", "5") or "5")
+        self._session_writes: Dict[str, float] = {}
+        
+        # Bulk ingestion: COPY for batches at or above the threshold, executemany below it
+        self.bulk_copy_threshold = int(get_config_value("postgres_bulk_copy_threshold", "100") or "100")
+        self.bulk_chunk_size = int(get_config_value("postgres_bulk_chunk_size", "5000") or "5000")
+        
+        # Natural key -> id caches, so writes skip the parent SELECT
+        fk_cache_size = int(get_config_value("postgres_fk_cache_size", "10000") or "10000")
+        fk_cache_ttl = float(get_config_value("postgres_fk_cache_ttl", "300") or "300")
+        self.project_ids = IdLookupCache(fk_cache_size, fk_cache_ttl)
+        self.repository_ids = IdLookupCache(fk_cache_size, fk_cache_ttl)
+        
+        # Monthly metrics partitions known to exist, and how many to create ahead
+        self._metric_partitions: Set[datetime] = set()
+        self.metric_partitions_ahead = int(get_config_value("postgres_metrics_partitions_ahead", "2") or "2")
+        self.max_metric_points = int(get_config_value("postgres_metrics_max_points", "1000") or "1000")
+        
+        # Relationship graph traversal bounds (per query)
+        self.graph_max_depth = int(get_config_value("postgres_graph_max_depth", "6") or "6")
+        self.graph_max_fanout = int(get_config_value("postgres_graph_max_fanout", "100") or "100")
+        self.graph_max_walk_edges = int(get_config_value("postgres_graph_max_walk_edges", "10000") or "10000")
+        
+        # Optional in-memory CSR snapshot of (some relationship types of) the graph
+        self.graph_snapshot: Optional[GraphSnapshot] = None
+        self.graph_snapshot_enabled = str(get_config_value("postgres_graph_snapshot", "false")).lower() == "true"
+        snapshot_types = get_config_value("postgres_graph_snapshot_types")
+        self.graph_snapshot_types = [t.strip() for t in str(snapshot_types).split(",") if t.strip()] if snapshot_types else None
+        self.graph_snapshot_max_edges = int(get_config_value("postgres_graph_snapshot_max_edges", "1000000") or "1000000")
+        self.graph_snapshot_refresh = float(get_config_value("postgres_graph_snapshot_refresh", "30") or "30")
+        self.graph_snapshot_rebuild = float(get_config_value("postgres_graph_snapshot_rebuild", "3600") or "3600")
+        self._graph_refreshed_at = 0.0
+        self._graph_built_at = 0.0
+        self._graph_dirty = False
+        self._graph_lock = asyncio.Lock()
         
     async def initialize(self):
         """Initialize PostgreSQL connection pool and schemas"""
@@ -83,27 +490,202 @@ class PostgreSQLMCPServer:
             pg_database = get_config_value("postgres_database", "sophia_memory")
             
             # Create connection pool
-            self.pool = await asyncpg.create_pool(
+            self.pool = await self._create_pool(
+                "primary",
+                self.pool_min_size,
+                self.pool_max_size,
                 host=pg_host or "localhost",
                 port=pg_port,
                 user=pg_user or "sophia",
                 password=pg_password,
                 database=pg_database or "sophia_memory",
-                min_size=10,
-                max_size=20,
-                timeout=60.0,
-                command_timeout=30.0
+                timeout=60.0
             )
             
             # Initialize schemas
             await self._initialize_schemas()
             
+            await self._initialize_replicas(pg_user or "sophia", pg_password, pg_database or "sophia_memory")
+            
             print(f"✅ PostgreSQL MCP Server initialized on port {self.port}")
             
         except Exception as e:
             print(f"❌ Failed to initialize PostgreSQL Server: {e}")
             raise
     
+    async def _create_pool(self, name: str, min_size: int, max_size: int, **connect_kwargs) -> InstrumentedPool:
+        """Create an instrumented asyncpg pool, adaptively limited when postgres_pool_adaptive is set"""
+        sizer = None
+        if self.pool_adaptive:
+            sizer = AdaptivePoolSizer(
+                min_size,
+                max_size,
+                interval=self.pool_adapt_interval,
+                grow_wait_ms=self.pool_grow_wait_ms,
+                shrink_wait_ms=self.pool_shrink_wait_ms
+            )
+        
+        pool = await asyncpg.create_pool(
+            min_size=min_size,
+            max_size=max_size,
+            command_timeout=self.command_timeout,
+            max_inactive_connection_lifetime=self.pool_max_inactive_lifetime,
+            statement_cache_size=self.statement_cache_size,
+            **connect_kwargs
+        )
+        return InstrumentedPool(pool, name, acquire_timeout=self.pool_acquire_timeout, sizer=sizer)
+    
+    async def _initialize_replicas(self, user: str, password: Optional[str], database: str):
+        """Connect the configured read replicas and start health checking them"""
+        hosts = get_config_value("postgres_replica_hosts")
+        if not hosts:
+            return
+        
+        default_port = int(get_config_value("postgres_port", "5432") or "5432")
+        for entry in str(hosts).split(","):
+            host, _, port = entry.strip().partition(":")
+            if host:
+                self.replicas.append(ReplicaState(host, int(port or default_port)))
+        
+        self._replica_credentials = {"user": user, "password": password, "database": database}
+        await self.check_replicas()
+        self._replica_health_task = asyncio.create_task(self._monitor_replicas())
+        
+        healthy = sum(1 for r in self.replicas if r.healthy)
+        print(f"✅ Read replicas: {healthy}/{len(self.replicas)} healthy")
+    
+    async def _connect_replica(self, replica: ReplicaState):
+        replica.pool = await self._create_pool(
+            replica.name,
+            min(2, self.replica_pool_size),
+            self.replica_pool_size,
+            host=replica.host,
+            port=replica.port,
+            timeout=10.0,
+            **self._replica_credentials
+        )
+    
+    async def check_replicas(self):
+        """Probe every replica's reachability and replay lag, updating its routing health"""
+        for replica in self.replicas:
+            try:
+                if replica.pool is None:
+                    await self._connect_replica(replica)
+                async with replica.pool.acquire() as conn:
+                    lag = await conn.fetchval('''
+                        SELECT CASE
+                            WHEN NOT pg_is_in_recovery() THEN 0
+                            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                        END
+                    ''', timeout=5.0)
+                replica.lag_seconds = float(lag or 0.0)
+                if replica.lag_seconds > self.replica_max_lag:
+                    self._mark_replica_down(replica, f"replication lag {replica.lag_seconds:.1f}s")
+                else:
+                    if not replica.healthy:
+                        print(f"✅ Replica {replica.name} available for reads")
+                    replica.healthy = True
+                    replica.last_error = None
+            except Exception as e:
+                self._mark_replica_down(replica, str(e) or type(e).__name__)
+    
+    async def _monitor_replicas(self):
+        while True:
+            await asyncio.sleep(self.replica_health_interval)
+            try:
+                await self.check_replicas()
+            except Exception as e:
+                print(f"⚠️  Replica health check failed: {e}")
+    
+    def _mark_replica_down(self, replica: ReplicaState, error: str):
+        if replica.healthy:
+            print(f"⚠️  Replica {replica.name} removed from read routing: {error}")
+        replica.healthy = False
+        replica.failures += 1
+        replica.last_error = error
+    
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[None]:
+        """
+        Scope calls to a session for read-your-writes routing
+        
+        Reads in a session go to the primary for read_your_writes_window
+        seconds after its last write, and afterwards only to replicas whose
+        measured lag is below the time since that write. Calls outside a
+        session read from any healthy replica.
+        """
+        token = CURRENT_SESSION.set(session_id)
+        try:
+            yield
+        finally:
+            CURRENT_SESSION.reset(token)
+    
+    def _note_write(self):
+        """Remember when the current session last wrote"""
+        session_id = CURRENT_SESSION.get()
+        if session_id is None or not self.replicas:
+            return
+        
+        now = time.monotonic()
+        self._session_writes[session_id] = now
+        if len(self._session_writes) > 10000:
+            horizon = max(self.read_your_writes_window, self.replica_max_lag)
+            self._session_writes = {
+                s: t for s, t in self._session_writes.items() if now - t < horizon
+            }
+    
+    def _read_replicas(self) -> List[ReplicaState]:
+        """Replicas eligible for the current read, round-robin ordered"""
+        candidates = [r for r in self.replicas if r.healthy and r.pool is not None]
+        if not candidates:
+            return []
+        
+        session_id = CURRENT_SESSION.get()
+        last_write = self._session_writes.get(session_id) if session_id else None
+        if last_write is not None:
+            since_write = time.monotonic() - last_write
+            if since_write < self.read_your_writes_window:
+                return []
+            candidates = [r for r in candidates if r.lag_seconds < since_write]
+            if not candidates:
+                return []
+        
+        self._replica_cursor = (self._replica_cursor + 1) % len(candidates)
+        return candidates[self._replica_cursor:] + candidates[:self._replica_cursor]
+    
+    def _read_pool(self):
+        """Pool to stream a read from (no failover once the stream has started)"""
+        replicas = self._read_replicas()
+        return replicas[0].pool if replicas else self.pool
+    
+    async def _read(self, operation: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Run a read on a replica, failing over to the next one and then the primary"""
+        for replica in self._read_replicas():
+            try:
+                async with replica.pool.acquire() as conn:
+                    result = await operation(conn)
+                replica.reads += 1
+                return result
+            except REPLICA_FAILOVER_ERRORS as e:
+                self._mark_replica_down(replica, str(e) or type(e).__name__)
+        
+        async with self.pool.acquire() as conn:
+            return await operation(conn)
+    
+    async def close(self):
+        """Stop replica monitoring and close every pool"""
+        if self._replica_health_task:
+            self._replica_health_task.cancel()
+            self._replica_health_task = None
+        for replica in self.replicas:
+            if replica.pool is not None:
+                await replica.pool.close()
+                replica.pool = None
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+    
     async def _initialize_schemas(self):
         """Initialize database schemas and tables"""
         if not self.pool:
@@ -133,6 +715,7 @@ class PostgreSQLMCPServer:
                     repository_id INTEGER REFERENCES coding_data.repositories(id) ON DELETE CASCADE,
                     pattern_type VARCHAR(100) NOT NULL,
                     pattern_data JSONB NOT NULL,
+                    pattern_hash TEXT GENERATED ALWAYS AS (md5(pattern_data::text)) STORED,
                     frequency INTEGER DEFAULT 1,
                     last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -151,9 +734,15 @@ class PostgreSQLMCPServer:
                 -- Indexes for coding data
                 CREATE INDEX IF NOT EXISTS idx_repositories_name ON coding_data.repositories(name);
                 CREATE INDEX IF NOT EXISTS idx_patterns_type ON coding_data.code_patterns(pattern_type);
+                CREATE INDEX IF NOT EXISTS idx_patterns_repo_frequency
+                    ON coding_data.code_patterns(repository_id, frequency DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_patterns_data
+                    ON coding_data.code_patterns USING GIN (pattern_data jsonb_path_ops);
                 CREATE INDEX IF NOT EXISTS idx_dependencies_name ON coding_data.dependencies(dependency_name);
             ''')
             
+            await self._initialize_pattern_keys(conn)
+            
             # Create business data tables
             await conn.execute('''
                 CREATE TABLE IF NOT EXISTS business_data.projects (
@@ -178,16 +767,6 @@ class PostgreSQLMCPServer:
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
                 
-                CREATE TABLE IF NOT EXISTS business_data.metrics (
-                    id SERIAL PRIMARY KEY,
-                    project_id INTEGER REFERENCES business_data.projects(id) ON DELETE CASCADE,
-                    metric_name VARCHAR(100) NOT NULL,
-                    metric_value FLOAT NOT NULL,
-                    unit VARCHAR(50),
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    metadata JSONB DEFAULT '{}'
-                );
-                
                 CREATE TABLE IF NOT EXISTS business_data.relationships (
                     id SERIAL PRIMARY KEY,
                     source_type VARCHAR(50) NOT NULL,
@@ -203,24 +782,316 @@ class PostgreSQLMCPServer:
                 -- Indexes for business data
                 CREATE INDEX IF NOT EXISTS idx_projects_project_id ON business_data.projects(project_id);
                 CREATE INDEX IF NOT EXISTS idx_insights_type ON business_data.insights(insight_type);
-                CREATE INDEX IF NOT EXISTS idx_metrics_name ON business_data.metrics(metric_name);
+                CREATE INDEX IF NOT EXISTS idx_insights_project_created
+                    ON business_data.insights(project_id, created_at DESC, id DESC);
+                CREATE INDEX IF NOT EXISTS idx_insights_metadata
+                    ON business_data.insights USING GIN (metadata jsonb_path_ops);
                 CREATE INDEX IF NOT EXISTS idx_relationships_types ON business_data.relationships(source_type, target_type);
+                CREATE INDEX IF NOT EXISTS idx_relationships_source
+                    ON business_data.relationships(source_type, source_id, strength DESC NULLS LAST);
+                CREATE INDEX IF NOT EXISTS idx_relationships_target
+                    ON business_data.relationships(target_type, target_id, strength DESC NULLS LAST);
             ''')
             
+            await self._initialize_metrics_tables(conn)
+            
             print("✅ PostgreSQL schemas initialized")
     
-    async def _track_query_time(self, time_seconds: float):
-        """Track query execution times"""
-        time_ms = time_seconds * 1000
-        self.query_times.append(time_ms)
+    async def _initialize_pattern_keys(self, conn):
+        """
+        Give code_patterns its (repository_id, pattern_type, pattern_hash) unique key
+        
+        Tables created before patterns were upserted get the hash column,
+        and their repeated observations are merged into one row per pattern
+        (frequencies summed, latest last_seen kept) before the key is added.
+        """
+        has_hash = await conn.fetchval('''
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = 'coding_data' AND table_name = 'code_patterns'
+              AND column_name = 'pattern_hash'
+        ''')
+        
+        async with conn.transaction():
+            if not has_hash:
+                print("🔄 Merging duplicate rows in coding_data.code_patterns")
+                await conn.execute('''
+                    ALTER TABLE coding_data.code_patterns
+                        ADD COLUMN pattern_hash TEXT GENERATED ALWAYS AS (md5(pattern_data::text)) STORED
+                ''')
+                merged = await conn.execute('''
+                    WITH grouped AS (
+                        SELECT id,
+                               min(id) OVER w AS keep_id,
+                               sum(frequency) OVER w AS total_frequency,
+                               max(last_seen) OVER w AS latest_seen
+                        FROM coding_data.code_patterns
+                        WINDOW w AS (PARTITION BY repository_id, pattern_type, pattern_hash)
+                    ),
+                    kept AS (
+                        UPDATE coding_data.code_patterns cp
+                        SET frequency = g.total_frequency, last_seen = g.latest_seen
+                        FROM grouped g
+                        WHERE cp.id = g.id AND g.id = g.keep_id AND g.total_frequency > cp.frequency
+                    )
+                    DELETE FROM coding_data.code_patterns cp
+                    USING grouped g
+                    WHERE cp.id = g.id AND g.id <> g.keep_id
+                ''')
+                print(f"✅ code_patterns merged ({merged})")
+            
+            await conn.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS uq_patterns_repo_type_hash
+                    ON coding_data.code_patterns(repository_id, pattern_type, pattern_hash)
+            ''')
+    
+    async def _initialize_metrics_tables(self, conn):
+        """
+        Create the monthly-partitioned metrics table and its rollups
+        
+        A pre-partitioning metrics table is migrated in place: its rows are
+        copied into monthly partitions and the rollups are rebuilt.
+        """
+        relkind = await conn.fetchval(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('business_data.metrics')"
+        )
+        legacy = relkind == "r"
         
-        if len(self.query_times) > self.max_query_history:
-            self.query_times.pop(0)
+        async with conn.transaction():
+            if legacy:
+                print("🔄 Migrating business_data.metrics to monthly partitions")
+                await conn.execute('''
+                    ALTER TABLE business_data.metrics RENAME TO metrics_legacy;
+                    ALTER INDEX IF EXISTS business_data.metrics_pkey RENAME TO metrics_legacy_pkey;
+                    ALTER INDEX IF EXISTS business_data.idx_metrics_name RENAME TO idx_metrics_legacy_name;
+                    ALTER SEQUENCE IF EXISTS business_data.metrics_id_seq RENAME TO metrics_legacy_id_seq;
+                ''')
+            
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS business_data.metrics (
+                    id SERIAL,
+                    project_id INTEGER REFERENCES business_data.projects(id) ON DELETE CASCADE,
+                    metric_name VARCHAR(100) NOT NULL,
+                    metric_value FLOAT NOT NULL,
+                    unit VARCHAR(50),
+                    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                    metadata JSONB DEFAULT '{}',
+                    PRIMARY KEY (id, timestamp)
+                ) PARTITION BY RANGE (timestamp);
+                
+                CREATE INDEX IF NOT EXISTS idx_metrics_name ON business_data.metrics(metric_name);
+                CREATE INDEX IF NOT EXISTS idx_metrics_project_name_ts
+                    ON business_data.metrics(project_id, metric_name, timestamp);
+                CREATE INDEX IF NOT EXISTS idx_metrics_metadata
+                    ON business_data.metrics USING GIN (metadata jsonb_path_ops);
+            ''')
             
-        # Count slow queries (> 100ms)
-        if time_ms > 100:
-            for schema in DataSchema:
-                self.stats[schema].slow_queries += 1
+            for name in METRIC_ROLLUPS:
+                await conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS business_data.metrics_rollup_{name} (
+                        project_id INTEGER REFERENCES business_data.projects(id) ON DELETE CASCADE,
+                        metric_name VARCHAR(100) NOT NULL,
+                        bucket TIMESTAMP NOT NULL,
+                        sample_count BIGINT NOT NULL,
+                        value_sum DOUBLE PRECISION NOT NULL,
+                        value_min DOUBLE PRECISION NOT NULL,
+                        value_max DOUBLE PRECISION NOT NULL,
+                        PRIMARY KEY (project_id, metric_name, bucket)
+                    )
+                ''')
+            
+            if legacy:
+                months = await conn.fetch('''
+                    SELECT DISTINCT date_trunc('month', COALESCE(timestamp, CURRENT_TIMESTAMP)) AS month
+                    FROM business_data.metrics_legacy
+                ''')
+                await self._ensure_metric_partitions(conn, [r["month"] for r in months])
+                copied = await conn.execute('''
+                    INSERT INTO business_data.metrics
+                        (id, project_id, metric_name, metric_value, unit, timestamp, metadata)
+                    SELECT id, project_id, metric_name, metric_value, unit,
+                           COALESCE(timestamp, CURRENT_TIMESTAMP), metadata
+                    FROM business_data.metrics_legacy
+                ''')
+                await conn.execute('''
+                    SELECT setval(pg_get_serial_sequence('business_data.metrics', 'id'),
+                                  COALESCE((SELECT max(id) FROM business_data.metrics), 0) + 1, false);
+                    DROP TABLE business_data.metrics_legacy;
+                ''')
+                await self._rebuild_metric_rollups(conn)
+                print(f"✅ Migrated legacy metrics ({copied})")
+        
+        await self.maintain_metric_partitions(conn)
+    
+    async def _ensure_metric_partitions(self, conn, timestamps: Iterable[datetime]):
+        """Create the monthly partitions covering the given timestamps, if missing"""
+        months = {_month_start(ts) for ts in timestamps} - self._metric_partitions
+        for month in sorted(months):
+            name = f"metrics_y{month.year}m{month.month:02d}"
+            try:
+                await conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS business_data.{name}
+                    PARTITION OF business_data.metrics
+                    FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')
+                ''')
+            except asyncpg.DuplicateTableError:
+                # Created concurrently by another worker
+                pass
+            self._metric_partitions.add(month)
+    
+    async def maintain_metric_partitions(self, conn=None):
+        """Make sure this month's and the next metric_partitions_ahead months' partitions exist"""
+        if conn is None:
+            if not self.pool:
+                return
+            async with self.pool.acquire() as conn:
+                return await self.maintain_metric_partitions(conn)
+        
+        month = _month_start(datetime.utcnow())
+        months = [month]
+        for _ in range(self.metric_partitions_ahead):
+            month = _next_month(month)
+            months.append(month)
+        await self._ensure_metric_partitions(conn, months)
+    
+    async def _rollup_metrics(self, conn, records: List[Tuple]):
+        """Fold new (project_id, metric_name, metric_value, unit, timestamp, ...) points into the rollups"""
+        await self._fetch_prepared(
+            conn, "rollup_metrics", "fetchval",
+            [r[0] for r in records], [r[1] for r in records],
+            [r[2] for r in records], [r[4] for r in records]
+        )
+    
+    async def _rebuild_metric_rollups(self, conn, proj_id: Optional[int] = None):
+        """Recompute rollups from raw metrics, for one project or all"""
+        for name in METRIC_ROLLUPS:
+            condition = "WHERE project_id = $1" if proj_id is not None else ""
+            args = [proj_id] if proj_id is not None else []
+            await conn.execute(f'''
+                DELETE FROM business_data.metrics_rollup_{name} {condition}
+            ''', *args)
+            await conn.execute(f'''
+                INSERT INTO business_data.metrics_rollup_{name}
+                    (project_id, metric_name, bucket, sample_count, value_sum, value_min, value_max)
+                SELECT project_id, metric_name, date_trunc('{name}', timestamp),
+                       count(*), sum(metric_value), min(metric_value), max(metric_value)
+                FROM business_data.metrics
+                {condition + " AND" if condition else "WHERE"} project_id IS NOT NULL
+                GROUP BY 1, 2, 3
+            ''', *args)
+    
+    async def rebuild_metric_rollups(self, project_id: Optional[str] = None) -> bool:
+        """Recompute metric rollups from raw points (after manual edits or deletes)"""
+        if not self.pool:
+            return False
+        
+        try:
+            async with self.pool.acquire() as conn:
+                proj_id = None
+                if project_id:
+                    proj_id = await self._project_pk(conn, project_id)
+                    if not proj_id:
+                        return False
+                async with conn.transaction():
+                    await self._rebuild_metric_rollups(conn, proj_id)
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error rebuilding metric rollups: {e}")
+            return False
+    
+    async def _track_query_time(self, schema: DataSchema, operation: str, time_seconds: float):
+        """Record an operation's latency for its schema"""
+        time_ms = time_seconds * 1000
+        
+        window = self.latency.get((schema, operation))
+        if window is None:
+            window = self.latency[(schema, operation)] = LatencyWindow(self.latency_window_size)
+        window.record(time_ms)
+        
+        if PROMETHEUS_AVAILABLE:
+            QUERY_LATENCY.labels(schema.value, operation).observe(time_seconds)
+        
+        if time_ms > self.slow_query_ms:
+            self.stats[schema].slow_queries += 1
+            if PROMETHEUS_AVAILABLE:
+                SLOW_QUERIES.labels(schema.value, operation).inc()
+    
+    def _log_slow_query(self, sql_name: str, query: str, args: Sequence[Any], time_ms: float):
+        """Record a slow statement and sample its plan at most once per interval per statement"""
+        entry = {
+            "sql_name": sql_name,
+            "duration_ms": time_ms,
+            "params_shape": params_shape(args),
+            "timestamp": datetime.utcnow().isoformat(),
+            "plan": None
+        }
+        self.slow_query_log.append(entry)
+        print(f"🐢 Slow query {sql_name}: {time_ms:.1f}ms {entry['params_shape']}")
+        
+        now = time.monotonic()
+        last = self._last_explain.get(sql_name)
+        if self.pool and (last is None or now - last >= self.slow_query_explain_interval):
+            self._last_explain[sql_name] = now
+            task = asyncio.create_task(self._explain_slow_query(entry, query, args))
+            self._explain_tasks.add(task)
+            task.add_done_callback(self._explain_tasks.discard)
+    
+    async def _explain_slow_query(self, entry: Dict[str, Any], query: str, args: Sequence[Any]):
+        """Attach an EXPLAIN (ANALYZE, BUFFERS) plan to a slow query log entry"""
+        try:
+            async with self.pool.acquire() as conn:
+                transaction = conn.transaction()
+                await transaction.start()
+                try:
+                    plan = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args)
+                finally:
+                    # ANALYZE really executes the statement; never keep its effects
+                    await transaction.rollback()
+            entry["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+        except Exception as e:
+            entry["plan_error"] = str(e)
+    
+    async def _fetch_prepared(self, conn, name: str, method: str, *args, label: Optional[str] = None) -> Any:
+        """
+        Run a hot statement through the connection's prepared statement
+        
+        name is a PREPARED_STATEMENTS key, or the SQL of one of the bounded
+        families of generated read statements (_insights_query etc.), in
+        which case label names it in the slow query log.
+        Statements are prepared on first use per connection by asyncpg's
+        statement cache (sized by postgres_statement_cache_size), which
+        survives pool checkouts and re-prepares after schema changes.
+        PreparedStatement objects from conn.prepare() can't be kept
+        instead: asyncpg invalidates them when the connection is released.
+        """
+        query = PREPARED_STATEMENTS.get(name, name)
+        started = time.perf_counter()
+        result = await getattr(conn, method)(query, *args)
+        
+        if self.slow_query_log_enabled:
+            time_ms = (time.perf_counter() - started) * 1000
+            if time_ms > self.slow_query_ms:
+                self._log_slow_query(label or name, query, args, time_ms)
+        
+        return result
+    
+    async def _project_pk(self, conn, project_id: str) -> Optional[int]:
+        """Row id for a project_id, from the lookup cache when possible"""
+        proj_id = self.project_ids.get(project_id)
+        if proj_id is None:
+            proj_id = await self._fetch_prepared(conn, "project_pk", "fetchval", project_id)
+            if proj_id:
+                self.project_ids.set(project_id, proj_id)
+        return proj_id
+    
+    async def _repository_pk(self, conn, name: str) -> Optional[int]:
+        """Row id for a repository name, from the lookup cache when possible"""
+        repo_id = self.repository_ids.get(name)
+        if repo_id is None:
+            repo_id = await self._fetch_prepared(conn, "repository_pk", "fetchval", name)
+            if repo_id:
+                self.repository_ids.set(name, repo_id)
+        return repo_id
     
     # Coding Data Operations
     
@@ -236,16 +1107,20 @@ class PostgreSQLMCPServer:
         
         try:
             async with self.pool.acquire() as conn:
-                result = await conn.fetchval('''
-                    INSERT INTO coding_data.repositories (name, language, metadata)
-                    VALUES ($1, $2, $3)
-                    ON CONFLICT (name) DO UPDATE
-                    SET language = $2, metadata = $3, updated_at = CURRENT_TIMESTAMP
-                    RETURNING id
-                ''', name, language, json.dumps(metadata or {}))
+                result = await self._fetch_prepared(
+                    conn, "upsert_repository", "fetchval",
+                    name, language, json.dumps(metadata or {})
+                )
+                
+                # Upserts replace the cached mapping
+                self.repository_ids.invalidate(name)
+                if result:
+                    self.repository_ids.set(name, result)
                 
                 self.stats[DataSchema.CODING].total_inserts += 1
-                await self._track_query_time(time.time() - start_time)
+                
+                self._note_write()
+                await self._track_query_time(DataSchema.CODING, "add_repository", time.time() - start_time)
                 
                 return result
                 
@@ -257,7 +1132,7 @@ class PostgreSQLMCPServer:
                              repository_name: str,
                              pattern_type: str,
                              pattern_data: Dict[str, Any]) -> bool:
-        """Add a code pattern"""
+        """Record a code pattern; observing the same pattern again bumps its frequency"""
         if not self.pool:
             return False
             
@@ -265,23 +1140,28 @@ class PostgreSQLMCPServer:
         
         try:
             async with self.pool.acquire() as conn:
-                # Get repository ID
-                repo_id = await conn.fetchval(
-                    'SELECT id FROM coding_data.repositories WHERE name = $1',
-                    repository_name
-                )
+                repo_id = await self._repository_pk(conn, repository_name)
                 
                 if not repo_id:
                     return False
                 
-                await conn.execute('''
-                    INSERT INTO coding_data.code_patterns 
-                    (repository_id, pattern_type, pattern_data)
-                    VALUES ($1, $2, $3)
-                ''', repo_id, pattern_type, json.dumps(pattern_data))
+                try:
+                    frequency = await self._fetch_prepared(
+                        conn, "upsert_code_pattern", "fetchval",
+                        repo_id, pattern_type, json.dumps(pattern_data)
+                    )
+                except asyncpg.ForeignKeyViolationError:
+                    # Cached id is stale (repository removed elsewhere)
+                    self.repository_ids.invalidate(repository_name)
+                    raise
                 
-                self.stats[DataSchema.CODING].total_inserts += 1
-                await self._track_query_time(time.time() - start_time)
+                if frequency == 1:
+                    self.stats[DataSchema.CODING].total_inserts += 1
+                else:
+                    self.stats[DataSchema.CODING].total_updates += 1
+                
+                self._note_write()
+                await self._track_query_time(DataSchema.CODING, "add_code_pattern", time.time() - start_time)
                 
                 return True
                 
@@ -291,43 +1171,84 @@ class PostgreSQLMCPServer:
     
     async def get_repository_patterns(self,
                                     repository_name: str,
-                                    pattern_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get code patterns for a repository"""
+                                    pattern_type: Optional[str] = None,
+                                    limit: int = 100,
+                                    after: Optional[Union[str, Sequence[Any]]] = None,
+                                    metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Get code patterns for a repository, most frequent first
+        
+        Pass the cursor of the last row seen (pattern_cursor, or a
+        (frequency, id) tuple) as after to fetch the next page. Pages are
+        approximate while patterns are being recorded, since a pattern whose
+        frequency changes between pages can be skipped or repeated; use
+        iter_repository_patterns for a consistent pass.
+        metadata_filter keeps patterns whose pattern_data contains it (@>).
+        """
         if not self.pool:
             return []
             
         start_time = time.time()
         
         try:
-            async with self.pool.acquire() as conn:
-                if pattern_type:
-                    query = '''
-                        SELECT cp.*, r.name as repository_name
-                        FROM coding_data.code_patterns cp
-                        JOIN coding_data.repositories r ON cp.repository_id = r.id
-                        WHERE r.name = $1 AND cp.pattern_type = $2
-                        ORDER BY cp.frequency DESC
-                    '''
-                    rows = await conn.fetch(query, repository_name, pattern_type)
-                else:
-                    query = '''
-                        SELECT cp.*, r.name as repository_name
-                        FROM coding_data.code_patterns cp
-                        JOIN coding_data.repositories r ON cp.repository_id = r.id
-                        WHERE r.name = $1
-                        ORDER BY cp.frequency DESC
-                    '''
-                    rows = await conn.fetch(query, repository_name)
-                
-                self.stats[DataSchema.CODING].total_queries += 1
-                await self._track_query_time(time.time() - start_time)
-                
-                return [dict(row) for row in rows]
+            containment = _containment(metadata_filter)
+            args: List[Any] = [repository_name]
+            if pattern_type:
+                args.append(pattern_type)
+            if containment:
+                args.append(containment)
+            if after is not None:
+                frequency, pattern_id = decode_cursor(after)
+                args.extend([int(frequency), int(pattern_id)])
+            args.append(limit)
+            
+            rows = await self._read(lambda conn: self._fetch_prepared(
+                conn, _patterns_query(bool(pattern_type), after is not None, filtered=bool(containment)), "fetch", *args,
+                label="repository_patterns"
+            ))
+            
+            self.stats[DataSchema.CODING].total_queries += 1
+            await self._track_query_time(DataSchema.CODING, "get_repository_patterns", time.time() - start_time)
+            
+            return [dict(row) for row in rows]
                 
         except Exception as e:
             print(f"❌ Error getting repository patterns: {e}")
             return []
     
+    @staticmethod
+    def pattern_cursor(pattern: Dict[str, Any]) -> str:
+        """Keyset cursor pointing just past a pattern row (approximate, see get_repository_patterns)"""
+        return encode_cursor(pattern["frequency"], pattern["id"])
+    
+    async def iter_repository_patterns(self,
+                                     repository_name: str,
+                                     pattern_type: Optional[str] = None,
+                                     batch_size: int = 500,
+                                     metadata_filter: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all patterns of a repository through a server-side cursor
+        
+        Holds one pooled connection (in a read-only transaction) until the
+        iteration finishes or the generator is closed. It is one query over
+        one snapshot, so unlike paging with after it never skips or repeats rows.
+        """
+        if not self.pool:
+            return
+        
+        start_time = time.time()
+        containment = _containment(metadata_filter)
+        args: List[Any] = [repository_name] + [a for a in (pattern_type, containment) if a]
+        query = _patterns_query(bool(pattern_type), paged=False, limited=False, filtered=bool(containment))
+        
+        async with self._read_pool().acquire() as conn:
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, *args, prefetch=batch_size):
+                    yield dict(row)
+        
+        self.stats[DataSchema.CODING].total_queries += 1
+        await self._track_query_time(DataSchema.CODING, "iter_repository_patterns", time.time() - start_time)
+    
     # Business Data Operations
     
     async def add_project(self,
@@ -344,18 +1265,20 @@ class PostgreSQLMCPServer:
         
         try:
             async with self.pool.acquire() as conn:
-                result = await conn.fetchval('''
-                    INSERT INTO business_data.projects 
-                    (project_id, name, status, priority, metadata)
-                    VALUES ($1, $2, $3, $4, $5)
-                    ON CONFLICT (project_id) DO UPDATE
-                    SET name = $2, status = $3, priority = $4, 
-                        metadata = $5, updated_at = CURRENT_TIMESTAMP
-                    RETURNING id
-                ''', project_id, name, status, priority, json.dumps(metadata or {}))
+                result = await self._fetch_prepared(
+                    conn, "upsert_project", "fetchval",
+                    project_id, name, status, priority, json.dumps(metadata or {})
+                )
+                
+                # Upserts replace the cached mapping
+                self.project_ids.invalidate(project_id)
+                if result:
+                    self.project_ids.set(project_id, result)
                 
                 self.stats[DataSchema.BUSINESS].total_inserts += 1
-                await self._track_query_time(time.time() - start_time)
+                
+                self._note_write()
+                await self._track_query_time(DataSchema.BUSINESS, "add_project", time.time() - start_time)
                 
                 return result
                 
@@ -378,24 +1301,26 @@ class PostgreSQLMCPServer:
         
         try:
             async with self.pool.acquire() as conn:
-                # Get project ID
-                proj_id = await conn.fetchval(
-                    'SELECT id FROM business_data.projects WHERE project_id = $1',
-                    project_id
-                )
+                proj_id = await self._project_pk(conn, project_id)
                 
                 if not proj_id:
                     return False
                 
-                await conn.execute('''
-                    INSERT INTO business_data.insights 
-                    (project_id, insight_type, content, confidence_score, source, metadata)
-                    VALUES ($1, $2, $3, $4, $5, $6)
-                ''', proj_id, insight_type, content, confidence_score, source, 
-                    json.dumps(metadata or {}))
+                try:
+                    await self._fetch_prepared(
+                        conn, "insert_insight", "fetchval",
+                        proj_id, insight_type, content, confidence_score, source,
+                        json.dumps(metadata or {})
+                    )
+                except asyncpg.ForeignKeyViolationError:
+                    # Cached id is stale (project removed elsewhere)
+                    self.project_ids.invalidate(project_id)
+                    raise
                 
                 self.stats[DataSchema.BUSINESS].total_inserts += 1
-                await self._track_query_time(time.time() - start_time)
+                
+                self._note_write()
+                await self._track_query_time(DataSchema.BUSINESS, "add_insight", time.time() - start_time)
                 
                 return True
                 
@@ -408,8 +1333,9 @@ class PostgreSQLMCPServer:
                        metric_name: str,
                        metric_value: float,
                        unit: Optional[str] = None,
-                       metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Add a business metric"""
+                       metadata: Optional[Dict[str, Any]] = None,
+                       timestamp: Optional[datetime] = None) -> bool:
+        """Add a business metric and fold it into the rollups"""
         if not self.pool:
             return False
             
@@ -417,24 +1343,28 @@ class PostgreSQLMCPServer:
         
         try:
             async with self.pool.acquire() as conn:
-                # Get project ID
-                proj_id = await conn.fetchval(
-                    'SELECT id FROM business_data.projects WHERE project_id = $1',
-                    project_id
-                )
+                proj_id = await self._project_pk(conn, project_id)
                 
                 if not proj_id:
                     return False
                 
-                await conn.execute('''
-                    INSERT INTO business_data.metrics 
-                    (project_id, metric_name, metric_value, unit, metadata)
-                    VALUES ($1, $2, $3, $4, $5)
-                ''', proj_id, metric_name, metric_value, unit, 
-                    json.dumps(metadata or {}))
+                record = (proj_id, metric_name, float(metric_value), unit,
+                          _parse_timestamp(timestamp), json.dumps(metadata or {}))
+                await self._ensure_metric_partitions(conn, [record[4]])
+                
+                try:
+                    async with conn.transaction():
+                        await self._fetch_prepared(conn, "insert_metric", "fetchval", *record)
+                        await self._rollup_metrics(conn, [record])
+                except asyncpg.ForeignKeyViolationError:
+                    # Cached id is stale (project removed elsewhere)
+                    self.project_ids.invalidate(project_id)
+                    raise
                 
                 self.stats[DataSchema.BUSINESS].total_inserts += 1
-                await self._track_query_time(time.time() - start_time)
+                
+                self._note_write()
+                await self._track_query_time(DataSchema.BUSINESS, "add_metric", time.time() - start_time)
                 
                 return True
                 
@@ -445,83 +1375,192 @@ class PostgreSQLMCPServer:
     async def get_project_insights(self,
                                  project_id: str,
                                  insight_type: Optional[str] = None,
-                                 limit: int = 50) -> List[Dict[str, Any]]:
-        """Get insights for a project"""
+                                 limit: int = 50,
+                                 after: Optional[Union[str, Sequence[Any]]] = None,
+                                 metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Get insights for a project, newest first
+        
+        Pass the cursor of the last row seen (insight_cursor, or a
+        (created_at, id) tuple) as after to fetch the next page.
+        metadata_filter keeps insights whose metadata contains it (@>).
+        """
         if not self.pool:
             return []
             
         start_time = time.time()
         
         try:
-            async with self.pool.acquire() as conn:
-                if insight_type:
-                    query = '''
-                        SELECT i.*, p.name as project_name
-                        FROM business_data.insights i
-                        JOIN business_data.projects p ON i.project_id = p.id
-                        WHERE p.project_id = $1 AND i.insight_type = $2
-                        ORDER BY i.created_at DESC
-                        LIMIT $3
-                    '''
-                    rows = await conn.fetch(query, project_id, insight_type, limit)
-                else:
-                    query = '''
-                        SELECT i.*, p.name as project_name
-                        FROM business_data.insights i
-                        JOIN business_data.projects p ON i.project_id = p.id
-                        WHERE p.project_id = $1
-                        ORDER BY i.created_at DESC
-                        LIMIT $2
-                    '''
-                    rows = await conn.fetch(query, project_id, limit)
-                
-                self.stats[DataSchema.BUSINESS].total_queries += 1
-                await self._track_query_time(time.time() - start_time)
-                
-                return [dict(row) for row in rows]
+            containment = _containment(metadata_filter)
+            args: List[Any] = [project_id]
+            if insight_type:
+                args.append(insight_type)
+            if containment:
+                args.append(containment)
+            if after is not None:
+                created_at, insight_id = decode_cursor(after)
+                args.extend([_parse_timestamp(created_at), int(insight_id)])
+            args.append(limit)
+            
+            rows = await self._read(lambda conn: self._fetch_prepared(
+                conn, _insights_query(bool(insight_type), after is not None, filtered=bool(containment)), "fetch", *args,
+                label="project_insights"
+            ))
+            
+            self.stats[DataSchema.BUSINESS].total_queries += 1
+            await self._track_query_time(DataSchema.BUSINESS, "get_project_insights", time.time() - start_time)
+            
+            return [dict(row) for row in rows]
                 
         except Exception as e:
             print(f"❌ Error getting project insights: {e}")
             return []
     
+    @staticmethod
+    def insight_cursor(insight: Dict[str, Any]) -> str:
+        """Keyset cursor pointing just past an insight row"""
+        return encode_cursor(insight["created_at"], insight["id"])
+    
+    async def iter_project_insights(self,
+                                  project_id: str,
+                                  insight_type: Optional[str] = None,
+                                  batch_size: int = 500,
+                                  metadata_filter: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream all insights of a project through a server-side cursor
+        
+        Holds one pooled connection (in a read-only transaction) until the
+        iteration finishes or the generator is closed.
+        """
+        if not self.pool:
+            return
+        
+        start_time = time.time()
+        containment = _containment(metadata_filter)
+        args: List[Any] = [project_id] + [a for a in (insight_type, containment) if a]
+        query = _insights_query(bool(insight_type), paged=False, limited=False, filtered=bool(containment))
+        
+        async with self._read_pool().acquire() as conn:
+            async with conn.transaction(readonly=True):
+                async for row in conn.cursor(query, *args, prefetch=batch_size):
+                    yield dict(row)
+        
+        self.stats[DataSchema.BUSINESS].total_queries += 1
+        await self._track_query_time(DataSchema.BUSINESS, "iter_project_insights", time.time() - start_time)
+    
+    def _pick_metric_resolution(self, resolution: str, time_range: Optional[timedelta]) -> str:
+        """
+        Resolve "auto" to the coarsest-necessary rollup
+        
+        Picks the finest rollup that keeps the requested range under
+        max_metric_points buckets per metric; unbounded ranges use days.
+        """
+        if resolution != "auto":
+            if resolution != "raw" and resolution not in METRIC_ROLLUPS:
+                raise ValueError(f"Unknown resolution '{resolution}'")
+            return resolution
+        
+        if time_range is None:
+            return "day"
+        for name, width in METRIC_ROLLUPS.items():
+            if time_range / width <= self.max_metric_points:
+                return name
+        return "day"
+    
     async def get_project_metrics(self,
                                 project_id: str,
                                 metric_name: Optional[str] = None,
-                                time_range: Optional[timedelta] = None) -> List[Dict[str, Any]]:
-        """Get metrics for a project"""
+                                time_range: Optional[timedelta] = None,
+                                resolution: str = "raw",
+                                limit: Optional[int] = None,
+                                metadata_filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Get metrics for a project
+        
+        resolution is "raw", "minute", "hour", "day" or "auto". Rollup rows
+        carry the bucket start as timestamp, the mean as metric_value and
+        sample_count/value_min/value_max. metadata_filter keeps metrics whose
+        metadata contains it (@>); rollups don't keep metadata, so filtered
+        rollup-resolution reads aggregate the matching raw rows instead.
+        """
         if not self.pool:
             return []
             
         start_time = time.time()
         
         try:
-            async with self.pool.acquire() as conn:
+            resolution = self._pick_metric_resolution(resolution, time_range)
+            cutoff = datetime.utcnow() - time_range if time_range else None
+            containment = _containment(metadata_filter)
+            group_by = ""
+            
+            if resolution == "raw":
                 base_query = '''
                     SELECT m.*, p.name as project_name
                     FROM business_data.metrics m
                     JOIN business_data.projects p ON m.project_id = p.id
                     WHERE p.project_id = $1
                 '''
-                params = [project_id]
-                
-                if metric_name:
-                    base_query += ' AND m.metric_name = $2'
-                    params.append(metric_name)
-                
-                if time_range:
-                    cutoff = datetime.utcnow() - time_range
-                    param_num = len(params) + 1
-                    base_query += f' AND m.timestamp > ${param_num}'
-                    params.append(cutoff.isoformat())
-                
-                base_query += ' ORDER BY m.timestamp DESC'
-                
-                rows = await conn.fetch(base_query, *params)
-                
-                self.stats[DataSchema.BUSINESS].total_queries += 1
-                await self._track_query_time(time.time() - start_time)
-                
-                return [dict(row) for row in rows]
+                time_column, name_column = "m.timestamp", "m.metric_name"
+            elif containment:
+                base_query = f'''
+                    SELECT m.project_id, p.name as project_name, m.metric_name,
+                           date_trunc('{resolution}', m.timestamp) AS timestamp, avg(m.metric_value) AS metric_value,
+                           count(*) AS sample_count, min(m.metric_value) AS value_min,
+                           max(m.metric_value) AS value_max, '{resolution}' AS resolution
+                    FROM business_data.metrics m
+                    JOIN business_data.projects p ON m.project_id = p.id
+                    WHERE p.project_id = $1
+                '''
+                time_column, name_column = "m.timestamp", "m.metric_name"
+                group_by = f" GROUP BY m.project_id, p.name, m.metric_name, date_trunc('{resolution}', m.timestamp)"
+                if cutoff:
+                    cutoff = cutoff - (cutoff - datetime.min) % METRIC_ROLLUPS[resolution]
+            else:
+                base_query = f'''
+                    SELECT r.project_id, p.name as project_name, r.metric_name,
+                           r.bucket AS timestamp, r.value_sum / r.sample_count AS metric_value,
+                           r.sample_count, r.value_min, r.value_max, '{resolution}' AS resolution
+                    FROM business_data.metrics_rollup_{resolution} r
+                    JOIN business_data.projects p ON r.project_id = p.id
+                    WHERE p.project_id = $1
+                '''
+                time_column, name_column = "r.bucket", "r.metric_name"
+                if cutoff:
+                    # Include the partially covered first bucket
+                    cutoff = cutoff - (cutoff - datetime.min) % METRIC_ROLLUPS[resolution]
+            
+            params: List[Any] = [project_id]
+            
+            if metric_name:
+                params.append(metric_name)
+                base_query += f' AND {name_column} = ${len(params)}'
+            
+            if cutoff:
+                params.append(cutoff)
+                base_query += f' AND {time_column} >= ${len(params)}'
+            
+            if containment:
+                params.append(containment)
+                base_query += f' AND m.metadata @> ${len(params)}::jsonb'
+            
+            if group_by:
+                base_query += group_by + ' ORDER BY 4 DESC'
+            else:
+                base_query += f' ORDER BY {time_column} DESC'
+            
+            if limit:
+                params.append(limit)
+                base_query += f' LIMIT ${len(params)}'
+            
+            rows = await self._read(lambda conn: self._fetch_prepared(
+                conn, base_query, "fetch", *params, label=f"project_metrics_{resolution}"
+            ))
+            
+            self.stats[DataSchema.BUSINESS].total_queries += 1
+            await self._track_query_time(DataSchema.BUSINESS, "get_project_metrics", time.time() - start_time)
+            
+            return [dict(row) for row in rows]
                 
         except Exception as e:
             print(f"❌ Error getting project metrics: {e}")
@@ -543,16 +1582,17 @@ class PostgreSQLMCPServer:
         
         try:
             async with self.pool.acquire() as conn:
-                await conn.execute('''
-                    INSERT INTO business_data.relationships 
-                    (source_type, source_id, target_type, target_id, 
-                     relationship_type, strength, metadata)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7)
-                ''', source_type, source_id, target_type, target_id,
-                    relationship_type, strength, json.dumps(metadata or {}))
+                await self._fetch_prepared(
+                    conn, "insert_relationship", "fetchval",
+                    source_type, source_id, target_type, target_id,
+                    relationship_type, strength, json.dumps(metadata or {})
+                )
                 
                 self.stats[DataSchema.BUSINESS].total_inserts += 1
-                await self._track_query_time(time.time() - start_time)
+                
+                self._note_write()
+                self._graph_dirty = True
+                await self._track_query_time(DataSchema.BUSINESS, "add_relationship", time.time() - start_time)
                 
                 return True
                 
@@ -560,15 +1600,486 @@ class PostgreSQLMCPServer:
             print(f"❌ Error adding relationship: {e}")
             return False
     
-    async def get_stats(self, schema: Optional[DataSchema] = None) -> Dict[str, Any]:
-        """Get query statistics"""
-        avg_query_time = (
-            sum(self.query_times) / len(self.query_times)
-            if self.query_times else 0.0
+    # Bulk Ingestion
+    
+    async def _resolve_ids(self, conn, cache: IdLookupCache, keys: set, query: str) -> Dict[str, int]:
+        """Map natural keys to row ids: lookup cache first, then one ANY() query for the rest"""
+        ids = cache.get_many(keys)
+        missing = [key for key in keys if key not in ids]
+        if missing:
+            records = await conn.fetch(query, missing)
+            found = {r["key"]: r["id"] for r in records}
+            cache.set_many(found)
+            ids.update(found)
+        return ids
+    
+    async def _resolve_project_ids(self, conn, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Map every project_id referenced by a batch to its row id"""
+        return await self._resolve_ids(
+            conn, self.project_ids,
+            {row["project_id"] for row in rows if row.get("project_id")},
+            'SELECT project_id AS key, id FROM business_data.projects WHERE project_id = ANY($1::varchar[])'
         )
+    
+    async def _resolve_repository_ids(self, conn, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Map every repository_name referenced by a batch to its row id"""
+        return await self._resolve_ids(
+            conn, self.repository_ids,
+            {row["repository_name"] for row in rows if row.get("repository_name")},
+            'SELECT name AS key, id FROM coding_data.repositories WHERE name = ANY($1::varchar[])'
+        )
+    
+    @staticmethod
+    def _lookup(ids: Dict[str, int], kind: str, key: str) -> int:
+        if key not in ids:
+            raise LookupError(f"Unknown {kind} '{key}'")
+        return ids[key]
+    
+    async def _write_records(self,
+                           conn,
+                           schema: DataSchema,
+                           table: str,
+                           columns: Sequence[str],
+                           records: List[Tuple]):
+        """Stream records with COPY, or executemany for small batches"""
+        if len(records) >= self.bulk_copy_threshold:
+            await conn.copy_records_to_table(
+                table, records=records, columns=list(columns), schema_name=schema.value
+            )
+        else:
+            placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+            await conn.executemany(
+                f'INSERT INTO {schema.value}.{table} ({", ".join(columns)}) VALUES ({placeholders})',
+                records
+            )
+    
+    async def _bulk_insert(self,
+                         schema: DataSchema,
+                         table: str,
+                         columns: Sequence[str],
+                         rows: List[Dict[str, Any]],
+                         to_record: Callable[[Dict[str, Any], Dict[str, int]], Tuple],
+                         resolve_ids: Optional[Callable] = None,
+                         id_cache: Optional[IdLookupCache] = None,
+                         before_chunk: Optional[Callable[[Any, List[Tuple]], Awaitable[None]]] = None,
+                         after_chunk: Optional[Callable[[Any, List[Tuple]], Awaitable[None]]] = None,
+                         write_chunk: Optional[Callable[[Any, List[Tuple]], Awaitable[None]]] = None) -> BulkInsertResult:
+        """
+        Insert a batch of rows with one pool acquire and one FK lookup
+        
+        Invalid rows (missing fields, unknown parents) are rejected
+        individually. Valid rows are written in chunks of bulk_chunk_size,
+        each in its own transaction, so a failing chunk only fails its rows.
+        before_chunk runs ahead of each chunk's transaction, after_chunk
+        inside it. write_chunk replaces the default COPY/executemany write.
+        """
+        result = BulkInsertResult(success=[False] * len(rows))
+        if not self.pool:
+            for index in range(len(rows)):
+                result.fail(index, "PostgreSQL not connected")
+            return result
+        if not rows:
+            return result
+        
+        start_time = time.time()
         
+        try:
+            async with self.pool.acquire() as conn:
+                ids = await resolve_ids(conn, rows) if resolve_ids else {}
+                
+                records: List[Tuple] = []
+                indexes: List[int] = []
+                for index, row in enumerate(rows):
+                    try:
+                        records.append(to_record(row, ids))
+                        indexes.append(index)
+                    except KeyError as e:
+                        result.fail(index, f"Missing field {e}")
+                    except (LookupError, TypeError, ValueError) as e:
+                        result.fail(index, str(e))
+                
+                for start in range(0, len(records), self.bulk_chunk_size):
+                    chunk = records[start:start + self.bulk_chunk_size]
+                    chunk_indexes = indexes[start:start + self.bulk_chunk_size]
+                    try:
+                        if before_chunk:
+                            await before_chunk(conn, chunk)
+                        async with conn.transaction():
+                            if write_chunk:
+                                await write_chunk(conn, chunk)
+                            else:
+                                await self._write_records(conn, schema, table, columns, chunk)
+                            if after_chunk:
+                                await after_chunk(conn, chunk)
+                        for index in chunk_indexes:
+                            result.success[index] = True
+                    except asyncpg.PostgresError as e:
+                        if id_cache is not None and isinstance(e, asyncpg.ForeignKeyViolationError):
+                            # Some cached parent id is stale; re-resolve on the next batch
+                            id_cache.clear()
+                        print(f"❌ Bulk insert chunk into {schema.value}.{table} failed: {e}")
+                        for index in chunk_indexes:
+                            result.fail(index, str(e))
+            
+            self.stats[schema].total_inserts += result.inserted
+            
+            self._note_write()
+            await self._track_query_time(schema, f"bulk_insert_{table}", time.time() - start_time)
+            
+        except Exception as e:
+            print(f"❌ Error bulk inserting into {schema.value}.{table}: {e}")
+            for index, ok in enumerate(result.success):
+                if not ok:
+                    result.fail(index, str(e))
+        
+        return result
+    
+    async def add_metrics_bulk(self, metrics: List[Dict[str, Any]]) -> BulkInsertResult:
+        """
+        Add many business metrics
+        
+        Each row: project_id, metric_name, metric_value, optional unit,
+        metadata and timestamp (ISO string or datetime, defaults to now).
+        """
+        def to_record(row: Dict[str, Any], ids: Dict[str, int]) -> Tuple:
+            return (
+                self._lookup(ids, "project", row["project_id"]),
+                row["metric_name"],
+                float(row["metric_value"]),
+                row.get("unit"),
+                _parse_timestamp(row.get("timestamp")),
+                json.dumps(row.get("metadata") or {})
+            )
+        
+        return await self._bulk_insert(
+            DataSchema.BUSINESS, "metrics",
+            ("project_id", "metric_name", "metric_value", "unit", "timestamp", "metadata"),
+            metrics, to_record, self._resolve_project_ids, self.project_ids,
+            before_chunk=lambda conn, chunk: self._ensure_metric_partitions(conn, [r[4] for r in chunk]),
+            after_chunk=self._rollup_metrics
+        )
+    
+    async def add_insights_bulk(self, insights: List[Dict[str, Any]]) -> BulkInsertResult:
+        """Add many business insights (same fields as add_insight)"""
+        def to_record(row: Dict[str, Any], ids: Dict[str, int]) -> Tuple:
+            return (
+                self._lookup(ids, "project", row["project_id"]),
+                row["insight_type"],
+                row["content"],
+                float(row.get("confidence_score", 0.0)),
+                row.get("source", "unknown"),
+                json.dumps(row.get("metadata") or {})
+            )
+        
+        return await self._bulk_insert(
+            DataSchema.BUSINESS, "insights",
+            ("project_id", "insight_type", "content", "confidence_score", "source", "metadata"),
+            insights, to_record, self._resolve_project_ids, self.project_ids
+        )
+    
+    async def add_code_patterns_bulk(self, patterns: List[Dict[str, Any]]) -> BulkInsertResult:
+        """
+        Record many code patterns (same fields as add_code_pattern)
+        
+        Each chunk is one upsert statement: patterns repeated within the
+        batch or already stored have their frequency increased instead of
+        adding rows, which is what indexing runs re-observing a codebase need.
+        """
+        def to_record(row: Dict[str, Any], ids: Dict[str, int]) -> Tuple:
+            return (
+                self._lookup(ids, "repository", row["repository_name"]),
+                row["pattern_type"],
+                json.dumps(row["pattern_data"])
+            )
+        
+        async def upsert(conn, chunk: List[Tuple]):
+            repository_ids, pattern_types, pattern_data = zip(*chunk)
+            await self._fetch_prepared(
+                conn, "upsert_code_patterns", "fetch",
+                list(repository_ids), list(pattern_types), list(pattern_data)
+            )
+        
+        return await self._bulk_insert(
+            DataSchema.CODING, "code_patterns",
+            ("repository_id", "pattern_type", "pattern_data"),
+            patterns, to_record, self._resolve_repository_ids, self.repository_ids,
+            write_chunk=upsert
+        )
+    
+    async def add_relationships_bulk(self, relationships: List[Dict[str, Any]]) -> BulkInsertResult:
+        """Add many relationships (same fields as add_relationship)"""
+        def to_record(row: Dict[str, Any], ids: Dict[str, int]) -> Tuple:
+            return (
+                row["source_type"],
+                int(row["source_id"]),
+                row["target_type"],
+                int(row["target_id"]),
+                row["relationship_type"],
+                float(row.get("strength", 1.0)),
+                json.dumps(row.get("metadata") or {})
+            )
+        
+        result = await self._bulk_insert(
+            DataSchema.BUSINESS, "relationships",
+            ("source_type", "source_id", "target_type", "target_id",
+             "relationship_type", "strength", "metadata"),
+            relationships, to_record
+        )
+        if result.inserted:
+            self._graph_dirty = True
+        return result
+    
+    # Relationship Graph
+    
+    async def refresh_graph_snapshot(self, full: bool = False) -> bool:
+        """
+        Bring the in-memory relationship snapshot up to date
+        
+        Refreshes are incremental: only rows past the snapshot's highest id
+        are loaded. A full rebuild (forced, or every
+        postgres_graph_snapshot_rebuild seconds) also picks up rows
+        committed out of id order and deleted edges.
+        
+        All rows are fetched before the snapshot changes. Rebuilds, and
+        deltas large enough to need compaction, are then built into a new
+        snapshot in a worker thread and swapped in, so neither the event
+        loop nor reads of the previous snapshot wait on the CSR sort. Deltas
+        of up to 1000 rows are appended in place without awaiting.
+        """
+        if not self.graph_snapshot_enabled or not self.pool:
+            return False
+        
+        async with self._graph_lock:
+            start_time = time.time()
+            now = time.monotonic()
+            self._graph_refreshed_at = now
+            self._graph_dirty = False
+            
+            snapshot = self.graph_snapshot
+            due = now - self._graph_built_at >= self.graph_snapshot_rebuild
+            if snapshot is None and self._graph_built_at and not (full or due):
+                # Too large last time; don't reload it on every refresh
+                return False
+
+            rebuild = full or snapshot is None or due
+            if rebuild:
+                self._graph_built_at = now
+            base_edges = 0 if rebuild else snapshot.edge_count
+            since = 0 if rebuild else snapshot.high_water_id
+            
+            rows: List[Any] = []
+            try:
+                batch = 10000
+                while True:
+                    fetched = await self._read(lambda conn: self._fetch_prepared(
+                        conn, "relationships_since", "fetch",
+                        since, self.graph_snapshot_types, batch
+                    ))
+                    rows.extend(fetched)
+                    if fetched:
+                        since = fetched[-1]["id"]
+                    if base_edges + len(rows) > self.graph_snapshot_max_edges:
+                        print(f"⚠️  Relationship graph exceeds {self.graph_snapshot_max_edges} edges, "
+                              f"snapshot disabled until the next rebuild")
+                        self.graph_snapshot = None
+                        return False
+                    if len(fetched) < batch:
+                        break
+            except Exception as e:
+                print(f"❌ Error refreshing relationship graph snapshot: {e}")
+                return False
+            
+            if rebuild:
+                self.graph_snapshot = await asyncio.to_thread(
+                    GraphSnapshot.from_rows, rows, self.graph_snapshot_types, self.graph_snapshot_max_edges
+                )
+            elif len(rows) > 1000 or snapshot.needs_compaction(len(rows)):
+                self.graph_snapshot = await asyncio.to_thread(snapshot.extended, rows)
+            else:
+                # A few milliseconds of appending, with no await in between
+                snapshot.add_edges(rows, auto_compact=False)
+            
+            self.stats[DataSchema.BUSINESS].total_queries += 1
+            await self._track_query_time(DataSchema.BUSINESS, "refresh_graph_snapshot", time.time() - start_time)
+            return True
+    
+    async def _graph_snapshot_for(self, relationship_type: Optional[str]) -> Optional[GraphSnapshot]:
+        """The snapshot if it can answer a query on relationship_type, refreshed when stale"""
+        if not self.graph_snapshot_enabled:
+            return None
+        
+        stale = time.monotonic() - self._graph_refreshed_at >= self.graph_snapshot_refresh
+        if stale or self._graph_dirty:
+            await self.refresh_graph_snapshot()
+        
+        snapshot = self.graph_snapshot
+        return snapshot if snapshot is not None and snapshot.covers(relationship_type) else None
+    
+    async def _walk(self, node_type: str, node_id: int, direction: str, max_depth: int,
+                    fanout: int, relationship_type: Optional[str]) -> List[Dict[str, Any]]:
+        rows = await self._read(lambda conn: self._fetch_prepared(
+            conn, _walk_query(direction), "fetch",
+            node_type, node_id, relationship_type,
+            min(max_depth, self.graph_max_depth), min(fanout, self.graph_max_fanout),
+            self.graph_max_walk_edges,
+            label="relationship_walk"
+        ))
+        return [dict(row) for row in rows]
+    
+    async def get_neighbors(self,
+                          node_type: str,
+                          node_id: int,
+                          direction: str = "both",
+                          relationship_type: Optional[str] = None,
+                          limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Entities related to a node, strongest relationship first
+        
+        direction is "out" (node is the source), "in" (node is the target)
+        or "both".
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction '{direction}', expected one of {DIRECTIONS}")
+        if not self.pool:
+            return []
+            
+        start_time = time.time()
+        
+        try:
+            snapshot = await self._graph_snapshot_for(relationship_type)
+            if snapshot is not None:
+                neighbors = snapshot.neighbors((node_type, node_id), direction, relationship_type, limit)
+            else:
+                rows = await self._read(lambda conn: self._fetch_prepared(
+                    conn, _neighbors_query(direction), "fetch",
+                    node_type, node_id, relationship_type, limit,
+                    label="relationship_neighbors"
+                ))
+                neighbors = [dict(row) for row in rows]
+            
+            self.stats[DataSchema.BUSINESS].total_queries += 1
+            await self._track_query_time(DataSchema.BUSINESS, "get_neighbors", time.time() - start_time)
+            
+            return neighbors
+                
+        except Exception as e:
+            print(f"❌ Error getting neighbors: {e}")
+            return []
+    
+    async def traverse_relationships(self,
+                                   node_type: str,
+                                   node_id: int,
+                                   direction: str = "out",
+                                   max_depth: int = 2,
+                                   fanout: int = 50,
+                                   relationship_type: Optional[str] = None,
+                                   limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Entities within max_depth hops of a node, nearest first
+        
+        Each node expands only its fanout strongest relationships. Every
+        entity is reported once, with the depth it was first reached at and
+        the node and relationship it was reached through. Depth and fanout
+        are capped by postgres_graph_max_depth / postgres_graph_max_fanout.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction '{direction}', expected one of {DIRECTIONS}")
+        if not self.pool:
+            return []
+            
+        start_time = time.time()
+        max_depth = min(max_depth, self.graph_max_depth)
+        fanout = min(fanout, self.graph_max_fanout)
+        
+        try:
+            snapshot = await self._graph_snapshot_for(relationship_type)
+            if snapshot is not None:
+                reached = snapshot.traverse(
+                    (node_type, node_id), direction, max_depth, fanout, relationship_type, limit
+                )
+            else:
+                reached = []
+                seen = {(node_type, node_id)}
+                for row in await self._walk(node_type, node_id, direction, max_depth, fanout, relationship_type):
+                    node = (row["node_type"], row["node_id"])
+                    if node not in seen:
+                        seen.add(node)
+                        reached.append(row)
+                        if len(reached) >= limit:
+                            break
+            
+            self.stats[DataSchema.BUSINESS].total_queries += 1
+            await self._track_query_time(DataSchema.BUSINESS, "traverse_relationships", time.time() - start_time)
+            
+            return reached
+                
+        except Exception as e:
+            print(f"❌ Error traversing relationships: {e}")
+            return []
+    
+    async def find_shortest_path(self,
+                               source_type: str,
+                               source_id: int,
+                               target_type: str,
+                               target_id: int,
+                               direction: str = "out",
+                               relationship_type: Optional[str] = None,
+                               max_hops: int = 4,
+                               fanout: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        Strongest path between two entities, weighting each relationship by 1 / strength
+        
+        Without a snapshot the search runs over the edges walked from the
+        source (max_hops deep, fanout strongest per node), so a path through
+        weaker relationships outside that neighborhood is not found.
+        Returns None when no path exists within the bounds.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction '{direction}', expected one of {DIRECTIONS}")
+        if not self.pool:
+            return None
+            
+        start_time = time.time()
+        source = (source_type, source_id)
+        target = (target_type, target_id)
+        max_hops = min(max_hops, self.graph_max_depth)
+        
+        try:
+            snapshot = await self._graph_snapshot_for(relationship_type)
+            if snapshot is not None:
+                path = snapshot.shortest_path(source, target, direction, relationship_type, max_hops)
+            else:
+                adjacency: Dict[Tuple[str, int], List[Tuple[Tuple[str, int], str, float]]] = {}
+                for row in await self._walk(source_type, source_id, direction, max_hops, fanout, relationship_type):
+                    adjacency.setdefault((row["via_type"], row["via_id"]), []).append(
+                        ((row["node_type"], row["node_id"]), row["relationship_type"], row["strength"])
+                    )
+                path = weighted_shortest_path(source, target, lambda node: adjacency.get(node, ()), max_hops)
+            
+            self.stats[DataSchema.BUSINESS].total_queries += 1
+            await self._track_query_time(DataSchema.BUSINESS, "find_shortest_path", time.time() - start_time)
+            
+            return path
+                
+        except Exception as e:
+            print(f"❌ Error finding shortest path: {e}")
+            return None
+    
+    def _schema_latency(self, schema: DataSchema) -> Tuple[LatencyWindow, Dict[str, Dict[str, float]]]:
+        """Latency across a schema's operations, plus the per-operation breakdown"""
+        operations = {op: w for (sch, op), w in self.latency.items() if sch == schema}
+        total = LatencyWindow(self.latency_window_size * max(1, len(operations)))
+        for window in operations.values():
+            total.merge(window)
+        return total, {op: w.describe() for op, w in sorted(operations.items())}
+    
+    async def get_stats(self, schema: Optional[DataSchema] = None) -> Dict[str, Any]:
+        """Get query statistics"""
         if schema:
             stats = self.stats[schema]
+            total, operations = self._schema_latency(schema)
+            latency = total.describe()
+            stats.avg_query_time_ms = latency["avg_ms"]
             return {
                 "schema": schema.value,
                 "total_queries": stats.total_queries,
@@ -576,17 +2087,51 @@ class PostgreSQLMCPServer:
                 "total_updates": stats.total_updates,
                 "total_deletes": stats.total_deletes,
                 "slow_queries": stats.slow_queries,
-                "avg_query_time_ms": avg_query_time
+                "avg_query_time_ms": stats.avg_query_time_ms,
+                "latency": latency,
+                "operations": operations,
+                "id_lookup_cache": (
+                    self.repository_ids if schema == DataSchema.CODING else self.project_ids
+                ).describe()
             }
         else:
+            overall = LatencyWindow(self.latency_window_size * max(1, len(self.latency)))
+            for window in self.latency.values():
+                overall.merge(window)
             all_stats = {
-                "avg_query_time_ms": avg_query_time,
+                "avg_query_time_ms": overall.describe()["avg_ms"],
+                "latency": overall.describe(),
+                "slow_query_threshold_ms": self.slow_query_ms,
+                "pools": self.describe_pools(),
+                "replicas": self.describe_replicas(),
+                "graph_snapshot": self.graph_snapshot.describe() if self.graph_snapshot else None,
                 "schemas": {}
             }
             for s in DataSchema:
                 all_stats["schemas"][s.value] = await self.get_stats(s)
+            if self.slow_query_log_enabled:
+                all_stats["slow_query_log"] = list(self.slow_query_log)
             return all_stats
     
+    def describe_pools(self) -> List[Dict[str, Any]]:
+        """Acquire waits, usage and timeouts of the primary and replica pools"""
+        pools = [self.pool] + [r.pool for r in self.replicas]
+        return [pool.describe() for pool in pools if pool is not None]
+    
+    def describe_replicas(self) -> List[Dict[str, Any]]:
+        """Routing state of each read replica, for stats and health output"""
+        return [
+            {
+                "replica": r.name,
+                "healthy": r.healthy,
+                "lag_seconds": r.lag_seconds,
+                "reads": r.reads,
+                "failures": r.failures,
+                "last_error": r.last_error
+            }
+            for r in self.replicas
+        ]
+    
     async def health_check(self) -> Dict[str, Any]:
         """Health check endpoint"""
         try:
@@ -603,6 +2148,8 @@ class PostgreSQLMCPServer:
                 "version": self.version,
                 "port": self.port,
                 "pool_status": pool_status,
+                "pools": self.describe_pools(),
+                "replicas": self.describe_replicas(),
                 "asyncpg_available": ASYNCPG_AVAILABLE
             }
             
@@ -617,7 +2164,14 @@ class PostgreSQLMCPServer:
     # MCP Protocol Methods
     
     async def handle_call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle MCP tool calls"""
+        """Handle MCP tool calls; an optional session_id argument enables read-your-writes routing"""
+        session_id = arguments.get("session_id")
+        if session_id:
+            with self.session(session_id):
+                return await self._handle_call_tool(name, arguments)
+        return await self._handle_call_tool(name, arguments)
+    
+    async def _handle_call_tool(self, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         if name == "add_repository":
             repo_name = arguments.get("name", "")
             language = arguments.get("language", "")
@@ -637,9 +2191,13 @@ class PostgreSQLMCPServer:
         elif name == "get_repository_patterns":
             repo_name = arguments.get("repository_name", "")
             pattern_type = arguments.get("pattern_type")
+            limit = arguments.get("limit", 100)
+            after = arguments.get("after")
+            metadata_filter = arguments.get("metadata_filter")
             
-            patterns = await self.get_repository_patterns(repo_name, pattern_type)
-            return {"patterns": patterns, "count": len(patterns)}
+            patterns = await self.get_repository_patterns(repo_name, pattern_type, limit, after, metadata_filter)
+            next_cursor = self.pattern_cursor(patterns[-1]) if len(patterns) == limit else None
+            return {"patterns": patterns, "count": len(patterns), "next_cursor": next_cursor}
             
         elif name == "add_project":
             project_id = arguments.get("project_id", "")
@@ -667,9 +2225,84 @@ class PostgreSQLMCPServer:
             project_id = arguments.get("project_id", "")
             insight_type = arguments.get("insight_type")
             limit = arguments.get("limit", 50)
+            after = arguments.get("after")
+            metadata_filter = arguments.get("metadata_filter")
+            
+            insights = await self.get_project_insights(project_id, insight_type, limit, after, metadata_filter)
+            next_cursor = self.insight_cursor(insights[-1]) if len(insights) == limit else None
+            return {"insights": insights, "count": len(insights), "next_cursor": next_cursor}
+            
+        elif name == "add_metrics_bulk":
+            result = await self.add_metrics_bulk(arguments.get("metrics", []))
+            return result.to_dict()
+            
+        elif name == "add_insights_bulk":
+            result = await self.add_insights_bulk(arguments.get("insights", []))
+            return result.to_dict()
+            
+        elif name == "add_code_patterns_bulk":
+            result = await self.add_code_patterns_bulk(arguments.get("patterns", []))
+            return result.to_dict()
+            
+        elif name == "add_relationships_bulk":
+            result = await self.add_relationships_bulk(arguments.get("relationships", []))
+            return result.to_dict()
+            
+        elif name == "get_project_metrics":
+            project_id = arguments.get("project_id", "")
+            metric_name = arguments.get("metric_name")
+            hours = arguments.get("time_range_hours")
+            resolution = arguments.get("resolution", "auto")
+            limit = arguments.get("limit", self.max_metric_points)
+            metadata_filter = arguments.get("metadata_filter")
+            
+            metrics = await self.get_project_metrics(
+                project_id, metric_name,
+                timedelta(hours=hours) if hours else None,
+                resolution, limit, metadata_filter
+            )
+            return {"metrics": metrics, "count": len(metrics)}
+            
+        elif name == "get_neighbors":
+            neighbors = await self.get_neighbors(
+                arguments.get("node_type", ""),
+                int(arguments.get("node_id", 0)),
+                arguments.get("direction", "both"),
+                arguments.get("relationship_type"),
+                arguments.get("limit", 100)
+            )
+            return {"neighbors": neighbors, "count": len(neighbors)}
+            
+        elif name == "traverse_relationships":
+            nodes = await self.traverse_relationships(
+                arguments.get("node_type", ""),
+                int(arguments.get("node_id", 0)),
+                arguments.get("direction", "out"),
+                arguments.get("max_depth", 2),
+                arguments.get("fanout", 50),
+                arguments.get("relationship_type"),
+                arguments.get("limit", 1000)
+            )
+            return {"nodes": nodes, "count": len(nodes)}
+            
+        elif name == "find_shortest_path":
+            path = await self.find_shortest_path(
+                arguments.get("source_type", ""),
+                int(arguments.get("source_id", 0)),
+                arguments.get("target_type", ""),
+                int(arguments.get("target_id", 0)),
+                arguments.get("direction", "out"),
+                arguments.get("relationship_type"),
+                arguments.get("max_hops", 4),
+                arguments.get("fanout", 50)
+            )
+            return {"found": path is not None, **(path or {})}
             
-            insights = await self.get_project_insights(project_id, insight_type, limit)
-            return {"insights": insights, "count": len(insights)}
+        elif name == "get_slow_queries":
+            limit = arguments.get("limit", 20)
+            entries = list(self.slow_query_log)[-limit:]
+            return {"enabled": self.slow_query_log_enabled, "threshold_ms": self.slow_query_ms,
+                    "queries": entries[::-1], "count": len(entries)}
             
         elif name == "get_stats":
             schema_str = arguments.get("schema")
@@ -698,7 +2331,7 @@ class PostgreSQLMCPServer:
             },
             {
                 "name": "add_code_pattern",
-                "description": "Add a code pattern",
+                "description": "Record a code pattern; repeated observations increase its frequency",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
@@ -709,6 +2342,21 @@ class PostgreSQLMCPServer:
                     "required": ["repository_name", "pattern_type", "pattern_data"]
                 }
             },
+            {
+                "name": "get_repository_patterns",
+                "description": "Get code patterns for a repository, most frequent first (paginated; patterns whose frequency changes between pages may be skipped or repeated)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "repository_name": {"type": "string"},
+                        "pattern_type": {"type": "string"},
+                        "limit": {"type": "integer", "default": 100},
+                        "after": {"type": "string", "description": "next_cursor from the previous page"},
+                        "metadata_filter": {"type": "object", "description": "Only patterns whose pattern_data contains this object (@>)"}
+                    },
+                    "required": ["repository_name"]
+                }
+            },
             {
                 "name": "add_project",
                 "description": "Add a business project",
@@ -739,6 +2387,201 @@ class PostgreSQLMCPServer:
                     },
                     "required": ["project_id", "insight_type", "content"]
                 }
+            },
+            {
+                "name": "get_project_insights",
+                "description": "Get insights for a project, newest first (paginated)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {"type": "string"},
+                        "insight_type": {"type": "string"},
+                        "limit": {"type": "integer", "default": 50},
+                        "after": {"type": "string", "description": "next_cursor from the previous page"},
+                        "metadata_filter": {"type": "object", "description": "Only insights whose metadata contains this object (@>)"}
+                    },
+                    "required": ["project_id"]
+                }
+            },
+            {
+                "name": "get_project_metrics",
+                "description": "Get project metrics, raw or from minute/hour/day rollups",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {"type": "string"},
+                        "metric_name": {"type": "string"},
+                        "time_range_hours": {"type": "number", "description": "Only points from the last N hours"},
+                        "resolution": {
+                            "type": "string",
+                            "enum": ["auto", "raw", "minute", "hour", "day"],
+                            "default": "auto",
+                            "description": "auto picks the cheapest rollup for the range"
+                        },
+                        "limit": {"type": "integer", "default": 1000},
+                        "metadata_filter": {"type": "object", "description": "Only metrics whose metadata contains this object (@>)"}
+                    },
+                    "required": ["project_id"]
+                }
+            },
+            {
+                "name": "get_slow_queries",
+                "description": "Recent slow statements with parameter shapes and sampled EXPLAIN (ANALYZE, BUFFERS) plans",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "limit": {"type": "integer", "default": 20}
+                    }
+                }
+            },
+            {
+                "name": "get_neighbors",
+                "description": "Entities directly related to an entity, strongest relationship first",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "node_type": {"type": "string", "description": "Entity type (as in source_type/target_type)"},
+                        "node_id": {"type": "integer"},
+                        "direction": {"type": "string", "enum": ["out", "in", "both"], "default": "both"},
+                        "relationship_type": {"type": "string"},
+                        "limit": {"type": "integer", "default": 100}
+                    },
+                    "required": ["node_type", "node_id"]
+                }
+            },
+            {
+                "name": "traverse_relationships",
+                "description": "Entities within k hops of an entity, following the strongest relationships",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "node_type": {"type": "string"},
+                        "node_id": {"type": "integer"},
+                        "direction": {"type": "string", "enum": ["out", "in", "both"], "default": "out"},
+                        "max_depth": {"type": "integer", "default": 2},
+                        "fanout": {"type": "integer", "default": 50, "description": "Relationships expanded per entity"},
+                        "relationship_type": {"type": "string"},
+                        "limit": {"type": "integer", "default": 1000}
+                    },
+                    "required": ["node_type", "node_id"]
+                }
+            },
+            {
+                "name": "find_shortest_path",
+                "description": "Strongest path between two entities (each relationship costs 1 / strength)",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "source_type": {"type": "string"},
+                        "source_id": {"type": "integer"},
+                        "target_type": {"type": "string"},
+                        "target_id": {"type": "integer"},
+                        "direction": {"type": "string", "enum": ["out", "in", "both"], "default": "out"},
+                        "relationship_type": {"type": "string"},
+                        "max_hops": {"type": "integer", "default": 4},
+                        "fanout": {"type": "integer", "default": 50}
+                    },
+                    "required": ["source_type", "source_id", "target_type", "target_id"]
+                }
+            },
+            {
+                "name": "add_metrics_bulk",
+                "description": "Add many business metrics in one call (COPY-based); returns per-row success",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "metrics": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "project_id": {"type": "string"},
+                                    "metric_name": {"type": "string"},
+                                    "metric_value": {"type": "number"},
+                                    "unit": {"type": "string"},
+                                    "timestamp": {"type": "string", "description": "ISO 8601, defaults to now"},
+                                    "metadata": {"type": "object"}
+                                },
+                                "required": ["project_id", "metric_name", "metric_value"]
+                            }
+                        }
+                    },
+                    "required": ["metrics"]
+                }
+            },
+            {
+                "name": "add_insights_bulk",
+                "description": "Add many business insights in one call (COPY-based); returns per-row success",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "insights": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "project_id": {"type": "string"},
+                                    "insight_type": {"type": "string"},
+                                    "content": {"type": "string"},
+                                    "confidence_score": {"type": "number", "default": 0.0},
+                                    "source": {"type": "string", "default": "unknown"},
+                                    "metadata": {"type": "object"}
+                                },
+                                "required": ["project_id", "insight_type", "content"]
+                            }
+                        }
+                    },
+                    "required": ["insights"]
+                }
+            },
+            {
+                "name": "add_code_patterns_bulk",
+                "description": "Record many code patterns in one call (batched upsert); returns per-row success",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "patterns": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "repository_name": {"type": "string"},
+                                    "pattern_type": {"type": "string"},
+                                    "pattern_data": {"type": "object"}
+                                },
+                                "required": ["repository_name", "pattern_type", "pattern_data"]
+                            }
+                        }
+                    },
+                    "required": ["patterns"]
+                }
+            },
+            {
+                "name": "add_relationships_bulk",
+                "description": "Add many entity relationships in one call (COPY-based); returns per-row success",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "relationships": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "source_type": {"type": "string"},
+                                    "source_id": {"type": "integer"},
+                                    "target_type": {"type": "string"},
+                                    "target_id": {"type": "integer"},
+                                    "relationship_type": {"type": "string"},
+                                    "strength": {"type": "number", "default": 1.0},
+                                    "metadata": {"type": "object"}
+                                },
+                                "required": ["source_type", "source_id", "target_type",
+                                             "target_id", "relationship_type"]
+                            }
+                        }
+                    },
+                    "required": ["relationships"]
+                }
             }
         ]
 
@@ -749,6 +2592,11 @@ async def main():
     server = PostgreSQLMCPServer()
     await server.initialize()
     
+    metrics_port = get_config_value("postgres_metrics_port")
+    if PROMETHEUS_AVAILABLE and metrics_port:
+        start_http_server(int(metrics_port))
+        print(f"📊 PostgreSQL metrics exposed on port {metrics_port}")
+    
     # In real implementation, would start MCP protocol server
     print(f"🚀 PostgreSQL MCP Server running on port {server.port}")
     
@@ -756,11 +2604,11 @@ async def main():
     try:
         while True:
             await asyncio.sleep(3600)
-            # Could add periodic maintenance here
+            await server.maintain_metric_partitions()
     except KeyboardInterrupt:
         print("\n👋 Shutting down PostgreSQL Server")
-        if server.pool:
-            await server.pool.close()
+    finally:
+        await server.close()
 
 
 if __name__ == "__main__":
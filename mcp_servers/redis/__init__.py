@@ -3,6 +3,8 @@ Redis MCP Server - Tier 3 of the Hybrid Memory Architecture
 
 This module provides high-performance caching with:
 - Separate databases for coding and business data
+- Native asyncio connection pools per cache type
+- Optional in-process L1 cache with pub/sub invalidation
 - LRU eviction policies
 - Session-based caching
 - Aggregation caching for dashboards
@@ -0,0 +1,302 @@
+"""
+Binary serialization codecs for the Redis cache tier
+Compact encodings with a one-byte header so old and new formats can coexist
+"""
+
+import pickle
+import sys
+from array import array
+from datetime import date, datetime, time
+from enum import IntEnum
+from typing import Any, Optional, Tuple
+
+# Optional codecs - each one is used only when its package is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+
+class Codec(IntEnum):
+    """Payload encodings, stored in the low nibble of the header byte"""
+    PICKLE = 0x01
+    ORJSON = 0x02
+    MSGPACK = 0x03
+    FLOAT32 = 0x04  # Raw little-endian float32 buffer for embedding vectors
+    FLOAT64 = 0x05  # Raw little-endian float64 buffer, for vectors kept at full precision
+
+
+class Compression(IntEnum):
+    """Compression schemes, stored in bits 4-5 of the header byte"""
+    NONE = 0x00
+    ZSTD = 0x10
+    LZ4 = 0x20
+
+
+CODEC_MASK = 0x0F
+COMPRESSION_MASK = 0x30
+
+# Values written before the codec layer existed are bare pickles, which always
+# start with the PROTO opcode (0x80). Header bytes stay below it.
+LEGACY_PICKLE_PREFIX = 0x80
+
+# Below this size, payloads decode faster uncompressed than the bytes saved are worth
+DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024
+
+# With pickle allowed, types JSON would change (datetimes, dataclasses, subclasses)
+# are passed through to the pickle fallback so they round-trip exactly
+ORJSON_STRICT_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+    | orjson.OPT_PASSTHROUGH_SUBCLASS
+) if ORJSON_AVAILABLE else 0
+
+# Without it they are stored as their plain equivalents instead
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY if ORJSON_AVAILABLE else 0
+
+
+def plain_value(value: Any) -> Any:
+    """Plain equivalent of a value JSON/msgpack cannot store, for the ``default`` hooks"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if NUMPY_AVAILABLE:
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+    if isinstance(value, array):
+        return value.tolist()
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+class PickleDisabledError(ValueError):
+    """A cache value is a pickle and this codec may not unpickle it"""
+
+
+class CacheCodec:
+    """
+    Encodes cache values as ``header byte + payload``
+
+    - Float vectors (numpy arrays, ``array('f'/'d')``) become raw float32
+      buffers. float64 vectors are narrowed, which halves them and keeps the
+      precision embedding models produce; with ``narrow_vectors=False`` they
+      are stored as float64 instead.
+    - Dict/list payloads use orjson (or msgpack). With ``allow_pickle``,
+      typing is strict and values that would not round-trip exactly fall
+      back to pickle. Without it, datetimes become ISO strings and nested
+      arrays become lists; values neither codec can store raise TypeError.
+    - Payloads of at least ``compression_threshold`` bytes are compressed
+      with zstd or lz4 when that makes them smaller.
+    - Pickle is off by default, since unpickling runs whatever the cached
+      bytes say. Bare pickles written before this codec existed decode only
+      with ``legacy_pickle``, a rollout flag for while old entries drain;
+      refused pickles raise PickleDisabledError.
+    """
+
+    def __init__(self,
+                 preferred: str = "auto",
+                 compression: str = "auto",
+                 compression_threshold: int = DEFAULT_COMPRESSION_THRESHOLD,
+                 allow_pickle: bool = False,
+                 legacy_pickle: bool = False,
+                 narrow_vectors: bool = True):
+        self.allow_pickle = allow_pickle
+        self.legacy_pickle = legacy_pickle
+        self.narrow_vectors = narrow_vectors
+        self.preferred = self._resolve_codec(preferred, allow_pickle)
+        self.compression = self._resolve_compression(compression)
+        self.compression_threshold = compression_threshold
+
+        # Structured codecs to try in order before falling back to pickle
+        self._structured = [self.preferred] if self.preferred != Codec.PICKLE else []
+        for codec, available in ((Codec.ORJSON, ORJSON_AVAILABLE), (Codec.MSGPACK, MSGPACK_AVAILABLE)):
+            if available and codec not in self._structured and self._structured:
+                self._structured.append(codec)
+
+        self._zstd_compressor = zstandard.ZstdCompressor(level=3) if self.compression == Compression.ZSTD else None
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if ZSTD_AVAILABLE else None
+
+    @staticmethod
+    def _resolve_codec(name: str, allow_pickle: bool) -> Codec:
+        """Pick the structured-data codec, honouring what is installed and allowed"""
+        name = (name or "auto").lower()
+        if name == "msgpack" and MSGPACK_AVAILABLE:
+            return Codec.MSGPACK
+        if name == "orjson" and ORJSON_AVAILABLE:
+            return Codec.ORJSON
+        if name == "pickle" and allow_pickle:
+            return Codec.PICKLE
+        # orjson decodes typical search payloads about a third faster than msgpack
+        if ORJSON_AVAILABLE:
+            return Codec.ORJSON
+        if MSGPACK_AVAILABLE:
+            return Codec.MSGPACK
+        return Codec.PICKLE
+
+    @staticmethod
+    def _resolve_compression(name: str) -> Compression:
+        """Pick the compression scheme, honouring what is installed"""
+        name = (name or "auto").lower()
+        if name == "none":
+            return Compression.NONE
+        if name == "zstd" and ZSTD_AVAILABLE:
+            return Compression.ZSTD
+        if name == "lz4" and LZ4_AVAILABLE:
+            return Compression.LZ4
+        if name == "auto":
+            if ZSTD_AVAILABLE:
+                return Compression.ZSTD
+            if LZ4_AVAILABLE:
+                return Compression.LZ4
+        return Compression.NONE
+
+    # Encoding
+
+    def encode(self, value: Any) -> bytes:
+        """Serialize a value to ``header + payload``"""
+        codec, payload = self._encode_payload(value)
+        compression = Compression.NONE
+
+        if self.compression != Compression.NONE and len(payload) >= self.compression_threshold:
+            compressed = self._compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                compression = self.compression
+
+        return bytes((codec | compression,)) + payload
+
+    def _encode_payload(self, value: Any) -> Tuple[Codec, bytes]:
+        """Encode with the most compact codec that round-trips the value"""
+        vector = self._encode_vector(value)
+        if vector is not None:
+            return vector
+
+        for codec in self._structured:
+            try:
+                if codec == Codec.ORJSON:
+                    if self.allow_pickle:
+                        return codec, orjson.dumps(value, option=ORJSON_STRICT_OPTIONS)
+                    return codec, orjson.dumps(value, default=plain_value, option=ORJSON_OPTIONS)
+                if self.allow_pickle:
+                    return codec, msgpack.packb(value, use_bin_type=True, strict_types=True)
+                return codec, msgpack.packb(value, use_bin_type=True, default=plain_value)
+            except (TypeError, ValueError, OverflowError):
+                continue
+
+        if not self.allow_pickle:
+            raise TypeError(f"Cannot encode {type(value).__name__} without pickle")
+        return Codec.PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _encode_vector(self, value: Any) -> Optional[Tuple[Codec, bytes]]:
+        """Raw little-endian bytes for 1-D float vectors, else None"""
+        if NUMPY_AVAILABLE and isinstance(value, np.ndarray):
+            if value.ndim != 1 or value.dtype.kind != "f":
+                return None
+            if value.dtype.itemsize > 4 and not self.narrow_vectors:
+                return Codec.FLOAT64, value.astype("<f8", copy=False).tobytes()
+            return Codec.FLOAT32, value.astype("<f4", copy=False).tobytes()
+
+        if isinstance(value, array) and value.typecode in ("f", "d"):
+            codec, typecode = (Codec.FLOAT64, "d") if value.typecode == "d" and not self.narrow_vectors else (Codec.FLOAT32, "f")
+            buffer = value if value.typecode == typecode else array(typecode, value)
+            if sys.byteorder == "big":
+                buffer = array(typecode, buffer)
+                buffer.byteswap()
+            return codec, buffer.tobytes()
+
+        return None
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.compression == Compression.ZSTD:
+            return self._zstd_compressor.compress(payload)
+        return lz4.frame.compress(payload)
+
+    # Decoding
+
+    def decode(self, data: Optional[bytes]) -> Any:
+        """Deserialize a value written by ``encode`` or by the legacy pickle path"""
+        if not data:
+            return None
+
+        header = data[0]
+        if header >= LEGACY_PICKLE_PREFIX:
+            if not self.legacy_pickle:
+                raise PickleDisabledError("Refusing to unpickle legacy cache value (legacy pickle decoding disabled)")
+            return pickle.loads(data)
+
+        codec = Codec(header & CODEC_MASK)
+        compression = Compression(header & COMPRESSION_MASK)
+        payload = self._decompress(compression, memoryview(data)[1:])
+
+        if codec == Codec.MSGPACK:
+            return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+        if codec == Codec.ORJSON:
+            return orjson.loads(payload)
+        if codec == Codec.FLOAT32:
+            return self._decode_vector(payload, "f")
+        if codec == Codec.FLOAT64:
+            return self._decode_vector(payload, "d")
+        return self._loads_pickle(payload)
+
+    def _decompress(self, compression: Compression, payload: memoryview) -> bytes:
+        if compression == Compression.NONE:
+            return payload
+        if compression == Compression.ZSTD:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstd-compressed cache value but zstandard is not installed")
+            return self._zstd_decompressor.decompress(payload)
+        if not LZ4_AVAILABLE:
+            raise RuntimeError("lz4-compressed cache value but lz4 is not installed")
+        return lz4.frame.decompress(payload)
+
+    @staticmethod
+    def _decode_vector(payload, typecode: str) -> Any:
+        if NUMPY_AVAILABLE:
+            return np.frombuffer(payload, dtype="<f4" if typecode == "f" else "<f8").copy()
+
+        vector = array(typecode)
+        vector.frombytes(bytes(payload))
+        if sys.byteorder == "big":
+            vector.byteswap()
+        return vector.tolist()
+
+    def _loads_pickle(self, payload) -> Any:
+        if not self.allow_pickle:
+            raise PickleDisabledError("Refusing to unpickle cache value (pickle disabled)")
+        return pickle.loads(payload)
+
+    def describe(self) -> dict:
+        """Active codec configuration, for stats and health output"""
+        return {
+            "codec": self.preferred.name.lower(),
+            "compression": self.compression.name.lower(),
+            "compression_threshold": self.compression_threshold,
+            "allow_pickle": self.allow_pickle,
+            "legacy_pickle": self.legacy_pickle,
+            "narrow_vectors": self.narrow_vectors
+        }
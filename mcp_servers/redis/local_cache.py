@@ -0,0 +1,98 @@
+"""
+In-process L1 cache for the Redis cache tier
+Size- and TTL-bounded LRU holding encoded values in front of Redis (L2)
+"""
+
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class LocalLRUCache:
+    """
+    Bounded LRU of encoded cache values
+
+    Values are kept in their encoded form so callers mutating a returned
+    object can never corrupt the shared L1 copy, and so the byte budget is
+    exact. Entries expire after ``ttl`` seconds to bound staleness when an
+    invalidation message is missed.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        # key -> (expires_at, encoded value)
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.current_bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the encoded value, refreshing its LRU position"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None):
+        """Store an encoded value, evicting least recently used entries past the budget"""
+        size = len(data)
+        if size > self.max_bytes:
+            # Never let one huge value flush the whole L1
+            self._remove(key)
+            return
+
+        self._remove(key)
+        effective_ttl = self.ttl if ttl is None else min(self.ttl, ttl)
+        self._entries[key] = (time.monotonic() + effective_ttl, data)
+        self.current_bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+            oldest_key, (_, oldest) = self._entries.popitem(last=False)
+            self.current_bytes -= len(oldest)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._remove(key)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        return sum(1 for key in keys if self._remove(key))
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Drop entries whose key matches a Redis-style glob pattern"""
+        matched = [key for key in self._entries if fnmatchcase(key, pattern)]
+        return self.delete_many(matched)
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.current_bytes -= len(entry[1])
+        return True
+
+    def describe(self) -> Dict[str, float]:
+        """Current occupancy, for stats output"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_mb": self.current_bytes / (1024 * 1024),
+            "max_memory_mb": self.max_bytes / (1024 * 1024),
+            "ttl": self.ttl,
+            "evictions": self.evictions
+        }
@@ -6,9 +6,12 @@ High-performance caching with separation between coding and business data
 import asyncio
 import json
 import time
-import pickle
 import hashlib
-from typing import Dict, List, Any, Optional, Union
+import math
+import random
+import re
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
@@ -19,16 +22,27 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from backend.core.auto_esc_config import get_config_value
+from mcp_servers.redis.cache_codec import DEFAULT_COMPRESSION_THRESHOLD, CacheCodec, PickleDisabledError
+from mcp_servers.redis.local_cache import LocalLRUCache
 
 # Try to import redis
 try:
     import redis
     from redis import asyncio as aioredis
+    from redis.asyncio.cluster import ClusterNode as AsyncClusterNode, RedisCluster as AsyncRedisCluster
+    from redis.cluster import ClusterNode, RedisCluster
     REDIS_AVAILABLE = True
 except ImportError:
     REDIS_AVAILABLE = False
     print("⚠️  Redis not installed. Install with: pip install redis")
 
+# Try to import prometheus_client
+try:
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
 
 class CacheType(Enum):
     """Cache types with different TTL strategies"""
@@ -37,17 +51,251 @@ class CacheType(Enum):
     AGGREGATION = 2  # DB 2: Dashboard aggregations
 
 
+class ComputeSource(Enum):
+    """How get_or_compute_with_source obtained a value"""
+    HIT = "hit"  # Fresh cached value
+    STALE = "stale"  # Expired cached value, served while a refresh runs
+    COMPUTED = "computed"  # The producer ran in this call
+    COALESCED = "coalesced"  # Another caller or worker computed it while this one waited
+
+
 @dataclass
 class CacheStats:
     """Statistics for cache performance"""
     hits: int = 0
+    l1_hits: int = 0  # Served from the in-process cache
+    l2_hits: int = 0  # Served from Redis
     misses: int = 0
     sets: int = 0
-    evictions: int = 0
+    evictions: int = 0  # Instance-wide evicted_keys from INFO stats
+    budget_evictions: int = 0  # Evicted by this tier's application-level budget
+    expired_keys: int = 0  # Instance-wide expired_keys from INFO stats
     memory_usage_mb: float = 0.0
     keys_count: int = 0
 
 
+# Prometheus metrics (module level so several server instances share one registry entry)
+if PROMETHEUS_AVAILABLE:
+    CACHE_HITS = Counter(
+        "sophia_redis_cache_hits_total",
+        "Cache hits by cache type and tier (l1 = in-process, l2 = Redis)",
+        ["cache_type", "tier"]
+    )
+    CACHE_MISSES = Counter(
+        "sophia_redis_cache_misses_total",
+        "Cache misses by cache type",
+        ["cache_type"]
+    )
+    CACHE_SETS = Counter(
+        "sophia_redis_cache_sets_total",
+        "Values written by cache type",
+        ["cache_type"]
+    )
+    CACHE_LATENCY = Histogram(
+        "sophia_redis_cache_operation_seconds",
+        "Cache operation latency",
+        ["cache_type", "operation"],
+        buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    )
+    CACHE_PAYLOAD_BYTES = Histogram(
+        "sophia_redis_cache_payload_bytes",
+        "Encoded value size read from or written to Redis",
+        ["cache_type", "operation"],
+        buckets=(64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+    )
+    CACHE_KEYS = Gauge(
+        "sophia_redis_cache_keys",
+        "Keys in the Redis database of each cache type",
+        ["cache_type"]
+    )
+    CACHE_MEMORY_BYTES = Gauge(
+        "sophia_redis_cache_memory_bytes",
+        "Estimated memory used by each cache type's database (sampled MEMORY USAGE x keys)",
+        ["cache_type"]
+    )
+    CACHE_BUDGET_EVICTIONS = Counter(
+        "sophia_redis_cache_budget_evictions_total",
+        "Keys evicted because a cache type exceeded its application-level memory budget",
+        ["cache_type"]
+    )
+    CACHE_BUDGET_USED_BYTES = Gauge(
+        "sophia_redis_cache_budget_used_bytes",
+        "Bytes accounted against each cache type's memory budget",
+        ["cache_type"]
+    )
+    REDIS_EVICTED_KEYS = Gauge(
+        "sophia_redis_evicted_keys",
+        "Keys evicted by maxmemory policy since Redis start (INFO stats, instance wide)"
+    )
+    REDIS_EXPIRED_KEYS = Gauge(
+        "sophia_redis_expired_keys",
+        "Keys expired by TTL since Redis start (INFO stats, instance wide)"
+    )
+
+# Marker for values written by get_or_compute, which carry refresh metadata
+SWR_ENVELOPE_KEY = "__swr__"
+
+# Record the encoded size of written keys in a namespace's budget and pick
+# the oldest-written keys to evict while the namespace is over budget.
+# Keys whose TTL ran out since they were charged are credited first; the
+# script can't EXISTS data keys (other cluster slots), so it goes by the
+# expiry deadline recorded at write time.
+# KEYS: write-order index (zset), per-key sizes (hash), total bytes (string),
+#       expiry deadlines (zset)
+# ARGV: budget bytes, now, max evictions, max expired credits,
+#       then key/size/ttl triples
+ACCOUNT_WRITES_SCRIPT = """
+local budget = tonumber(ARGV[1])
+local now = tonumber(ARGV[2])
+local max_evictions = tonumber(ARGV[3])
+local max_expired = tonumber(ARGV[4])
+local delta = 0
+local expired = redis.call("zrangebyscore", KEYS[4], "-inf", now, "LIMIT", 0, max_expired)
+for _, key in ipairs(expired) do
+    delta = delta - tonumber(redis.call("hget", KEYS[2], key) or "0")
+    redis.call("hdel", KEYS[2], key)
+    redis.call("zrem", KEYS[1], key)
+    redis.call("zrem", KEYS[4], key)
+end
+for i = 5, #ARGV, 3 do
+    local key = ARGV[i]
+    local size = tonumber(ARGV[i + 1])
+    local old = tonumber(redis.call("hget", KEYS[2], key) or "0")
+    redis.call("hset", KEYS[2], key, size)
+    redis.call("zadd", KEYS[1], now, key)
+    redis.call("zadd", KEYS[4], now + tonumber(ARGV[i + 2]), key)
+    delta = delta + size - old
+end
+local used = redis.call("incrby", KEYS[3], delta)
+local victims = {}
+while used > budget and #victims < max_evictions do
+    local oldest = redis.call("zpopmin", KEYS[1])
+    if #oldest == 0 then
+        break
+    end
+    local size = tonumber(redis.call("hget", KEYS[2], oldest[1]) or "0")
+    redis.call("hdel", KEYS[2], oldest[1])
+    redis.call("zrem", KEYS[4], oldest[1])
+    used = redis.call("decrby", KEYS[3], size)
+    table.insert(victims, oldest[1])
+end
+return victims
+"""
+
+# Remove deleted keys from a namespace's budget
+# KEYS: write-order index (zset), per-key sizes (hash), total bytes (string),
+#       expiry deadlines (zset)
+# ARGV: deleted keys
+RELEASE_WRITES_SCRIPT = """
+local freed = 0
+for i = 1, #ARGV do
+    local size = redis.call("hget", KEYS[2], ARGV[i])
+    if size then
+        freed = freed + tonumber(size)
+        redis.call("hdel", KEYS[2], ARGV[i])
+        redis.call("zrem", KEYS[1], ARGV[i])
+        redis.call("zrem", KEYS[4], ARGV[i])
+    end
+end
+if freed > 0 then
+    redis.call("decrby", KEYS[3], freed)
+end
+return freed
+"""
+
+# Multi-key commands whose keys may live in different cluster slots
+CROSS_SLOT_COMMANDS = {"delete", "unlink"}
+
+# Approximate per-key Redis overhead (dict entry, robj, expiry) added to the encoded size
+KEY_OVERHEAD_BYTES = 64
+
+
+def hash_tag(value: str) -> str:
+    """
+    Wrap a key component in a Redis Cluster hash tag
+    
+    Only the text inside the first {...} is hashed, so keys sharing a tag
+    land on the same slot and can be used together in multi-key commands
+    and Lua scripts.
+    """
+    return f"{{{value}}}"
+
+
+def strip_hash_tags(value: str) -> str:
+    """A key or pattern as it was written before hash tags: braces removed"""
+    return re.sub(r"\{([^{}]*)\}", r"\1", value)
+
+
+def parse_cluster_nodes(value: str) -> List[tuple]:
+    """Parse "host1:port1,host2:port2" into (host, port) pairs"""
+    nodes = []
+    for node in (value or "").split(","):
+        node = node.strip()
+        if node:
+            host, _, port = node.rpartition(":")
+            nodes.append((host or "localhost", int(port or "6379")))
+    return nodes
+
+
+def _merge_node_info(info: Any) -> Dict[str, Any]:
+    """Collapse a cluster-wide INFO reply ({node: info}) into one summed dict"""
+    if not isinstance(info, dict) or not info or not all(isinstance(v, dict) for v in info.values()):
+        return info if isinstance(info, dict) else {}
+    # A single-node INFO section also maps names to dicts (e.g. keyspace), so
+    # only treat it as per-node when keys look like host:port
+    if not all(":" in str(k) for k in info):
+        return info
+    
+    def merge(target: Dict[str, Any], source: Dict[str, Any]):
+        for key, value in source.items():
+            if isinstance(value, dict):
+                merge(target.setdefault(key, {}), value)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                target[key] = target.get(key, 0) + value
+            else:
+                target.setdefault(key, value)
+    
+    merged: Dict[str, Any] = {}
+    for node_info in info.values():
+        merge(merged, node_info)
+    return merged
+
+
+def parse_memory_size(value: Union[str, int]) -> int:
+    """Parse Redis-style memory sizes such as "2gb", "512mb" or 1048576 into bytes"""
+    if isinstance(value, int):
+        return value
+    
+    text = str(value).strip().lower()
+    for suffix, factor in (("gb", 1024 ** 3), ("mb", 1024 ** 2), ("kb", 1024), ("b", 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+# Release a single-flight lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Scripts are loaded once per connection and run by SHA1 (EVALSHA); a server
+# that lost its script cache (restart, failover, SCRIPT FLUSH) answers NOSCRIPT
+# and the call is repeated once with EVAL, which loads the script again
+LUA_SCRIPTS = {
+    hashlib.sha1(script.encode()).hexdigest(): script
+    for script in (ACCOUNT_WRITES_SCRIPT, RELEASE_WRITES_SCRIPT, RELEASE_LOCK_SCRIPT)
+}
+SCRIPT_SHAS = {script: sha for sha, script in LUA_SCRIPTS.items()}
+
+
+def is_noscript(result: Any) -> bool:
+    """Whether a reply (or raised error) is Redis's NOSCRIPT"""
+    return REDIS_AVAILABLE and isinstance(result, redis.exceptions.NoScriptError)
+
+
 class RedisCacheMCPServer:
     """
     MCP Server for Redis caching operations
@@ -59,7 +307,15 @@ class RedisCacheMCPServer:
         self.version = "1.0.0"
         self.port = 9503  # Redis MCP server port
         
-        # Redis clients for different cache types
+        # Native asyncio clients (primary path), one connection pool per cache type
+        self.async_clients: Dict[CacheType, Optional[aioredis.Redis]] = {
+            CacheType.CODING: None,
+            CacheType.BUSINESS: None,
+            CacheType.AGGREGATION: None
+        }
+        
+        # Synchronous clients, only used as a fallback when the asyncio
+        # client cannot be created; calls are run in a worker thread
         self.clients: Dict[CacheType, Optional[redis.Redis]] = {
             CacheType.CODING: None,
             CacheType.BUSINESS: None,
@@ -72,22 +328,78 @@ class RedisCacheMCPServer:
                 "db": 0,
                 "ttl": 3600,  # 1 hour default
                 "max_memory": "2gb",
-                "eviction_policy": "allkeys-lru"
+                "eviction_policy": "allkeys-lru",
+                "pool_size": 50,  # Hot path for IDE/agent lookups
+                "l1_max_entries": 2000,
+                "l1_max_bytes": 32 * 1024 * 1024,
+                "l1_ttl": 30,
+                "ttl_jitter": 0.1  # Spread batch expiry over the last 10% of the TTL
             },
             CacheType.BUSINESS: {
                 "db": 1,
                 "ttl": 86400,  # 24 hours default
                 "max_memory": "10gb",
-                "eviction_policy": "allkeys-lru"
+                "eviction_policy": "allkeys-lru",
+                "pool_size": 20,
+                "l1_max_entries": 5000,
+                "l1_max_bytes": 128 * 1024 * 1024,
+                "l1_ttl": 120,
+                "ttl_jitter": 0.1
             },
             CacheType.AGGREGATION: {
                 "db": 2,
                 "ttl": 300,  # 5 minutes for dashboard data
                 "max_memory": "1gb",
-                "eviction_policy": "volatile-lru"
+                "eviction_policy": "volatile-lru",
+                "pool_size": 10,
+                "l1_max_entries": 500,
+                "l1_max_bytes": 16 * 1024 * 1024,
+                "l1_ttl": 10,  # Dashboards tolerate a few seconds of staleness
+                "ttl_jitter": 0.05
             }
         }
         
+        # Value codec (header byte per value). Pickle is opt-in; legacy pickles
+        # decode only while redis_cache_legacy_pickle is on during rollout.
+        # Float vectors are stored as float32 unless redis_cache_float32_vectors=false.
+        default_threshold = str(DEFAULT_COMPRESSION_THRESHOLD)
+        self.codec = CacheCodec(
+            preferred=get_config_value("redis_cache_codec", "auto") or "auto",
+            compression=get_config_value("redis_cache_compression", "auto") or "auto",
+            compression_threshold=int(get_config_value("redis_cache_compression_threshold", default_threshold) or default_threshold),
+            allow_pickle=str(get_config_value("redis_cache_allow_pickle", "false")).lower() == "true",
+            legacy_pickle=str(get_config_value("redis_cache_legacy_pickle", "false")).lower() == "true",
+            narrow_vectors=str(get_config_value("redis_cache_float32_vectors", "true")).lower() != "false"
+        )
+        self._pickle_refusal_reported = False
+        
+        # Optional in-process L1 in front of Redis (L2)
+        self.l1_enabled = False
+        self.l1_caches: Dict[CacheType, LocalLRUCache] = {}
+        self.configure_l1(str(get_config_value("redis_l1_enabled", "false")).lower() == "true")
+        
+        # L1 invalidations are broadcast to every worker over Redis pub/sub
+        self.instance_id = uuid.uuid4().hex
+        self.invalidation_channel = "sophia:cache:invalidate"
+        self._invalidation_pubsub = None
+        self._invalidation_task: Optional[asyncio.Task] = None
+        
+        # Tiers served by a Redis Cluster (single DB 0; namespacing is by key prefix)
+        self.cluster_modes: Dict[CacheType, bool] = {ct: False for ct in CacheType}
+        self._pubsub_client = None
+        
+        # Application-level byte budgets for tiers that share a Redis instance
+        self.memory_budgets: Dict[CacheType, int] = {}
+        self.max_budget_evictions = int(get_config_value("redis_budget_max_evictions", "1000") or "1000")
+        
+        # Batch operations are split into pipelines of at most this many keys
+        self.batch_chunk_size = int(get_config_value("redis_cache_chunk_size", "500") or "500")
+        
+        # Single-flight state for get_or_compute
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refresh_tasks: set = set()
+        self.lock_timeout = float(get_config_value("redis_cache_lock_timeout", "10") or "10")
+        
         # Performance tracking
         self.stats: Dict[CacheType, CacheStats] = {
             ct: CacheStats() for ct in CacheType
@@ -105,28 +417,84 @@ class RedisCacheMCPServer:
             redis_port = int(get_config_value("redis_port", "6379") or "6379")
             redis_password = get_config_value("redis_password")
             
+            redis_cluster_nodes = get_config_value("redis_cluster_nodes")
+            
+            # Each tier may point at its own Redis instance (redis_<type>_host/port/password)
+            # or its own cluster (redis_<type>_cluster_nodes)
+            endpoints = {}
+            for cache_type in CacheType:
+                prefix = f"redis_{cache_type.name.lower()}"
+                endpoints[cache_type] = (
+                    get_config_value(f"{prefix}_host") or redis_host or "localhost",
+                    int(get_config_value(f"{prefix}_port") or redis_port),
+                    get_config_value(f"{prefix}_password") or redis_password,
+                    get_config_value(f"{prefix}_cluster_nodes") or redis_cluster_nodes
+                )
+            
+            def location(endpoint: tuple) -> tuple:
+                return (endpoint[3],) if endpoint[3] else endpoint[:2]
+            
             # Initialize clients for each cache type
             for cache_type, config in self.cache_configs.items():
+                host, port, password, cluster_nodes = endpoints[cache_type]
+                dedicated = all(
+                    location(endpoints[other]) != location(endpoints[cache_type])
+                    for other in CacheType if other != cache_type
+                )
+                
+                pool_size = int(
+                    get_config_value(f"redis_{cache_type.name.lower()}_pool_size", str(config["pool_size"]))
+                    or config["pool_size"]
+                )
+                config["pool_size"] = pool_size
+                
+                if cluster_nodes:
+                    if await self._connect_cluster(cache_type, cluster_nodes, password, pool_size):
+                        await self._configure_memory_budget(cache_type, dedicated=False)
+                        await self._load_scripts(cache_type)
+                    continue
+                
                 try:
-                    self.clients[cache_type] = redis.Redis(
-                        host=redis_host or "localhost",
-                        port=redis_port,
-                        password=redis_password,
+                    pool = aioredis.ConnectionPool(
+                        host=host,
+                        port=port,
+                        password=password,
                         db=config["db"],
+                        max_connections=pool_size,
                         decode_responses=False  # Handle binary data
                     )
+                    async_client = aioredis.Redis(connection_pool=pool)
+                    await async_client.ping()
+                    self.async_clients[cache_type] = async_client
                     
-                    # Configure memory limits and eviction
-                    client = self.clients[cache_type]
-                    if client:
-                        client.config_set('maxmemory', config["max_memory"])
-                        client.config_set('maxmemory-policy', config["eviction_policy"])
-                    
-                    print(f"✅ Redis {cache_type.name} cache initialized (DB {config['db']})")
+                    print(f"✅ Redis {cache_type.name} cache initialized ({host}:{port} DB {config['db']}, async pool {pool_size})")
                     
                 except Exception as e:
-                    print(f"⚠️  Failed to initialize {cache_type.name} cache: {e}")
-                    self.clients[cache_type] = None
+                    print(f"⚠️  Async Redis client failed for {cache_type.name}, falling back to sync client: {e}")
+                    self.async_clients[cache_type] = None
+                
+                    try:
+                        self.clients[cache_type] = redis.Redis(
+                            host=host,
+                            port=port,
+                            password=password,
+                            db=config["db"],
+                            max_connections=pool_size,
+                            decode_responses=False  # Handle binary data
+                        )
+                        
+                        print(f"✅ Redis {cache_type.name} cache initialized ({host}:{port} DB {config['db']}, sync fallback)")
+                        
+                    except Exception as e:
+                        print(f"⚠️  Failed to initialize {cache_type.name} cache: {e}")
+                        self.clients[cache_type] = None
+                        continue
+                
+                await self._configure_memory_budget(cache_type, dedicated)
+                await self._load_scripts(cache_type)
+            
+            if self.l1_enabled:
+                await self._start_invalidation_listener()
             
             print(f"✅ Redis Cache MCP Server initialized on port {self.port}")
             
@@ -134,38 +502,407 @@ class RedisCacheMCPServer:
             print(f"❌ Failed to initialize Redis Cache Server: {e}")
             raise
     
+    async def attach_clients(self, async_clients: Dict[CacheType, Any], shared_instance: bool = True):
+        """
+        Use already-connected asyncio clients instead of connecting from config
+        
+        Lets benchmarks and tests run the real cache code against an
+        in-process stand-in (e.g. fakeredis) or a throwaway redis-server.
+        """
+        for cache_type, async_client in async_clients.items():
+            self.async_clients[cache_type] = async_client
+            self.clients[cache_type] = None
+            self.cluster_modes[cache_type] = False
+            await self._configure_memory_budget(cache_type, dedicated=not shared_instance)
+            await self._load_scripts(cache_type)
+        
+        if self.l1_enabled and not self._invalidation_task:
+            await self._start_invalidation_listener()
+    
+    def configure_l1(self, enabled: bool):
+        """Enable or disable the in-process L1 cache, using the per-type budgets in cache_configs"""
+        self.l1_enabled = enabled
+        self.l1_caches = {
+            ct: LocalLRUCache(config["l1_max_entries"], config["l1_max_bytes"], config["l1_ttl"])
+            for ct, config in self.cache_configs.items()
+        } if enabled else {}
+    
+    async def _connect_cluster(self,
+                               cache_type: CacheType,
+                               cluster_nodes: str,
+                               password: Optional[str],
+                               pool_size: int) -> bool:
+        """Connect a tier to a Redis Cluster, falling back to the sync cluster client"""
+        nodes = parse_cluster_nodes(cluster_nodes)
+        
+        try:
+            async_client = AsyncRedisCluster(
+                startup_nodes=[AsyncClusterNode(host, port) for host, port in nodes],
+                password=password,
+                max_connections=pool_size,
+                decode_responses=False  # Handle binary data
+            )
+            await async_client.initialize()
+            self.async_clients[cache_type] = async_client
+            self.cluster_modes[cache_type] = True
+            print(f"✅ Redis {cache_type.name} cache initialized (cluster {cluster_nodes}, pool {pool_size} per node)")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️  Async Redis Cluster client failed for {cache_type.name}, falling back to sync client: {e}")
+            self.async_clients[cache_type] = None
+        
+        try:
+            self.clients[cache_type] = RedisCluster(
+                startup_nodes=[ClusterNode(host, port) for host, port in nodes],
+                password=password,
+                max_connections=pool_size,
+                decode_responses=False
+            )
+            self.cluster_modes[cache_type] = True
+            print(f"✅ Redis {cache_type.name} cache initialized (cluster {cluster_nodes}, sync fallback)")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️  Failed to initialize {cache_type.name} cluster cache: {e}")
+            self.clients[cache_type] = None
+            return False
+    
+    async def _load_scripts(self, cache_type: CacheType):
+        """SCRIPT LOAD the Lua scripts so commands can run them with EVALSHA"""
+        try:
+            for script in LUA_SCRIPTS.values():
+                await self._execute(cache_type, "script_load", script)
+        except Exception as e:
+            # Not fatal: the first EVALSHA answers NOSCRIPT and falls back to EVAL
+            print(f"⚠️  Could not preload Lua scripts for {cache_type.name}: {e}")
+    
+    async def _configure_memory_budget(self, cache_type: CacheType, dedicated: bool):
+        """
+        Enforce the tier's max_memory budget
+        
+        maxmemory is instance wide, so CONFIG SET is only correct when the tier
+        has a Redis instance to itself. Tiers sharing an instance get an
+        application-level byte budget instead (see _account_command).
+        """
+        config = self.cache_configs[cache_type]
+        mode = (get_config_value("redis_memory_budget_mode", "auto") or "auto").lower()
+        
+        if mode == "off":
+            return
+        
+        if mode == "auto" and dedicated:
+            try:
+                await self._execute(cache_type, "config_set", "maxmemory", config["max_memory"])
+                await self._execute(cache_type, "config_set", "maxmemory-policy", config["eviction_policy"])
+                print(f"✅ {cache_type.name} has a dedicated Redis instance: maxmemory {config['max_memory']} ({config['eviction_policy']})")
+            except Exception as e:
+                print(f"⚠️  Could not apply maxmemory to {cache_type.name} instance: {e}")
+            return
+        
+        self.memory_budgets[cache_type] = parse_memory_size(config["max_memory"])
+        print(f"✅ {cache_type.name} shares its Redis instance: application budget {config['max_memory']}")
+    
+    async def close(self):
+        """Close all Redis connections and release pools"""
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        
+        if self._invalidation_pubsub:
+            try:
+                await self._invalidation_pubsub.aclose()
+            except Exception as e:
+                print(f"⚠️  Error closing L1 invalidation subscription: {e}")
+            self._invalidation_pubsub = None
+        
+        if self._pubsub_client:
+            await self._pubsub_client.aclose()
+            self._pubsub_client = None
+        
+        for cache_type, async_client in self.async_clients.items():
+            if async_client:
+                try:
+                    await async_client.aclose()
+                    if not self.cluster_modes[cache_type]:
+                        await async_client.connection_pool.disconnect()
+                except Exception as e:
+                    print(f"⚠️  Error closing {cache_type.name} cache: {e}")
+                self.async_clients[cache_type] = None
+        
+        for cache_type, client in self.clients.items():
+            if client:
+                try:
+                    client.close()
+                except Exception as e:
+                    print(f"⚠️  Error closing {cache_type.name} cache: {e}")
+                self.clients[cache_type] = None
+    
+    def _has_client(self, cache_type: CacheType) -> bool:
+        """Whether any Redis client (async or sync fallback) is available"""
+        return bool(self.async_clients.get(cache_type) or self.clients.get(cache_type))
+    
+    async def _execute(self, cache_type: CacheType, command: str, *args, **kwargs) -> Any:
+        """Run a Redis command on the async client, or the sync fallback in a worker thread"""
+        async_client = self.async_clients.get(cache_type)
+        if async_client:
+            return await getattr(async_client, command)(*args, **kwargs)
+        
+        client = self.clients.get(cache_type)
+        return await asyncio.to_thread(getattr(client, command), *args, **kwargs)
+    
+    @staticmethod
+    def _script_command(script: str, numkeys: int, *args) -> tuple:
+        """(command, args) running a Lua script by SHA1, for _execute or a pipeline"""
+        return ("evalsha", (SCRIPT_SHAS[script], numkeys, *args))
+    
+    async def _run_script(self, cache_type: CacheType, script: str, numkeys: int, *args) -> Any:
+        """EVALSHA a Lua script, falling back to EVAL if the server doesn't have it cached"""
+        command, command_args = self._script_command(script, numkeys, *args)
+        try:
+            return await self._execute(cache_type, command, *command_args)
+        except Exception as e:
+            if not is_noscript(e):
+                raise
+            return await self._execute(cache_type, "eval", script, numkeys, *args)
+    
+    async def _execute_pipeline(self,
+                                cache_type: CacheType,
+                                commands: List[tuple],
+                                transaction: bool = True) -> List[Any]:
+        """Run (command, args) pairs in a single pipeline round trip"""
+        async_client = self.async_clients.get(cache_type)
+        client = async_client or self.clients[cache_type]
+        # Cluster pipelines are split per node and cannot run MULTI/EXEC
+        pipe = client.pipeline(transaction=transaction and not self.cluster_modes[cache_type])
+        
+        for command, args in commands:
+            getattr(pipe, command)(*args)
+        
+        if async_client:
+            results = await pipe.execute(raise_on_error=False)
+        else:
+            results = await asyncio.to_thread(pipe.execute, False)
+        
+        # The rest of the pipeline has run; repeat only the scripts the server didn't have
+        for i, (command, args) in enumerate(commands):
+            if command == "evalsha" and is_noscript(results[i]):
+                sha, numkeys, *script_args = args
+                results[i] = await self._execute(cache_type, "eval", LUA_SCRIPTS[sha], numkeys, *script_args)
+        
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+    
+    async def _scan_keys(self, cache_type: CacheType, pattern: str) -> List[bytes]:
+        """Collect all keys matching a pattern with SCAN"""
+        async_client = self.async_clients.get(cache_type)
+        if async_client:
+            return [key async for key in async_client.scan_iter(match=pattern)]
+        
+        client = self.clients[cache_type]
+        return await asyncio.to_thread(lambda: list(client.scan_iter(match=pattern)))
+    
+    async def _start_invalidation_listener(self):
+        """Subscribe to L1 invalidations published by other workers"""
+        async_client = next(
+            (c for ct, c in self.async_clients.items() if c and not self.cluster_modes[ct]), None
+        )
+        if not async_client:
+            # Cluster PUBLISH reaches every node, so a plain connection to any node will do
+            cluster_client = next((c for c in self.async_clients.values() if c), None)
+            if not cluster_client:
+                print("⚠️  L1 invalidation needs the async Redis client; L1 entries will only expire by TTL")
+                return
+            node = cluster_client.get_default_node()
+            self._pubsub_client = aioredis.Redis(
+                host=node.host, port=node.port, password=cluster_client.get_connection_kwargs().get("password")
+            )
+            async_client = self._pubsub_client
+        
+        try:
+            self._invalidation_pubsub = async_client.pubsub(ignore_subscribe_messages=True)
+            await self._invalidation_pubsub.subscribe(self.invalidation_channel)
+            self._invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+            print(f"✅ L1 cache invalidation listener subscribed to {self.invalidation_channel}")
+        except Exception as e:
+            print(f"⚠️  Failed to subscribe to L1 invalidations: {e}")
+            self._invalidation_pubsub = None
+    
+    async def _listen_for_invalidations(self):
+        """Apply invalidation messages to the local L1 caches"""
+        while True:
+            try:
+                async for message in self._invalidation_pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed while disconnected
+                print(f"⚠️  L1 invalidation listener error, clearing L1: {e}")
+                for l1 in self.l1_caches.values():
+                    l1.clear()
+                await asyncio.sleep(1)
+    
+    def _apply_invalidation(self, data: Union[bytes, str]):
+        """Evict L1 entries named by an invalidation message"""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        
+        if message.get("origin") == self.instance_id:
+            return
+        
+        l1 = self.l1_caches.get(CacheType[message.get("cache_type", "CODING")])
+        if l1 is None:
+            return
+        
+        if message.get("pattern"):
+            l1.delete_pattern(message["pattern"])
+        l1.delete_many(message.get("keys", []))
+    
+    def _invalidation_command(self,
+                              cache_type: CacheType,
+                              keys: Optional[List[str]] = None,
+                              pattern: Optional[str] = None) -> Optional[tuple]:
+        """PUBLISH command telling other workers to evict L1 entries, if L1 is enabled"""
+        if not self.l1_enabled:
+            return None
+        
+        message = json.dumps({
+            "origin": self.instance_id,
+            "cache_type": cache_type.name,
+            "keys": keys or [],
+            "pattern": pattern
+        })
+        return ("publish", (self.invalidation_channel, message))
+    
+    async def _execute_with_invalidation(self,
+                                         cache_type: CacheType,
+                                         commands: List[tuple],
+                                         keys: Optional[List[str]] = None,
+                                         pattern: Optional[str] = None,
+                                         transaction: bool = True) -> List[Any]:
+        """Run commands and the L1 invalidation broadcast in one round trip"""
+        invalidation = self._invalidation_command(cache_type, keys, pattern)
+        if invalidation:
+            commands = commands + [invalidation]
+        
+        if self.cluster_modes[cache_type] and any(command in CROSS_SLOT_COMMANDS for command, _ in commands):
+            # The cluster client splits these across slots itself, which it can't do inside a pipeline
+            return [await self._execute(cache_type, command, *args) for command, args in commands]
+        
+        if len(commands) == 1:
+            command, args = commands[0]
+            return [await self._execute(cache_type, command, *args)]
+        return await self._execute_pipeline(cache_type, commands, transaction)
+    
+    def _record_hit(self, cache_type: CacheType, tier: str):
+        """Count a hit served from L1 ("l1") or Redis ("l2")"""
+        stats = self.stats[cache_type]
+        stats.hits += 1
+        if tier == "l1":
+            stats.l1_hits += 1
+        else:
+            stats.l2_hits += 1
+        
+        if PROMETHEUS_AVAILABLE:
+            CACHE_HITS.labels(cache_type=cache_type.name, tier=tier).inc()
+    
+    def _record_miss(self, cache_type: CacheType, count: int = 1):
+        self.stats[cache_type].misses += count
+        if PROMETHEUS_AVAILABLE and count:
+            CACHE_MISSES.labels(cache_type=cache_type.name).inc(count)
+    
+    def _record_sets(self, cache_type: CacheType, count: int = 1):
+        self.stats[cache_type].sets += count
+        if PROMETHEUS_AVAILABLE and count:
+            CACHE_SETS.labels(cache_type=cache_type.name).inc(count)
+    
+    def _record_latency(self, cache_type: CacheType, operation: str, started: float):
+        """Observe latency since a time.perf_counter() start"""
+        if PROMETHEUS_AVAILABLE:
+            CACHE_LATENCY.labels(cache_type=cache_type.name, operation=operation).observe(
+                time.perf_counter() - started
+            )
+    
+    def _record_payload(self, cache_type: CacheType, operation: str, size: int):
+        if PROMETHEUS_AVAILABLE:
+            CACHE_PAYLOAD_BYTES.labels(cache_type=cache_type.name, operation=operation).observe(size)
+    
     def _generate_key(self, cache_type: CacheType, key: str) -> str:
         """Generate namespaced cache key"""
         return f"{cache_type.name.lower()}:{key}"
     
     def _serialize_value(self, value: Any) -> bytes:
         """Serialize value for storage"""
-        return pickle.dumps(value)
+        return self.codec.encode(value)
     
     def _deserialize_value(self, data: bytes) -> Any:
-        """Deserialize value from storage"""
-        return pickle.loads(data) if data else None
+        """Deserialize value from storage (refused pickles read as misses)"""
+        try:
+            return self.codec.decode(data)
+        except PickleDisabledError as e:
+            if not self._pickle_refusal_reported:
+                print(f"⚠️  {e}; set redis_cache_legacy_pickle=true while old entries drain")
+                self._pickle_refusal_reported = True
+            return None
+    
+    @staticmethod
+    def _unwrap(entry: Any) -> Any:
+        """Strip the get_or_compute envelope, if any"""
+        if isinstance(entry, dict) and SWR_ENVELOPE_KEY in entry:
+            return entry.get("value")
+        return entry
     
     async def get(self, 
                   cache_type: CacheType,
                   key: str) -> Optional[Any]:
         """Get value from cache"""
-        client = self.clients.get(cache_type)
-        
-        if not client:
+        return self._unwrap(await self._get_entry(cache_type, key))
+    
+    async def _get_entry(self,
+                         cache_type: CacheType,
+                         key: str) -> Optional[Any]:
+        """Get the stored entry, including any get_or_compute envelope"""
+        if not self._has_client(cache_type):
             # Mock mode
             return None
             
         try:
+            started = time.perf_counter()
             cache_key = self._generate_key(cache_type, key)
-            data = client.get(cache_key)
+            
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                data = l1.get(cache_key)
+                if data is not None:
+                    self._record_hit(cache_type, "l1")
+                    value = self._deserialize_value(data)
+                    self._record_latency(cache_type, "get", started)
+                    return value
+            
+            data = await self._execute(cache_type, "get", cache_key)
             
             if data:
-                self.stats[cache_type].hits += 1
-                return self._deserialize_value(data) if isinstance(data, bytes) else None
+                self._record_hit(cache_type, "l2")
+                self._record_payload(cache_type, "get", len(data))
+                if l1 is not None and isinstance(data, bytes):
+                    l1.set(cache_key, data)
+                value = self._deserialize_value(data) if isinstance(data, bytes) else None
             else:
-                self.stats[cache_type].misses += 1
-                return None
+                self._record_miss(cache_type)
+                value = None
+            
+            self._record_latency(cache_type, "get", started)
+            return value
                 
         except Exception as e:
             print(f"❌ Error getting from cache: {e}")
@@ -175,24 +912,36 @@ class RedisCacheMCPServer:
                   cache_type: CacheType,
                   key: str,
                   value: Any,
-                  ttl: Optional[int] = None) -> bool:
-        """Set value in cache"""
-        client = self.clients.get(cache_type)
-        
-        if not client:
+                  ttl: Optional[int] = None,
+                  tags: Optional[List[str]] = None) -> bool:
+        """Set value in cache, optionally registering it under invalidation tags"""
+        if not self._has_client(cache_type):
             # Mock mode
             return True
             
         try:
+            started = time.perf_counter()
             cache_key = self._generate_key(cache_type, key)
             serialized = self._serialize_value(value)
+            self._record_payload(cache_type, "set", len(serialized))
             
             # Use configured TTL if not specified
             if ttl is None:
                 ttl = self.cache_configs[cache_type]["ttl"]
             
-            client.setex(cache_key, int(ttl), serialized)
-            self.stats[cache_type].sets += 1
+            commands = [("setex", (cache_key, int(ttl), serialized))] + self._tag_commands(cache_type, [cache_key], tags, ttl)
+            account = self._account_command(cache_type, {cache_key: (len(serialized), int(ttl))})
+            if account:
+                commands.append(account)
+            results = await self._execute_with_invalidation(cache_type, commands, keys=[cache_key])
+            self._record_sets(cache_type)
+            if account:
+                await self._evict_over_budget(cache_type, results[len(commands) - 1])
+            self._record_latency(cache_type, "set", started)
+            
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                l1.set(cache_key, serialized, ttl)
             
             return True
             
@@ -204,15 +953,25 @@ class RedisCacheMCPServer:
                     cache_type: CacheType,
                     key: str) -> bool:
         """Delete value from cache"""
-        client = self.clients.get(cache_type)
-        
-        if not client:
+        if not self._has_client(cache_type):
             return True
             
         try:
+            started = time.perf_counter()
             cache_key = self._generate_key(cache_type, key)
-            result = client.delete(cache_key)
-            return bool(result)
+            
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                l1.delete(cache_key)
+            
+            result = await self._execute_with_invalidation(
+                cache_type,
+                [("delete", (cache_key,))],
+                keys=[cache_key]
+            )
+            await self._release_writes(cache_type, [cache_key])
+            self._record_latency(cache_type, "delete", started)
+            return bool(result[0])
             
         except Exception as e:
             print(f"❌ Error deleting from cache: {e}")
@@ -222,70 +981,141 @@ class RedisCacheMCPServer:
                     cache_type: CacheType,
                     key: str) -> bool:
         """Check if key exists in cache"""
-        client = self.clients.get(cache_type)
-        
-        if not client:
+        if not self._has_client(cache_type):
             return False
             
         try:
             cache_key = self._generate_key(cache_type, key)
-            return bool(client.exists(cache_key))
+            return bool(await self._execute(cache_type, "exists", cache_key))
             
         except Exception as e:
             print(f"❌ Error checking existence: {e}")
             return False
     
+    def _chunks(self, items: List[Any], chunk_size: Optional[int] = None) -> List[List[Any]]:
+        """Split a batch into pipeline-sized chunks"""
+        size = max(int(chunk_size or self.batch_chunk_size), 1)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+    
+    def _jittered_ttl(self, cache_type: CacheType, ttl: int) -> int:
+        """Shorten a TTL by a random fraction so batch-written keys don't expire together"""
+        jitter = self.cache_configs[cache_type].get("ttl_jitter", 0.0)
+        if jitter <= 0:
+            return int(ttl)
+        return max(int(ttl * (1.0 - random.uniform(0.0, jitter))), 1)
+    
     async def get_many(self,
                       cache_type: CacheType,
-                      keys: List[str]) -> Dict[str, Any]:
-        """Get multiple values from cache"""
-        client = self.clients.get(cache_type)
-        
-        if not client:
-            return {}
+                      keys: List[str],
+                      chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        """Get multiple values from cache, one MGET per chunk of keys"""
+        result = {}
+        async for chunk in self.iter_many(cache_type, keys, chunk_size):
+            result.update(chunk)
+        return result
+    
+    async def iter_many(self,
+                        cache_type: CacheType,
+                        keys: List[str],
+                        chunk_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream found values back chunk by chunk as each MGET completes"""
+        if not self._has_client(cache_type):
+            return
             
         try:
-            cache_keys = [self._generate_key(cache_type, k) for k in keys]
-            values = client.mget(cache_keys)
-            
-            result = {}
-            for i, key in enumerate(keys):
-                if values and i < len(values) and values[i]:
-                    result[key] = self._deserialize_value(values[i]) if isinstance(values[i], bytes) else None
-                    self.stats[cache_type].hits += 1
-                else:
-                    self.stats[cache_type].misses += 1
-                    
-            return result
+            # Serve what we can from L1, only go to Redis for the rest
+            l1 = self.l1_caches.get(cache_type)
+            remaining = keys
+            if l1 is not None:
+                remaining = []
+                from_l1 = {}
+                for key in keys:
+                    data = l1.get(self._generate_key(cache_type, key))
+                    if data is not None:
+                        from_l1[key] = self._unwrap(self._deserialize_value(data))
+                        self._record_hit(cache_type, "l1")
+                    else:
+                        remaining.append(key)
+                
+                if from_l1:
+                    yield from_l1
+            
+            for chunk in self._chunks(remaining, chunk_size):
+                started = time.perf_counter()
+                cache_keys = [self._generate_key(cache_type, k) for k in chunk]
+                # Cluster MGET must stay within one slot; the non-atomic variant fans out per slot
+                mget = "mget_nonatomic" if self.cluster_modes[cache_type] else "mget"
+                values = await self._execute(cache_type, mget, cache_keys)
+                self._record_latency(cache_type, "mget", started)
+                
+                result = {}
+                for i, key in enumerate(chunk):
+                    if values and i < len(values) and values[i]:
+                        result[key] = self._unwrap(self._deserialize_value(values[i])) if isinstance(values[i], bytes) else None
+                        self._record_hit(cache_type, "l2")
+                        self._record_payload(cache_type, "mget", len(values[i]))
+                        if l1 is not None and isinstance(values[i], bytes):
+                            l1.set(cache_keys[i], values[i])
+                    else:
+                        self._record_miss(cache_type)
+                
+                yield result
             
         except Exception as e:
             print(f"❌ Error getting many from cache: {e}")
-            return {}
     
     async def set_many(self,
                       cache_type: CacheType,
                       items: Dict[str, Any],
-                      ttl: Optional[int] = None) -> bool:
-        """Set multiple values in cache"""
-        client = self.clients.get(cache_type)
+                      ttl: Optional[int] = None,
+                      tags: Optional[List[str]] = None,
+                      ttls: Optional[Dict[str, int]] = None,
+                      chunk_size: Optional[int] = None) -> bool:
+        """
+        Set multiple values in cache, optionally registering them under invalidation tags
         
-        if not client:
+        Items are written in non-transactional pipelines of ``chunk_size`` keys
+        so one huge batch doesn't stall other clients. ``ttls`` overrides the
+        TTL per key, and every TTL gets the cache type's jitter applied.
+        """
+        if not self._has_client(cache_type):
             return True
             
         try:
             if ttl is None:
                 ttl = self.cache_configs[cache_type]["ttl"]
+            ttls = ttls or {}
+            l1 = self.l1_caches.get(cache_type)
             
-            # Use pipeline for atomic operation
-            pipe = client.pipeline()
-            
-            for key, value in items.items():
-                cache_key = self._generate_key(cache_type, key)
-                serialized = self._serialize_value(value)
-                pipe.setex(cache_key, int(ttl), serialized)
-            
-            pipe.execute()
-            self.stats[cache_type].sets += len(items)
+            for chunk in self._chunks(list(items.items()), chunk_size):
+                started = time.perf_counter()
+                commands = []
+                encoded = {}
+                max_ttl = 0
+                for key, value in chunk:
+                    cache_key = self._generate_key(cache_type, key)
+                    serialized = self._serialize_value(value)
+                    self._record_payload(cache_type, "set_many", len(serialized))
+                    item_ttl = self._jittered_ttl(cache_type, ttls.get(key, ttl))
+                    max_ttl = max(max_ttl, item_ttl)
+                    commands.append(("setex", (cache_key, item_ttl, serialized)))
+                    encoded[cache_key] = (serialized, item_ttl)
+                
+                commands.extend(self._tag_commands(cache_type, list(encoded), tags, max_ttl))
+                account = self._account_command(cache_type, {
+                    cache_key: (len(serialized), item_ttl) for cache_key, (serialized, item_ttl) in encoded.items()
+                })
+                if account:
+                    commands.append(account)
+                results = await self._execute_with_invalidation(cache_type, commands, keys=list(encoded), transaction=False)
+                self._record_sets(cache_type, len(chunk))
+                if account:
+                    await self._evict_over_budget(cache_type, results[len(commands) - 1])
+                self._record_latency(cache_type, "set_many", started)
+                
+                if l1 is not None:
+                    for cache_key, (serialized, item_ttl) in encoded.items():
+                        l1.set(cache_key, serialized, item_ttl)
             
             return True
             
@@ -293,79 +1123,485 @@ class RedisCacheMCPServer:
             print(f"❌ Error setting many in cache: {e}")
             return False
     
+    def _budget_keys(self, cache_type: CacheType) -> List[str]:
+        """Keys holding a namespace's budget accounting: write index, sizes, total, expiry deadlines"""
+        # Hash-tagged so the accounting script's keys share a cluster slot
+        tag = hash_tag(f"{cache_type.name.lower()}:budget")
+        return [
+            self._generate_key(cache_type, f"{tag}:index"),
+            self._generate_key(cache_type, f"{tag}:sizes"),
+            self._generate_key(cache_type, f"{tag}:bytes"),
+            self._generate_key(cache_type, f"{tag}:expiry")
+        ]
+    
+    def _account_command(self, cache_type: CacheType, writes: Dict[str, Tuple[int, int]]) -> Optional[tuple]:
+        """EVALSHA charging written keys (encoded size, TTL) to the namespace budget, if it has one"""
+        budget = self.memory_budgets.get(cache_type)
+        if budget is None or not writes:
+            return None
+        
+        args = [budget, time.time(), self.max_budget_evictions, self.max_budget_evictions]
+        for cache_key, (size, ttl) in writes.items():
+            args.extend((cache_key, size + len(cache_key) + KEY_OVERHEAD_BYTES, ttl))
+        
+        return self._script_command(ACCOUNT_WRITES_SCRIPT, 4, *self._budget_keys(cache_type), *args)
+    
+    async def _evict_over_budget(self, cache_type: CacheType, victims: Optional[List[Any]]):
+        """Delete the keys the accounting script picked to bring the namespace back under budget"""
+        if not victims:
+            return
+        
+        victims = [v.decode() if isinstance(v, bytes) else v for v in victims]
+        l1 = self.l1_caches.get(cache_type)
+        if l1 is not None:
+            l1.delete_many(victims)
+        
+        for chunk in self._chunks(victims):
+            await self._execute_with_invalidation(cache_type, [("unlink", tuple(chunk))], keys=chunk)
+        
+        self.stats[cache_type].budget_evictions += len(victims)
+        if PROMETHEUS_AVAILABLE:
+            CACHE_BUDGET_EVICTIONS.labels(cache_type=cache_type.name).inc(len(victims))
+    
+    async def _release_writes(self, cache_type: CacheType, cache_keys: List[str]):
+        """Credit deleted keys back to the namespace budget"""
+        if cache_type not in self.memory_budgets or not cache_keys:
+            return
+        
+        for chunk in self._chunks(list(cache_keys)):
+            await self._run_script(cache_type, RELEASE_WRITES_SCRIPT, 4, *self._budget_keys(cache_type), *chunk)
+    
+    def _tag_key(self, cache_type: CacheType, tag: str) -> str:
+        """Key of the set holding every cache key registered under a tag"""
+        return self._generate_key(cache_type, f"tag:{tag}")
+    
+    def _tag_commands(self,
+                      cache_type: CacheType,
+                      cache_keys: List[str],
+                      tags: Optional[List[str]],
+                      ttl: int) -> List[tuple]:
+        """SADD/EXPIRE commands registering cache keys under their tags"""
+        if not tags or not cache_keys:
+            return []
+        
+        # Tag sets outlive their members so a tag never forgets a live key;
+        # members that expired on their own are harmless at invalidation time
+        tag_ttl = max(int(ttl), int(self.cache_configs[cache_type]["ttl"]))
+        commands = []
+        for tag in tags:
+            tag_key = self._tag_key(cache_type, tag)
+            commands.append(("sadd", (tag_key, *cache_keys)))
+            commands.append(("expire", (tag_key, tag_ttl)))
+        return commands
+    
+    async def invalidate_tags(self,
+                              cache_type: CacheType,
+                              tags: List[str]) -> int:
+        """Invalidate every key registered under any of the tags (SMEMBERS + UNLINK)"""
+        if not self._has_client(cache_type) or not tags:
+            return 0
+        
+        try:
+            tag_keys = [self._tag_key(cache_type, tag) for tag in tags]
+            members = await self._execute_pipeline(cache_type, [("smembers", (tag_key,)) for tag_key in tag_keys])
+            
+            cache_keys = set()
+            for member_set in members:
+                cache_keys.update(
+                    k.decode() if isinstance(k, bytes) else k for k in (member_set or ())
+                )
+            
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                l1.delete_many(cache_keys)
+            
+            results = await self._execute_with_invalidation(
+                cache_type,
+                [("unlink", tuple(cache_keys) + tuple(tag_keys))],
+                keys=list(cache_keys)
+            )
+            await self._release_writes(cache_type, list(cache_keys))
+            
+            # UNLINK counts the tag sets too; report only cache entries removed
+            existing_tags = sum(1 for member_set in members if member_set)
+            return max(int(results[0] or 0) - existing_tags, 0)
+            
+        except Exception as e:
+            print(f"❌ Error invalidating tags: {e}")
+            return 0
+    
+    async def get_or_compute(self,
+                             cache_type: CacheType,
+                             key: str,
+                             producer: Callable[[], Awaitable[Any]],
+                             ttl: Optional[int] = None,
+                             stale_ttl: int = 0,
+                             early_refresh_beta: float = 1.0,
+                             tags: Optional[List[str]] = None) -> Any:
+        """
+        Get a value, computing it on a miss with single-flight semantics
+        (see get_or_compute_with_source)
+        """
+        value, _ = await self.get_or_compute_with_source(
+            cache_type, key, producer, ttl, stale_ttl, early_refresh_beta, tags
+        )
+        return value
+    
+    async def get_or_compute_with_source(self,
+                                         cache_type: CacheType,
+                                         key: str,
+                                         producer: Callable[[], Awaitable[Any]],
+                                         ttl: Optional[int] = None,
+                                         stale_ttl: int = 0,
+                                         early_refresh_beta: float = 1.0,
+                                         tags: Optional[List[str]] = None) -> Tuple[Any, ComputeSource]:
+        """
+        Get a value and how it was obtained, computing it on a miss with single-flight semantics
+        
+        - Concurrent misses in this process share one producer call
+        - Across processes, a short Redis lock lets one worker compute while
+          the others wait for its result
+        - With ``stale_ttl`` > 0, expired values are served for that long
+          while one background refresh runs (stale-while-revalidate)
+        - Fresh values are refreshed early in the background with a
+          probability that rises as expiry nears and with the cost of the
+          last computation (XFetch); ``early_refresh_beta=0`` disables it
+        """
+        if ttl is None:
+            ttl = self.cache_configs[cache_type]["ttl"]
+        
+        entry = await self._get_entry(cache_type, key)
+        
+        if isinstance(entry, dict) and SWR_ENVELOPE_KEY in entry:
+            remaining = entry.get("expires_at", 0) - time.time()
+            
+            if remaining > 0:
+                delta = entry.get("delta", 0.0)
+                if early_refresh_beta > 0 and delta > 0:
+                    if -delta * early_refresh_beta * math.log(1.0 - random.random()) >= remaining:
+                        self._schedule_refresh(cache_type, key, producer, ttl, stale_ttl, tags)
+                return entry.get("value"), ComputeSource.HIT
+            
+            if stale_ttl > 0:
+                self._schedule_refresh(cache_type, key, producer, ttl, stale_ttl, tags)
+                return entry.get("value"), ComputeSource.STALE
+            
+        elif entry is not None:
+            return entry, ComputeSource.HIT
+        
+        return await self._single_flight(cache_type, key, producer, ttl, stale_ttl, tags=tags)
+    
+    async def _single_flight(self,
+                             cache_type: CacheType,
+                             key: str,
+                             producer: Callable[[], Awaitable[Any]],
+                             ttl: int,
+                             stale_ttl: int,
+                             background: bool = False,
+                             tags: Optional[List[str]] = None) -> Tuple[Any, ComputeSource]:
+        """Coalesce concurrent computations of the same key within this process"""
+        cache_key = self._generate_key(cache_type, key)
+        
+        while cache_key in self._inflight:
+            value = await asyncio.shield(self._inflight[cache_key])
+            if value is not None or background:
+                return value, ComputeSource.COALESCED
+            # A background refresh yielded to another worker; compute here instead
+        
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception never retrieved" warnings when nobody else waited
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[cache_key] = future
+        
+        try:
+            value, source = await self._compute_with_lock(cache_type, key, producer, ttl, stale_ttl, background, tags)
+            future.set_result(value)
+            return value, source
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+    
+    async def _compute_with_lock(self,
+                                 cache_type: CacheType,
+                                 key: str,
+                                 producer: Callable[[], Awaitable[Any]],
+                                 ttl: int,
+                                 stale_ttl: int,
+                                 background: bool,
+                                 tags: Optional[List[str]] = None) -> Tuple[Any, ComputeSource]:
+        """Compute under a short cross-process Redis lock, or wait for the holder's result"""
+        if not self._has_client(cache_type):
+            return await producer(), ComputeSource.COMPUTED
+        
+        lock_key = self._generate_key(cache_type, f"lock:{key}")
+        token = uuid.uuid4().hex
+        
+        try:
+            acquired = await self._execute(
+                cache_type, "set", lock_key, token, nx=True, px=int(self.lock_timeout * 1000)
+            )
+        except Exception as e:
+            print(f"⚠️  Cache lock unavailable, computing without it: {e}")
+            acquired = False
+            token = None
+        
+        if not acquired and token is not None:
+            if background:
+                # Another worker is already refreshing this key
+                return None, ComputeSource.COALESCED
+            
+            # Poll only the lock (one GET, no stats): the holder writes the value before releasing it
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                if await self._execute(cache_type, "get", lock_key) is None:
+                    break
+            
+            entry = await self._get_entry(cache_type, key)
+            if entry is not None and not (
+                isinstance(entry, dict)
+                and SWR_ENVELOPE_KEY in entry
+                and entry.get("expires_at", 0) <= time.time()
+            ):
+                return self._unwrap(entry), ComputeSource.COALESCED
+        
+        try:
+            started = time.monotonic()
+            value = await producer()
+            delta = time.monotonic() - started
+            
+            if value is not None:
+                envelope = {
+                    SWR_ENVELOPE_KEY: 1,
+                    "value": value,
+                    "delta": delta,
+                    "expires_at": time.time() + ttl
+                }
+                await self.set(cache_type, key, envelope, int(ttl + stale_ttl), tags=tags)
+            
+            return value, ComputeSource.COMPUTED
+        finally:
+            if acquired:
+                try:
+                    await self._run_script(cache_type, RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    print(f"⚠️  Failed to release cache lock {lock_key}: {e}")
+    
+    def _schedule_refresh(self,
+                          cache_type: CacheType,
+                          key: str,
+                          producer: Callable[[], Awaitable[Any]],
+                          ttl: int,
+                          stale_ttl: int,
+                          tags: Optional[List[str]] = None):
+        """Recompute a value in the background, at most once per key at a time"""
+        if self._generate_key(cache_type, key) in self._inflight:
+            return
+        
+        async def refresh():
+            try:
+                await self._single_flight(cache_type, key, producer, ttl, stale_ttl, background=True, tags=tags)
+            except Exception as e:
+                print(f"⚠️  Background cache refresh failed for {key}: {e}")
+        
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    @staticmethod
+    def _aggregation_key(aggregation_type: str, project_id: str) -> str:
+        """
+        Aggregation key, hash-tagged by project so a project's aggregations share a cluster slot
+        
+        Keys from before the hash tag (agg:<type>:<project>) are never read
+        again, so dashboards start cold once and the old keys expire by TTL;
+        invalidate_pattern and flush_cache also remove them.
+        """
+        return f"agg:{aggregation_type}:{hash_tag(project_id)}"
+    
     async def cache_aggregation(self,
                               aggregation_type: str,
                               project_id: str,
                               data: Dict[str, Any],
                               ttl: int = 300) -> bool:
         """Cache computed aggregations for dashboards"""
-        key = f"agg:{aggregation_type}:{project_id}"
-        return await self.set(CacheType.AGGREGATION, key, data, ttl)
+        key = self._aggregation_key(aggregation_type, project_id)
+        return await self.set(CacheType.AGGREGATION, key, data, ttl, tags=[f"project:{project_id}"])
     
     async def get_aggregation(self,
                             aggregation_type: str,
-                            project_id: str) -> Optional[Dict[str, Any]]:
-        """Get cached aggregation"""
-        key = f"agg:{aggregation_type}:{project_id}"
-        return await self.get(CacheType.AGGREGATION, key)
+                            project_id: str,
+                            producer: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None,
+                            ttl: int = 300,
+                            stale_ttl: int = 0) -> Optional[Dict[str, Any]]:
+        """Get cached aggregation, computing it once across callers if a producer is given"""
+        key = self._aggregation_key(aggregation_type, project_id)
+        if producer is None:
+            return await self.get(CacheType.AGGREGATION, key)
+        return await self.get_or_compute(
+            CacheType.AGGREGATION, key, producer, ttl, stale_ttl, tags=[f"project:{project_id}"]
+        )
     
     async def invalidate_pattern(self,
                                cache_type: CacheType,
                                pattern: str) -> int:
-        """Invalidate all keys matching pattern"""
-        client = self.clients.get(cache_type)
+        """
+        Invalidate all keys matching pattern
         
-        if not client:
+        SCANs the whole database, so cost grows with the keyspace. Admin
+        fallback only; request paths should use invalidate_tags. Patterns with
+        hash tags also match keys written before the tags were added.
+        """
+        if not self._has_client(cache_type):
             return 0
             
         try:
             full_pattern = self._generate_key(cache_type, pattern)
-            keys = list(client.scan_iter(match=full_pattern))
             
-            if keys:
-                deleted = client.delete(*keys)
-                return int(deleted) if deleted else 0
-            return 0
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                l1.delete_pattern(full_pattern)
+            
+            keys = await self._scan_keys(cache_type, full_pattern)
+            legacy_pattern = strip_hash_tags(full_pattern)
+            if legacy_pattern != full_pattern:
+                keys = list(set(keys) | set(await self._scan_keys(cache_type, legacy_pattern)))
+            if not keys and not self.l1_enabled:
+                return 0
+            
+            commands = [("delete", tuple(keys))] if keys else []
+            results = await self._execute_with_invalidation(cache_type, commands, pattern=full_pattern)
+            await self._release_writes(
+                cache_type, [k.decode() if isinstance(k, bytes) else k for k in keys]
+            )
+            deleted = results[0] if keys else 0
+            return int(deleted) if deleted else 0
             
         except Exception as e:
             print(f"❌ Error invalidating pattern: {e}")
             return 0
     
+    async def _estimate_db_memory(self, cache_type: CacheType, keys_count: int, samples: int = 50) -> float:
+        """Estimate bytes used by one database: mean MEMORY USAGE of random keys x key count"""
+        if keys_count == 0:
+            return 0.0
+        
+        sampled = await self._execute_pipeline(
+            cache_type, [("randomkey", ())] * min(samples, keys_count), transaction=False
+        )
+        sampled = [key for key in set(sampled) if key]
+        if not sampled:
+            return 0.0
+        
+        try:
+            usages = await self._execute_pipeline(
+                cache_type, [("memory_usage", (key,)) for key in sampled], transaction=False
+            )
+        except redis.ResponseError:
+            # MEMORY USAGE is missing on some servers (e.g. fakeredis)
+            return 0.0
+        usages = [usage for usage in usages if usage]
+        return (sum(usages) / len(usages)) * keys_count if usages else 0.0
+    
+    async def _info(self, cache_type: CacheType, section: str) -> Dict[str, Any]:
+        """One INFO section, summed over cluster nodes; empty where INFO is unsupported (e.g. fakeredis)"""
+        try:
+            return _merge_node_info(await self._execute(cache_type, "info", section))
+        except redis.ResponseError:
+            return {}
+    
+    async def refresh_server_metrics(self, cache_type: CacheType) -> Dict[str, Any]:
+        """Pull keyspace, per-database memory and evicted/expired counts from Redis"""
+        stats = self.stats[cache_type]
+        cluster = self.cluster_modes[cache_type]
+        
+        db_info = await self._info(cache_type, "keyspace")
+        db_key = "db0" if cluster else f"db{self.cache_configs[cache_type]['db']}"
+        db_stats = db_info.get(db_key, {})
+        
+        info_stats = await self._info(cache_type, "stats")
+        stats.evictions = int(info_stats.get("evicted_keys", 0))
+        stats.expired_keys = int(info_stats.get("expired_keys", 0))
+        
+        if cluster:
+            # Every tier shares DB 0 across the cluster, so count this tier from its budget accounting
+            index_key, _, bytes_key, _ = self._budget_keys(cache_type)
+            stats.keys_count = int(await self._execute(cache_type, "zcard", index_key) or 0)
+            memory_bytes = float(await self._execute(cache_type, "get", bytes_key) or 0)
+        else:
+            if db_info:
+                stats.keys_count = int(db_stats.get("keys", 0)) if isinstance(db_stats, dict) else 0
+            else:
+                # No keyspace section: an empty instance, or a server without INFO
+                stats.keys_count = int(await self._execute(cache_type, "dbsize") or 0)
+            memory_bytes = await self._estimate_db_memory(cache_type, stats.keys_count)
+        stats.memory_usage_mb = memory_bytes / (1024 * 1024)
+        
+        server_stats = {
+            "avg_ttl_ms": int(db_stats.get("avg_ttl", 0)) if isinstance(db_stats, dict) else 0,
+            "keys_with_expiry": int(db_stats.get("expires", 0)) if isinstance(db_stats, dict) else 0
+        }
+        
+        if cache_type in self.memory_budgets:
+            used = int(await self._execute(cache_type, "get", self._budget_keys(cache_type)[2]) or 0)
+            server_stats["budget_used_mb"] = used / (1024 * 1024)
+            if PROMETHEUS_AVAILABLE:
+                CACHE_BUDGET_USED_BYTES.labels(cache_type=cache_type.name).set(used)
+        
+        if PROMETHEUS_AVAILABLE:
+            CACHE_KEYS.labels(cache_type=cache_type.name).set(stats.keys_count)
+            CACHE_MEMORY_BYTES.labels(cache_type=cache_type.name).set(memory_bytes)
+            REDIS_EVICTED_KEYS.set(stats.evictions)
+            REDIS_EXPIRED_KEYS.set(stats.expired_keys)
+        
+        return server_stats
+    
     async def get_stats(self, cache_type: Optional[CacheType] = None) -> Dict[str, Any]:
         """Get cache statistics"""
         if cache_type:
             # Stats for specific cache type
-            client = self.clients.get(cache_type)
             stats = self.stats[cache_type]
+            lookups = stats.hits + stats.misses
+            basic_stats = {
+                "cache_type": cache_type.name,
+                "hits": stats.hits,
+                "l1_hits": stats.l1_hits,
+                "l2_hits": stats.l2_hits,
+                "misses": stats.misses,
+                "hit_rate": stats.hits / lookups if lookups > 0 else 0,
+                "l1_hit_rate": stats.l1_hits / lookups if lookups > 0 else 0,
+                "sets": stats.sets
+            }
             
-            if client:
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                basic_stats["l1"] = l1.describe()
+            
+            if cache_type in self.memory_budgets:
+                basic_stats["memory_budget_mb"] = self.memory_budgets[cache_type] / (1024 * 1024)
+                basic_stats["budget_evictions"] = stats.budget_evictions
+            
+            if self._has_client(cache_type):
                 try:
-                    info = client.info("memory")
-                    db_info = client.info("keyspace")
-                    
-                    db_key = f"db{self.cache_configs[cache_type]['db']}"
-                    db_stats = db_info.get(db_key, {})
+                    server_stats = await self.refresh_server_metrics(cache_type)
+                    instance_info = await self._info(cache_type, "memory")
                     
                     return {
-                        "cache_type": cache_type.name,
-                        "hits": stats.hits,
-                        "misses": stats.misses,
-                        "hit_rate": stats.hits / (stats.hits + stats.misses) if (stats.hits + stats.misses) > 0 else 0,
-                        "sets": stats.sets,
-                        "memory_usage_mb": float(info.get("used_memory", 0)) / (1024 * 1024) if isinstance(info, dict) else 0.0,
-                        "keys_count": db_stats.get("keys", 0) if isinstance(db_stats, dict) else 0
+                        **basic_stats,
+                        "memory_usage_mb": stats.memory_usage_mb,
+                        "instance_memory_usage_mb": float(instance_info.get("used_memory", 0)) / (1024 * 1024),
+                        "keys_count": stats.keys_count,
+                        "evictions": stats.evictions,
+                        "expired_keys": stats.expired_keys,
+                        **server_stats
                     }
-                except:
-                    pass
+                except Exception as e:
+                    print(f"⚠️  Error reading Redis stats for {cache_type.name}: {e}")
             
             # Return basic stats if Redis not available
-            return {
-                "cache_type": cache_type.name,
-                "hits": stats.hits,
-                "misses": stats.misses,
-                "hit_rate": stats.hits / (stats.hits + stats.misses) if (stats.hits + stats.misses) > 0 else 0,
-                "sets": stats.sets
-            }
+            return basic_stats
         else:
             # Stats for all cache types
             all_stats = {}
@@ -375,13 +1611,23 @@ class RedisCacheMCPServer:
     
     async def flush_cache(self, cache_type: CacheType) -> bool:
         """Flush all data from a specific cache type"""
-        client = self.clients.get(cache_type)
-        
-        if not client:
+        if not self._has_client(cache_type):
             return True
             
         try:
-            client.flushdb()
+            l1 = self.l1_caches.get(cache_type)
+            if l1 is not None:
+                l1.clear()
+            
+            if self.cluster_modes[cache_type]:
+                # Every tier shares DB 0 in a cluster; only drop this tier's prefix
+                await self.invalidate_pattern(cache_type, "*")
+            else:
+                await self._execute_with_invalidation(
+                    cache_type,
+                    [("flushdb", ())],
+                    pattern=self._generate_key(cache_type, "*")
+                )
             # Reset stats
             self.stats[cache_type] = CacheStats()
             return True
@@ -398,14 +1644,16 @@ class RedisCacheMCPServer:
                 "service": "redis_cache",
                 "version": self.version,
                 "port": self.port,
+                "codec": self.codec.describe(),
+                "cluster": [ct.name for ct, cluster in self.cluster_modes.items() if cluster],
                 "caches": {}
             }
             
-            for cache_type, client in self.clients.items():
-                if client:
+            for cache_type in CacheType:
+                if self._has_client(cache_type):
                     try:
-                        client.ping()
-                        status = "connected"
+                        await self._execute(cache_type, "ping")
+                        status = "connected" if self.async_clients.get(cache_type) else "connected_sync_fallback"
                     except:
                         status = "disconnected"
                 else:
@@ -439,8 +1687,9 @@ class RedisCacheMCPServer:
             key = arguments.get("key", "")
             value = arguments.get("value")
             ttl = arguments.get("ttl")
+            tags = arguments.get("tags")
             
-            success = await self.set(cache_type, key, value, ttl)
+            success = await self.set(cache_type, key, value, ttl, tags)
             return {"success": success}
             
         elif name == "delete":
@@ -450,6 +1699,13 @@ class RedisCacheMCPServer:
             success = await self.delete(cache_type, key)
             return {"success": success}
             
+        elif name == "invalidate_tags":
+            cache_type = CacheType[arguments.get("cache_type", "CODING").upper()]
+            tags = arguments.get("tags", [])
+            
+            deleted = await self.invalidate_tags(cache_type, tags)
+            return {"deleted": deleted}
+            
         elif name == "cache_aggregation":
             aggregation_type = arguments.get("aggregation_type", "")
             project_id = arguments.get("project_id", "")
@@ -513,11 +1769,36 @@ class RedisCacheMCPServer:
                         },
                         "key": {"type": "string", "description": "Cache key"},
                         "value": {"description": "Value to cache"},
-                        "ttl": {"type": "integer", "description": "TTL in seconds"}
+                        "ttl": {"type": "integer", "description": "TTL in seconds"},
+                        "tags": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Invalidation tags, e.g. user:<id> or project:<id>"
+                        }
                     },
                     "required": ["cache_type", "key", "value"]
                 }
             },
+            {
+                "name": "invalidate_tags",
+                "description": "Invalidate every cached key registered under the given tags",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "cache_type": {
+                            "type": "string",
+                            "enum": ["coding", "business", "aggregation"],
+                            "description": "Cache type"
+                        },
+                        "tags": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "description": "Tags to invalidate"
+                        }
+                    },
+                    "required": ["cache_type", "tags"]
+                }
+            },
             {
                 "name": "cache_aggregation",
                 "description": "Cache dashboard aggregation",
@@ -555,6 +1836,11 @@ async def main():
     server = RedisCacheMCPServer()
     await server.initialize()
     
+    metrics_port = get_config_value("redis_cache_metrics_port")
+    if PROMETHEUS_AVAILABLE and metrics_port:
+        start_http_server(int(metrics_port))
+        print(f"📊 Redis cache metrics exposed on port {metrics_port}")
+    
     # In real implementation, would start MCP protocol server
     print(f"🚀 Redis Cache MCP Server running on port {server.port}")
     
@@ -562,9 +1848,17 @@ async def main():
     try:
         while True:
             await asyncio.sleep(60)
-            # Could add periodic stats logging here
+            # Refresh server-side gauges (keys, memory, evictions)
+            for cache_type in CacheType:
+                if server._has_client(cache_type):
+                    try:
+                        await server.refresh_server_metrics(cache_type)
+                    except Exception as e:
+                        print(f"⚠️  Failed to refresh {cache_type.name} metrics: {e}")
     except KeyboardInterrupt:
         print("\n👋 Shutting down Redis Cache Server")
+    finally:
+        await server.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Redis Cache Tier Benchmark
+Drive a realistic get / get_many / set_many / invalidate / aggregation mix
+through RedisCacheMCPServer and report throughput and p50/p95/p99 latency
+per operation.
+
+Runs offline against an in-process fakeredis server (pip install fakeredis lupa),
+against a throwaway redis-server binary started on a free port, or against an
+existing Redis URL. Unlike the server's mock mode, every operation executes the
+real cache code path (codec, L1, pipelines, tags, budgets, single-flight).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_redis_cache_codecs import make_embedding, make_search_payload
+from mcp_servers.redis.cache_codec import CacheCodec
+from mcp_servers.redis.redis_cache_layer import CacheType, RedisCacheMCPServer
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+try:
+    import fakeredis
+    FAKEREDIS_AVAILABLE = True
+except ImportError:
+    FAKEREDIS_AVAILABLE = False
+
+
+# Default operation mix, as relative weights
+DEFAULT_MIX = {
+    "get": 55,
+    "get_many": 15,
+    "set": 5,
+    "set_many": 10,
+    "aggregation": 10,
+    "invalidate_tags": 4,
+    "invalidate_pattern": 1
+}
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    """Parse ``op=weight,op=weight`` into a weight table"""
+    if not spec:
+        return dict(DEFAULT_MIX)
+
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_redis_server(binary: str) -> Tuple[subprocess.Popen, str]:
+    """Start a throwaway, non-persistent redis-server and wait until it answers"""
+    port = free_port()
+    process = subprocess.Popen(
+        [binary, "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, f"redis://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+
+    process.terminate()
+    raise RuntimeError(f"redis-server did not start on port {port}")
+
+
+def build_clients(server: RedisCacheMCPServer, backend: str, url: Optional[str]) -> Dict[CacheType, Any]:
+    """One asyncio client per cache type, on the database configured for that type"""
+    clients = {}
+    fake_server = fakeredis.FakeServer() if backend == "fakeredis" else None
+
+    for cache_type, config in server.cache_configs.items():
+        if fake_server is not None:
+            clients[cache_type] = fakeredis.aioredis.FakeRedis(server=fake_server, db=config["db"])
+        else:
+            clients[cache_type] = aioredis.Redis.from_url(url, db=config["db"])
+
+    return clients
+
+
+class Workload:
+    """Generates keys and payloads with a skewed (hot/cold) key distribution"""
+
+    def __init__(self, rng: random.Random, keys: int, batch: int, projects: int, hot_fraction: float):
+        self.rng = rng
+        self.keys = keys
+        self.batch = batch
+        self.projects = projects
+        self.hot_keys = max(1, int(keys * hot_fraction))
+
+        # A small pool of prebuilt payloads keeps generation cost out of the timings
+        self.payloads = [make_search_payload(rng, n) for n in (5, 10, 20)]
+        self.embedding = make_embedding(rng)
+
+    def key(self) -> str:
+        # 80% of traffic goes to the hot set
+        if self.rng.random() < 0.8:
+            return f"search:{self.rng.randrange(self.hot_keys)}"
+        return f"search:{self.rng.randrange(self.keys)}"
+
+    def batch_keys(self) -> List[str]:
+        return [self.key() for _ in range(self.batch)]
+
+    def user_tag(self, key: str) -> str:
+        return f"user:{self._index(key) % 50}"
+
+    def value(self, key: str) -> Any:
+        # Every tenth key holds an embedding, the rest search results
+        index = self._index(key)
+        if index % 10 == 7:
+            return self.embedding
+        return self.payloads[index % len(self.payloads)]
+
+    @staticmethod
+    def _index(key: str) -> int:
+        return int(key.rsplit(":", 1)[1])
+
+    def project(self) -> str:
+        return f"project_{self.rng.randrange(self.projects)}"
+
+
+def build_operations(server: RedisCacheMCPServer,
+                     workload: Workload,
+                     compute_delay: float) -> Dict[str, Callable[[], Awaitable[Any]]]:
+    cache_type = CacheType.CODING
+
+    async def op_get():
+        return await server.get(cache_type, workload.key())
+
+    async def op_get_many():
+        return await server.get_many(cache_type, workload.batch_keys())
+
+    async def op_set():
+        key = workload.key()
+        return await server.set(cache_type, key, workload.value(key), 300, tags=[workload.user_tag(key)])
+
+    async def op_set_many():
+        items = {key: workload.value(key) for key in workload.batch_keys()}
+        return await server.set_many(cache_type, items, 300)
+
+    async def op_aggregation():
+        project = workload.project()
+
+        async def producer():
+            # Stands in for the PostgreSQL aggregation query
+            await asyncio.sleep(compute_delay)
+            return {"project_id": project, "total": workload.rng.random(), "series": list(range(24))}
+
+        return await server.get_aggregation("daily_metrics", project, producer=producer, ttl=60)
+
+    async def op_invalidate_tags():
+        return await server.invalidate_tags(cache_type, [f"user:{workload.rng.randrange(50)}"])
+
+    async def op_invalidate_pattern():
+        return await server.invalidate_pattern(cache_type, f"search:{workload.rng.randrange(10)}*")
+
+    return {
+        "get": op_get,
+        "get_many": op_get_many,
+        "set": op_set,
+        "set_many": op_set_many,
+        "aggregation": op_aggregation,
+        "invalidate_tags": op_invalidate_tags,
+        "invalidate_pattern": op_invalidate_pattern
+    }
+
+
+async def warm_up(server: RedisCacheMCPServer, workload: Workload):
+    """Populate the keyspace so reads measure a realistic hit ratio"""
+    keys = [f"search:{i}" for i in range(workload.keys)]
+    for start in range(0, len(keys), 500):
+        items = {key: workload.value(key) for key in keys[start:start + 500]}
+        await server.set_many(CacheType.CODING, items, 300)
+    for key in keys[:workload.hot_keys]:
+        await server.set(CacheType.CODING, key, workload.value(key), 300, tags=[workload.user_tag(key)])
+
+
+async def run_benchmark(server: RedisCacheMCPServer,
+                        operations: Dict[str, Callable[[], Awaitable[Any]]],
+                        mix: Dict[str, int],
+                        concurrency: int,
+                        total_ops: int,
+                        rng: random.Random) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    """Run ``total_ops`` operations drawn from the mix across ``concurrency`` workers"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    schedule = rng.choices(names, weights=weights, k=total_ops)
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    cursor = iter(schedule)
+
+    async def worker():
+        for name in cursor:
+            start = time.perf_counter()
+            try:
+                await operations[name]()
+            except Exception:
+                errors[name] += 1
+            latencies[name].append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def report(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float, stats: Dict[str, Any]):
+    total = sum(len(values) for values in latencies.values())
+
+    print(f"\n{'operation':<20} {'count':>8} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    print("-" * 78)
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        print(f"{name:<20} {len(values):>8} {len(values) / elapsed:>10.0f} "
+              f"{percentile(values, 50):>9.3f} {percentile(values, 95):>9.3f} "
+              f"{percentile(values, 99):>9.3f} {errors.get(name, 0):>7}")
+    print("-" * 78)
+    print(f"{'total':<20} {total:>8} {total / elapsed:>10.0f}   in {elapsed:.2f}s")
+
+    print(f"\n📊 Hit rate {stats.get('hit_rate', 0.0):.1%} "
+          f"(L1 {stats.get('l1_hits', 0)}, L2 {stats.get('l2_hits', 0)}, misses {stats.get('misses', 0)}), "
+          f"sets {stats.get('sets', 0)}, budget evictions {stats.get('budget_evictions', 0)}")
+
+
+async def main_async(args):
+    server = RedisCacheMCPServer()
+    server.configure_l1(args.l1)
+    if args.codec or args.compression:
+        # Flags override the configured codec; settings they do not cover are kept
+        configured = server.codec.describe()
+        server.codec = CacheCodec(
+            preferred=args.codec or configured["codec"],
+            compression=args.compression or configured["compression"],
+            compression_threshold=configured["compression_threshold"],
+            allow_pickle=args.codec == "pickle" if args.codec else configured["allow_pickle"],
+            legacy_pickle=configured["legacy_pickle"],
+            narrow_vectors=configured["narrow_vectors"]
+        )
+    codec = server.codec.describe()
+    for flag, requested in (("codec", args.codec), ("compression", args.compression)):
+        if requested and requested != "auto" and codec[flag] != requested:
+            print(f"⚠️  --{flag} {requested} is not installed here, using {codec[flag]}")
+
+    process = None
+    url = args.url
+    if args.backend == "redis-server":
+        binary = args.redis_server or shutil.which("redis-server")
+        if not binary:
+            raise SystemExit("❌ redis-server binary not found (use --redis-server PATH or --backend fakeredis)")
+        process, url = start_redis_server(binary)
+        print(f"🚀 Started throwaway redis-server at {url}")
+
+    try:
+        await server.attach_clients(build_clients(server, args.backend, url))
+        for client in server.async_clients.values():
+            await client.flushdb()
+
+        rng = random.Random(args.seed)
+        workload = Workload(rng, args.keys, args.batch, args.projects, args.hot_fraction)
+        operations = build_operations(server, workload, args.compute_delay_ms / 1000)
+        mix = parse_mix(args.mix)
+        if args.backend == "fakeredis" and not args.mix:
+            # fakeredis walks the whole keyspace for every SCAN page, so one
+            # invalidate_pattern takes seconds there and would dominate the run
+            mix.pop("invalidate_pattern")
+
+        print(f"🔥 Warming {args.keys} keys ({args.backend}, L1 {'on' if args.l1 else 'off'}, "
+              f"codec {codec['codec']}+{codec['compression']}, pickle {'on' if codec['allow_pickle'] else 'off'})")
+        await warm_up(server, workload)
+
+        print(f"⏱️  Running {args.ops} operations with concurrency {args.concurrency} "
+              f"({', '.join(f'{name}={weight}' for name, weight in mix.items())})")
+        latencies, errors, elapsed = await run_benchmark(
+            server, operations, mix, args.concurrency, args.ops, rng
+        )
+
+        report(latencies, errors, elapsed, await server.get_stats(CacheType.CODING))
+    finally:
+        await server.close()
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Redis cache tier")
+    parser.add_argument("--backend", choices=["fakeredis", "redis-server", "url"], default="fakeredis",
+                        help="fakeredis (in-process), redis-server (throwaway local binary) or url")
+    parser.add_argument("--url", default="redis://localhost:6379", help="Redis URL for --backend url")
+    parser.add_argument("--redis-server", help="Path to the redis-server binary")
+    parser.add_argument("--ops", type=int, default=20000, help="Total operations to run")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--keys", type=int, default=5000, help="Keyspace size")
+    parser.add_argument("--hot-fraction", type=float, default=0.05, help="Share of keys receiving 80%% of traffic")
+    parser.add_argument("--batch", type=int, default=50, help="Keys per get_many/set_many call")
+    parser.add_argument("--projects", type=int, default=20, help="Distinct aggregation projects")
+    parser.add_argument("--compute-delay-ms", type=float, default=5.0, help="Simulated aggregation query time")
+    parser.add_argument("--mix", help="Operation weights, e.g. get=60,get_many=20,set_many=10,aggregation=10 "
+                                      "(the fakeredis default leaves out invalidate_pattern)")
+    parser.add_argument("--l1", action="store_true", help="Enable the in-process L1 cache")
+    parser.add_argument("--codec", choices=["auto", "msgpack", "orjson", "pickle"], help="Override the cache codec")
+    parser.add_argument("--compression", choices=["auto", "zstd", "lz4", "none"], help="Override the cache compression")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.backend == "fakeredis" and not FAKEREDIS_AVAILABLE:
+        raise SystemExit("❌ fakeredis is not installed (pip install fakeredis lupa)")
+    if args.backend != "fakeredis" and not REDIS_AVAILABLE:
+        raise SystemExit("❌ redis is not installed (pip install redis)")
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Redis Cache Codec Benchmark
+Compare encoded size and encode/decode latency of the cache codecs on
+realistic UnifiedMemoryService._merge_search_results payloads and embeddings
+"""
+
+import argparse
+import os
+import pickle
+import random
+import statistics
+import string
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mcp_servers.redis.cache_codec import (
+    CacheCodec,
+    LZ4_AVAILABLE,
+    MSGPACK_AVAILABLE,
+    NUMPY_AVAILABLE,
+    ORJSON_AVAILABLE,
+    ZSTD_AVAILABLE,
+)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+        for _ in range(words)
+    )
+
+
+def make_search_payload(rng: random.Random, results: int) -> Dict[str, Any]:
+    """Build a payload shaped like UnifiedMemoryService._merge_search_results output"""
+    merged = []
+    for i in range(results):
+        source = "qdrant" if i % 3 else "mem0"
+        item = {
+            "content": _sentence(rng, rng.randint(20, 80)),
+            "score": rng.random(),
+            "metadata": {
+                "repository": "sophia-ai",
+                "language": "python",
+                "user_id": f"user_{rng.randint(1, 50)}",
+                "timestamp": "2025-07-16T21:21:44.123456",
+                "tags": [_sentence(rng, 1) for _ in range(3)]
+            },
+            "source": source
+        }
+        if source == "qdrant" and i % 2:
+            item["mem0_score"] = rng.random()
+            item["mem0_metadata"] = {"context": "coding", "user_id": item["metadata"]["user_id"]}
+        merged.append(item)
+
+    merged.sort(key=lambda x: x["score"], reverse=True)
+    return {"results": merged, "count": len(merged), "sources": ["qdrant", "mem0"]}
+
+
+def make_embedding(rng: random.Random, dims: int = 1536) -> Any:
+    """Build a unit embedding vector like UnifiedMemoryService._generate_embeddings"""
+    if NUMPY_AVAILABLE:
+        import numpy as np
+        vector = np.random.default_rng(rng.randint(0, 2**32 - 1)).standard_normal(dims)
+        return vector / np.linalg.norm(vector)
+
+    from array import array
+    return array("d", (rng.gauss(0, 1) for _ in range(dims)))
+
+
+def build_codecs() -> List[Tuple[str, Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    """Legacy pickle, every codec/compression combination installed here and the default"""
+    codecs = [("pickle (legacy)", pickle.dumps, pickle.loads)]
+
+    structured = ["pickle"]
+    if ORJSON_AVAILABLE:
+        structured.append("orjson")
+    if MSGPACK_AVAILABLE:
+        structured.append("msgpack")
+
+    compressions = ["none"]
+    if ZSTD_AVAILABLE:
+        compressions.append("zstd")
+    if LZ4_AVAILABLE:
+        compressions.append("lz4")
+
+    # Combinations compress every payload; "default" is what the cache server runs
+    for name in structured:
+        for compression in compressions:
+            codec = CacheCodec(preferred=name, compression=compression,
+                               compression_threshold=0, allow_pickle=name == "pickle")
+            codecs.append((f"{name}+{compression}", codec.encode, codec.decode))
+
+    default = CacheCodec()
+    codecs.append(("default", default.encode, default.decode))
+    return codecs
+
+
+def bench(encode: Callable[[Any], bytes], decode: Callable[[bytes], Any],
+          value: Any, iterations: int) -> Dict[str, float]:
+    """Measure encoded size and median encode/decode time in microseconds"""
+    encoded = encode(value)
+    encode_times = []
+    decode_times = []
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        encode(value)
+        encode_times.append((time.perf_counter() - start) * 1e6)
+
+        start = time.perf_counter()
+        decode(encoded)
+        decode_times.append((time.perf_counter() - start) * 1e6)
+
+    return {
+        "bytes": len(encoded),
+        "encode_us": statistics.median(encode_times),
+        "decode_us": statistics.median(decode_times)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Redis cache codecs")
+    parser.add_argument("--results", type=int, nargs="+", default=[5, 10, 50],
+                        help="Search result counts per payload")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [(f"search results x{n}", make_search_payload(rng, n)) for n in args.results]
+    payloads.append(("embedding 1536d", make_embedding(rng)))
+
+    codecs = build_codecs()
+
+    print(f"{'payload':<22} {'codec':<22} {'bytes':>9} {'encode µs':>11} {'decode µs':>11}")
+    print("-" * 79)
+    for payload_name, payload in payloads:
+        for codec_name, encode, decode in codecs:
+            result = bench(encode, decode, payload, args.iterations)
+            print(f"{payload_name:<22} {codec_name:<22} {result['bytes']:>9} "
+                  f"{result['encode_us']:>11.1f} {result['decode_us']:>11.1f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
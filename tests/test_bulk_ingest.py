@@ -0,0 +1,141 @@
+"""
+Tests for COPY-based bulk ingestion, run against a stand-in asyncpg pool
+"""
+
+from contextlib import asynccontextmanager
+
+import asyncpg
+import pytest
+
+from mcp_servers.postgresql.structured_data_store import PostgreSQLMCPServer
+
+PROJECTS = {"p1": 11, "p2": 12}
+
+
+class FakeTransaction:
+    def __init__(self, conn: "FakeConnection"):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.pending = []
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.committed.extend(self.conn.pending)
+        else:
+            self.conn.rollbacks += 1
+        self.conn.pending = []
+        return False
+
+
+class FakeConnection:
+    """Records writes per chunk; rows only become visible when their transaction commits"""
+
+    def __init__(self, poison: str = None):
+        self.poison = poison
+        self.lookups = 0
+        self.copies = []
+        self.inserts = []
+        self.pending = []
+        self.committed = []
+        self.rollbacks = 0
+
+    async def fetch(self, query, keys):
+        self.lookups += 1
+        return [{"key": k, "project_id": k, "name": k, "id": PROJECTS[k]} for k in keys if k in PROJECTS]
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    async def copy_records_to_table(self, table, records, columns, schema_name):
+        self.copies.append(len(records))
+        self._write(records)
+
+    async def executemany(self, query, records):
+        self.inserts.append(len(records))
+        self._write(records)
+
+    def _write(self, records):
+        self.pending.extend(records)
+        if self.poison and any(self.poison in record for record in records):
+            raise asyncpg.CheckViolationError("new row violates check constraint")
+
+
+class FakePool:
+    def __init__(self, conn: FakeConnection):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def insight(content: str, project_id: str = "p1", **overrides):
+    row = {"project_id": project_id, "insight_type": "risk", "content": content, "confidence_score": 0.5}
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture
+def server():
+    server = PostgreSQLMCPServer()
+    server.bulk_chunk_size = 3
+    server.bulk_copy_threshold = 3
+    return server
+
+
+def connect(server: PostgreSQLMCPServer, **kwargs) -> FakeConnection:
+    conn = FakeConnection(**kwargs)
+    server.pool = FakePool(conn)
+    return conn
+
+
+async def test_rows_are_copied_in_chunks_with_one_lookup(server):
+    conn = connect(server)
+    result = await server.add_insights_bulk([insight(f"insight {i}") for i in range(7)])
+
+    assert result.inserted == 7 and result.failed == 0
+    assert conn.copies == [3, 3]  # full chunks use COPY
+    assert conn.inserts == [1]  # the short tail uses executemany
+    assert conn.lookups == 1
+    assert [record[0] for record in conn.committed] == [PROJECTS["p1"]] * 7
+
+
+async def test_failing_chunk_rolls_back_only_its_rows(server):
+    conn = connect(server, poison="bad")
+    rows = [insight(f"insight {i}") for i in range(6)]
+    rows[4] = insight("bad")
+    result = await server.add_insights_bulk(rows)
+
+    assert result.success == [True, True, True, False, False, False]
+    assert sorted(result.errors) == [3, 4, 5]
+    assert conn.rollbacks == 1
+    assert [record[2] for record in conn.committed] == ["insight 0", "insight 1", "insight 2"]
+
+
+async def test_unknown_parents_and_missing_fields_are_reported_per_row(server):
+    conn = connect(server)
+    rows = [
+        insight("kept"),
+        insight("orphan", project_id="unknown"),
+        {"project_id": "p2", "insight_type": "risk"},
+        insight("also kept", project_id="p2")
+    ]
+    result = await server.add_insights_bulk(rows)
+
+    assert result.to_dict() == {
+        "inserted": 2,
+        "failed": 2,
+        "success": [True, False, False, True],
+        "errors": [
+            {"index": 1, "error": "Unknown project 'unknown'"},
+            {"index": 2, "error": "Missing field 'content'"}
+        ]
+    }
+    assert [record[2] for record in conn.committed] == ["kept", "also kept"]
+
+
+async def test_rows_fail_cleanly_without_a_pool(server):
+    result = await server.add_insights_bulk([insight("a"), insight("b")])
+    assert result.failed == 2
+    assert set(result.errors.values()) == {"PostgreSQL not connected"}
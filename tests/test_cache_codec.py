@@ -0,0 +1,167 @@
+"""
+Tests for the Redis cache value codecs
+"""
+
+import pickle
+from array import array
+from datetime import datetime
+
+import pytest
+
+from mcp_servers.redis.cache_codec import (
+    CODEC_MASK,
+    COMPRESSION_MASK,
+    CacheCodec,
+    Codec,
+    Compression,
+    MSGPACK_AVAILABLE,
+    NUMPY_AVAILABLE,
+    ORJSON_AVAILABLE,
+    PickleDisabledError,
+    ZSTD_AVAILABLE,
+)
+
+RESULTS = {"results": [{"id": i, "content": f"insight {i}", "score": 0.5} for i in range(50)]}
+
+
+def header(data: bytes):
+    return Codec(data[0] & CODEC_MASK), Compression(data[0] & COMPRESSION_MASK)
+
+
+def test_legacy_pickle_values_decode_during_rollout():
+    codec = CacheCodec(legacy_pickle=True)
+    legacy = pickle.dumps({"a": [1, 2, 3]})
+    assert codec.decode(legacy) == {"a": [1, 2, 3]}
+
+
+def test_pickle_is_refused_by_default():
+    codec = CacheCodec()
+    with pytest.raises(PickleDisabledError):
+        codec.decode(pickle.dumps({"a": 1}))
+
+    framed = CacheCodec(compression="none", allow_pickle=True).encode({"tags": {"a"}})
+    with pytest.raises(PickleDisabledError):
+        codec.decode(framed)
+
+
+@pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+def test_default_codec_stores_search_payloads_as_uncompressed_orjson():
+    data = CacheCodec().encode(RESULTS)
+    assert header(data) == (Codec.ORJSON, Compression.NONE)
+
+
+@pytest.mark.skipif(not MSGPACK_AVAILABLE, reason="msgpack not installed")
+def test_structured_values_round_trip_with_msgpack():
+    codec = CacheCodec(preferred="msgpack", compression="none")
+    data = codec.encode(RESULTS)
+    assert header(data) == (Codec.MSGPACK, Compression.NONE)
+    assert codec.decode(data) == RESULTS
+
+
+def test_values_structured_codecs_cannot_type_fall_back_to_pickle_when_allowed():
+    codec = CacheCodec(compression="none", allow_pickle=True)
+    value = {"at": datetime(2024, 1, 1), "tags": {"a", "b"}}
+    data = codec.encode(value)
+    assert header(data)[0] == Codec.PICKLE
+    assert codec.decode(data) == value
+
+
+@pytest.mark.parametrize("preferred", ["orjson", "msgpack"])
+def test_datetimes_are_stored_as_iso_strings_without_pickle(preferred):
+    codec = CacheCodec(preferred=preferred, compression="none")
+    value = {"at": datetime(2024, 1, 1, 12, 30), "rows": [{"seen": datetime(2024, 2, 1)}]}
+    data = codec.encode(value)
+    assert header(data)[0] == Codec[preferred.upper()]
+
+    decoded = codec.decode(data)
+    assert decoded == {"at": "2024-01-01T12:30:00", "rows": [{"seen": "2024-02-01T00:00:00"}]}
+    assert datetime.fromisoformat(decoded["at"]) == value["at"]
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+@pytest.mark.parametrize("preferred", ["orjson", "msgpack"])
+def test_nested_arrays_are_stored_as_lists_without_pickle(preferred):
+    import numpy as np
+
+    codec = CacheCodec(preferred=preferred, compression="none")
+    value = {
+        "embedding": np.array([0.5, 0.25], dtype=np.float32),
+        "ids": np.arange(6).reshape(2, 3)[:, ::2],  # not contiguous
+        "score": np.float64(0.75),
+        "weights": array("d", [1.0, 2.0])
+    }
+    decoded = codec.decode(codec.encode(value))
+    assert decoded == {"embedding": [0.5, 0.25], "ids": [[0, 2], [3, 5]], "score": 0.75, "weights": [1.0, 2.0]}
+
+
+def test_unencodable_values_rejected_without_pickle():
+    codec = CacheCodec(compression="none")
+    with pytest.raises(TypeError):
+        codec.encode({"tags": {"a", "b"}})
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+def test_numpy_vectors_round_trip_as_float32():
+    import numpy as np
+
+    codec = CacheCodec(compression="none")
+    vector = np.linspace(0.0, 1.0, 384, dtype=np.float32)
+    data = codec.encode(vector)
+    assert header(data)[0] == Codec.FLOAT32
+    assert len(data) == 1 + 384 * 4
+    decoded = codec.decode(data)
+    assert decoded.dtype == np.float32
+    assert np.array_equal(decoded, vector)
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+def test_float64_vectors_are_narrowed_unless_disabled():
+    import numpy as np
+
+    vector = np.linspace(0.0, 1.0, 384)
+    narrowed = CacheCodec(compression="none").encode(vector)
+    assert header(narrowed)[0] == Codec.FLOAT32
+
+    codec = CacheCodec(compression="none", narrow_vectors=False)
+    data = codec.encode(vector)
+    assert header(data)[0] == Codec.FLOAT64
+    decoded = codec.decode(data)
+    assert decoded.dtype == np.float64
+    assert np.array_equal(decoded, vector)
+
+
+def test_float_arrays_round_trip_as_float32():
+    codec = CacheCodec(compression="none")
+    vector = array("f", [0.25, -1.5, 3.0])
+    data = codec.encode(vector)
+    assert header(data)[0] == Codec.FLOAT32
+    assert list(codec.decode(data)) == [0.25, -1.5, 3.0]
+
+    codec = CacheCodec(compression="none", narrow_vectors=False)
+    data = codec.encode(array("d", [0.1, 0.2]))
+    assert header(data)[0] == Codec.FLOAT64
+    assert list(codec.decode(data)) == [0.1, 0.2]
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_large_payloads_are_compressed():
+    codec = CacheCodec(compression="zstd", compression_threshold=1024)
+    value = {"text": "the same line over and over " * 200}
+    data = codec.encode(value)
+    assert header(data)[1] == Compression.ZSTD
+    assert len(data) < 1024
+    assert codec.decode(data) == value
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="zstandard not installed")
+def test_payloads_below_threshold_are_not_compressed():
+    codec = CacheCodec(compression="zstd", compression_threshold=1024)
+    data = codec.encode({"text": "short"})
+    assert header(data)[1] == Compression.NONE
+
+
+def test_compressed_values_decode_with_any_configuration():
+    writer = CacheCodec(compression="auto", compression_threshold=64)
+    reader = CacheCodec(compression="none")
+    value = {"text": "repeat " * 100}
+    assert reader.decode(writer.encode(value)) == value
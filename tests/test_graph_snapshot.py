@@ -0,0 +1,198 @@
+"""
+Tests for the in-memory relationship graph
+"""
+
+import asyncio
+import time
+
+from mcp_servers.postgresql.graph_snapshot import GraphSnapshot, weighted_shortest_path
+from mcp_servers.postgresql.structured_data_store import PostgreSQLMCPServer
+
+EDGES = [
+    # id, source, target, type, strength
+    (1, ("company", 1), ("contact", 1), "employs", 1.0),
+    (2, ("company", 1), ("contact", 2), "employs", 0.5),
+    (3, ("contact", 1), ("deal", 1), "owns", 1.0),
+    (4, ("contact", 2), ("deal", 1), "owns", 0.1),
+    (5, ("company", 1), ("deal", 1), "sponsors", 0.2),
+]
+
+
+def rows(edges):
+    return [
+        {
+            "id": edge_id,
+            "source_type": source[0], "source_id": source[1],
+            "target_type": target[0], "target_id": target[1],
+            "relationship_type": relationship_type,
+            "strength": strength
+        }
+        for edge_id, source, target, relationship_type, strength in edges
+    ]
+
+
+def build(edges=EDGES, **kwargs) -> GraphSnapshot:
+    snapshot = GraphSnapshot(**kwargs)
+    snapshot.add_edges(rows(edges))
+    snapshot.compact()
+    snapshot.built = True
+    return snapshot
+
+
+def test_neighbors_are_strongest_first():
+    snapshot = build()
+    neighbors = snapshot.neighbors(("company", 1), direction="out")
+    assert [(n["node_type"], n["node_id"]) for n in neighbors] == [("contact", 1), ("contact", 2), ("deal", 1)]
+    assert [n["strength"] for n in neighbors] == [1.0, 0.5, 0.2]
+
+
+def test_incoming_and_type_filtered_neighbors():
+    snapshot = build()
+    incoming = snapshot.neighbors(("deal", 1), direction="in", relationship_type="owns")
+    assert {(n["node_type"], n["node_id"]) for n in incoming} == {("contact", 1), ("contact", 2)}
+    assert all(n["direction"] == "in" for n in incoming)
+    assert snapshot.neighbors(("deal", 1), relationship_type="unknown") == []
+
+
+def test_traverse_respects_depth_and_fanout():
+    snapshot = build()
+    reached = snapshot.traverse(("company", 1), max_depth=1, fanout=2)
+    assert [(r["node_type"], r["node_id"]) for r in reached] == [("contact", 1), ("contact", 2)]
+
+    reached = snapshot.traverse(("company", 1), max_depth=2, fanout=1)
+    assert [(r["node_type"], r["node_id"], r["depth"]) for r in reached] == [
+        ("contact", 1, 1), ("deal", 1, 2)
+    ]
+
+
+def test_shortest_path_prefers_strong_edges():
+    snapshot = build()
+    path = snapshot.shortest_path(("company", 1), ("deal", 1), max_hops=3)
+    assert [(p["node_type"], p["node_id"]) for p in path["path"]] == [("company", 1), ("contact", 1), ("deal", 1)]
+    assert path["cost"] == 2.0
+    assert [e["relationship_type"] for e in path["edges"]] == ["employs", "owns"]
+
+
+def test_shortest_path_honours_max_hops():
+    snapshot = build()
+    path = snapshot.shortest_path(("company", 1), ("deal", 1), max_hops=1)
+    assert path["hops"] == 1
+    assert path["cost"] == 5.0
+    assert snapshot.shortest_path(("deal", 1), ("company", 1)) is None
+
+
+def test_weighted_shortest_path_skips_non_positive_strengths():
+    a, b, c, d = (("n", i) for i in range(4))
+    graph = {a: [(b, "t", 0.0), (c, "t", 0.5)], b: [(d, "t", 1.0)], c: [(d, "t", 0.5)]}
+    path = weighted_shortest_path(a, d, lambda node: graph.get(node, []), max_hops=3)
+    assert path["cost"] == 4.0
+    assert [p["node_id"] for p in path["path"]] == [0, 2, 3]
+
+
+def test_pending_edges_are_visible_before_compaction():
+    snapshot = build()
+    snapshot.add_edges(rows([(6, ("company", 1), ("contact", 3), "employs", 0.9)]))
+
+    assert snapshot.pending_edges == 1
+    assert snapshot.high_water_id == 6
+    neighbors = snapshot.neighbors(("company", 1), direction="out", relationship_type="employs")
+    assert [n["node_id"] for n in neighbors] == [1, 3, 2]
+
+    snapshot.compact()
+    assert snapshot.pending_edges == 0
+    assert snapshot.edge_count == 6
+
+
+def test_type_limited_snapshot_skips_other_types():
+    snapshot = build(relationship_types=["employs"])
+    assert snapshot.edge_count == 2
+    assert snapshot.high_water_id == 5
+    assert snapshot.covers("employs")
+    assert not snapshot.covers("owns")
+    assert not snapshot.covers(None)
+
+
+def graph_server(snapshot) -> PostgreSQLMCPServer:
+    server = PostgreSQLMCPServer()
+    server.graph_snapshot_enabled = True
+    server.pool = object()
+    server.graph_snapshot = snapshot
+    server._graph_built_at = server._graph_refreshed_at = 10 ** 12  # no rebuild due
+    return server
+
+
+async def test_incremental_refresh_applies_the_delta_after_the_last_read():
+    server = graph_server(build())
+    snapshot = server.graph_snapshot
+
+    batches = [
+        rows([(6 + i, ("company", 2), ("contact", 10 + i), "employs", 0.5) for i in range(10000)]),
+        rows([(10006, ("company", 2), ("deal", 9), "sponsors", 0.3)])
+    ]
+    seen = []
+
+    async def read(operation):
+        # Readers running between batches must see the snapshot untouched
+        seen.append((snapshot.high_water_id, snapshot.pending_edges))
+        return batches.pop(0)
+
+    server._read = read
+    assert await server.refresh_graph_snapshot()
+
+    assert seen == [(5, 0), (5, 0)]
+    refreshed = server.graph_snapshot
+    assert refreshed is not snapshot and snapshot.high_water_id == 5
+    assert (refreshed.high_water_id, refreshed.edge_count, refreshed.pending_edges) == (10006, 10006, 0)
+    assert len(refreshed.neighbors(("company", 1), direction="out")) == 3
+
+
+async def test_small_deltas_are_appended_in_place():
+    server = graph_server(build())
+    snapshot = server.graph_snapshot
+    batches = [rows([(6, ("company", 1), ("contact", 3), "employs", 0.9)])]
+
+    async def read(operation):
+        return batches.pop(0)
+
+    server._read = read
+    assert await server.refresh_graph_snapshot()
+    assert server.graph_snapshot is snapshot
+    assert (snapshot.high_water_id, snapshot.pending_edges) == (6, 1)
+
+
+async def test_full_refresh_never_holds_the_loop_longer_than_a_batch():
+    server = graph_server(None)
+    edges = rows([(i, ("contact", i % 5000), ("deal", i % 7919), "owns", (i % 10 + 1) / 10) for i in range(1, 100001)])
+    batches = [edges[i:i + 10000] for i in range(0, len(edges), 10000)] + [[]]
+
+    # What the loop used to spend per batch: add 10k rows and compact them
+    one_batch = 0.0
+    for _ in range(3):
+        started = time.perf_counter()
+        GraphSnapshot.from_rows(batches[0])
+        one_batch = max(one_batch, time.perf_counter() - started)
+
+    async def read(operation):
+        await asyncio.sleep(0)
+        return batches.pop(0)
+
+    gaps = []
+    done = asyncio.Event()
+
+    async def watch_loop():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    server._read = read
+    watcher = asyncio.create_task(watch_loop())
+    assert await server.refresh_graph_snapshot(full=True)
+    done.set()
+    await watcher
+
+    assert server.graph_snapshot.edge_count == 100000
+    assert server.graph_snapshot.compactions == 1
+    assert max(gaps) < one_batch
@@ -0,0 +1,60 @@
+"""
+Tests for the in-process L1 cache
+"""
+
+from mcp_servers.redis.local_cache import LocalLRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LocalLRUCache(max_entries=2, max_bytes=1024, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"  # "b" is now the oldest
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.get("c") == b"3"
+    assert cache.evictions == 1
+
+
+def test_byte_budget_evicts_until_it_fits():
+    cache = LocalLRUCache(max_entries=100, max_bytes=10, ttl=60)
+    cache.set("a", b"xxxx")
+    cache.set("b", b"xxxx")
+    cache.set("c", b"xxxx")
+
+    assert cache.get("a") is None
+    assert len(cache) == 2
+    assert cache.current_bytes == 8
+
+
+def test_oversized_value_is_not_cached_and_drops_stale_copy():
+    cache = LocalLRUCache(max_entries=10, max_bytes=4, ttl=60)
+    cache.set("a", b"12")
+    cache.set("a", b"123456")
+
+    assert cache.get("a") is None
+    assert cache.current_bytes == 0
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("mcp_servers.redis.local_cache.time.monotonic", lambda: now[0])
+    cache = LocalLRUCache(max_entries=10, max_bytes=1024, ttl=30)
+    cache.set("a", b"1")
+    cache.set("b", b"2", ttl=5)
+
+    now[0] += 10
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+
+
+def test_delete_pattern_uses_redis_globs():
+    cache = LocalLRUCache(max_entries=10, max_bytes=1024, ttl=60)
+    for key in ("coding:file:1", "coding:file:2", "coding:symbol:1"):
+        cache.set(key, b"x")
+
+    assert cache.delete_pattern("coding:file:*") == 2
+    assert cache.get("coding:symbol:1") == b"x"
+    assert cache.current_bytes == 1
@@ -0,0 +1,46 @@
+"""
+Tests for the PostgreSQL foreign-key lookup cache
+"""
+
+from mcp_servers.postgresql.lookup_cache import IdLookupCache
+
+
+def test_hits_and_misses_are_counted():
+    cache = IdLookupCache(max_entries=10, ttl=60)
+    assert cache.get("p1") is None
+    cache.set("p1", 7)
+    assert cache.get("p1") == 7
+
+    stats = cache.describe()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_oldest_key_is_evicted():
+    cache = IdLookupCache(max_entries=2, ttl=60)
+    cache.set(("p1", "repo"), 1)
+    cache.set(("p2", "repo"), 2)
+    cache.get(("p1", "repo"))
+    cache.set(("p3", "repo"), 3)
+
+    assert cache.get(("p2", "repo")) is None
+    assert cache.get_many([("p1", "repo"), ("p2", "repo"), ("p3", "repo")]) == {("p1", "repo"): 1, ("p3", "repo"): 3}
+    assert cache.evictions == 1
+
+
+def test_entries_expire(monkeypatch):
+    now = [50.0]
+    monkeypatch.setattr("mcp_servers.postgresql.lookup_cache.time.monotonic", lambda: now[0])
+    cache = IdLookupCache(max_entries=10, ttl=5)
+    cache.set("p1", 1)
+
+    now[0] += 6
+    assert cache.get("p1") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_and_set_many():
+    cache = IdLookupCache(max_entries=10, ttl=60)
+    cache.set_many({"p1": 1, "p2": 2})
+    assert cache.invalidate("p1") is True
+    assert cache.invalidate("p1") is False
+    assert cache.get_many(["p1", "p2"]) == {"p2": 2}
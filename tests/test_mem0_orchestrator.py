@@ -0,0 +1,177 @@
+"""
+Tests for Mem0 orchestrator search paths, run against stand-in Memory objects
+"""
+
+import asyncio
+
+import pytest
+
+from mcp_servers.mem0.mem0_orchestrator import Mem0OrchestratorMCPServer, MemoryContext
+from mcp_servers.mem0.session_store import SessionStore
+
+
+class StubEmbedder:
+    """Bag-of-words embedding over a fixed vocabulary, recording what it embedded"""
+
+    VOCABULARY = ["token", "refresh", "refreshing", "tokens", "deploy", "rollback"]
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, text, memory_action=None):
+        self.embedded.append((text, memory_action))
+        words = text.split()
+        return [float(words.count(word)) for word in self.VOCABULARY]
+
+
+class StubMemory:
+    """Answers search with fixed results and counts calls"""
+
+    def __init__(self, results):
+        self.results = results
+        self.searches = 0
+        self.embedding_model = StubEmbedder()
+
+    def search(self, query, user_id=None, limit=10):
+        self.searches += 1
+        return self.results[:limit]
+
+
+def hit(memory_id, score):
+    return {"id": memory_id, "text": memory_id, "score": score, "metadata": {}}
+
+
+@pytest.fixture
+def server():
+    server = Mem0OrchestratorMCPServer()
+    yield server
+    for executor in server.executors.values():
+        executor.shutdown()
+
+
+def test_rrf_rewards_results_ranked_in_both_lists(server):
+    coding = [{"id": "a", "context": "coding", "score": 0.9}, {"id": "b", "context": "coding", "score": 0.8}]
+    business = [{"id": "c", "context": "business", "score": 0.99}]
+    shared = {"id": "b", "context": "coding", "score": 0.8}
+
+    fused = server._fuse_ranked([coding, business + [shared]], limit=10)
+    assert [r["id"] for r in fused] == ["b", "c", "a"]
+    assert fused[0]["fused_score"] == pytest.approx(1 / 62 + 1 / 62)
+
+
+def test_rrf_ties_go_to_higher_raw_score(server):
+    coding = [{"id": "a", "context": "coding", "score": 0.2}]
+    business = [{"id": "a", "context": "business", "score": 0.7}]
+
+    fused = server._fuse_ranked([coding, business], limit=1)
+    assert [(r["id"], r["context"]) for r in fused] == [("a", "business")]
+
+
+async def test_hybrid_search_merges_both_contexts(server):
+    server.coding_memory = StubMemory([hit("c1", 0.9), hit("c2", 0.5)])
+    server.business_memory = StubMemory([hit("b1", 0.8), hit("b2", 0.4)])
+
+    results = await server.search_memories("renewals", MemoryContext.HYBRID, limit=3)
+    assert [(r["context"], r["id"]) for r in results] == [("coding", "c1"), ("business", "b1"), ("coding", "c2")]
+    assert server.hybrid_stats["searches"] == 1
+
+
+async def test_cached_search_skips_memory_until_a_write(server):
+    memory = StubMemory([hit("c1", 0.9)])
+    server.coding_memory = memory
+    server.semantic_caches[MemoryContext.CODING].configure(enabled=True)
+
+    for query in ("Token refresh", "token refresh?"):
+        results = await server.search_memories(query, MemoryContext.CODING, user_id="u1")
+        assert [r["id"] for r in results] == ["c1"]
+    assert memory.searches == 1
+
+    server._memory_written(MemoryContext.CODING, "u1")
+    await server.search_memories("token refresh", MemoryContext.CODING, user_id="u1")
+    assert memory.searches == 2
+
+
+async def test_similar_query_hits_through_the_embedding_model(server):
+    memory = StubMemory([hit("c1", 0.9)])
+    server.coding_memory = memory
+    server.semantic_caches[MemoryContext.CODING].configure(enabled=True)
+
+    await server.search_memories("Token refresh", MemoryContext.CODING, user_id="u1")
+    results = await server.search_memories("refresh token!", MemoryContext.CODING, user_id="u1")
+    assert [r["id"] for r in results] == ["c1"]
+    assert memory.searches == 1
+    assert memory.embedding_model.embedded == [("token refresh", "search"), ("refresh token", "search")]
+    assert server.executors[MemoryContext.CODING].describe()["read"]["completed"] == 3
+
+    # An exact repeat never reaches the embedding model
+    await server.search_memories("token refresh", MemoryContext.CODING, user_id="u1")
+    assert len(memory.embedding_model.embedded) == 2
+
+    await server.search_memories("deploy rollback", MemoryContext.CODING, user_id="u1")
+    assert memory.searches == 2
+
+    stats = (await server.get_stats())["semantic_cache"]["coding"]
+    assert (stats["exact_hits"], stats["similar_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["last_hit_similarity"] == pytest.approx(1.0)
+    assert stats["threshold"] == 0.97
+
+
+async def test_semantic_cache_threshold_is_per_context(monkeypatch):
+    monkeypatch.setenv("mem0_business_semantic_cache_threshold", "0.99")
+    server = Mem0OrchestratorMCPServer()
+    try:
+        assert server.semantic_caches[MemoryContext.BUSINESS].threshold == 0.99
+        assert server.semantic_caches[MemoryContext.CODING].threshold == 0.97
+
+        tuned = await server.handle_call_tool("tune_semantic_cache", {"context": "coding", "threshold": 0.9})
+        assert tuned["threshold"] == 0.9
+        assert "error" in await server.tune_semantic_cache(MemoryContext.CODING, threshold=2.0)
+    finally:
+        for executor in server.executors.values():
+            executor.shutdown()
+
+
+async def test_write_behind_listeners_run_once_the_add_lands(server, tmp_path):
+    added, calls = [], []
+    written = asyncio.Event()
+
+    class WritableMemory(StubMemory):
+        def add(self, content, user_id=None, metadata=None):
+            added.append(content)
+            return {"id": "mem-1"}
+
+    async def listener(context, user_id):
+        calls.append((added[:], context, user_id))
+        written.set()
+
+    server.coding_memory = WritableMemory([])
+    server.write_behind_path = str(tmp_path / "write_behind.db")
+    server.write_behind_workers = 1
+    server.add_write_behind_listener(listener)
+    server._start_write_behind()
+    try:
+        result = await server.add_memory("use token refresh", MemoryContext.CODING, "u1")
+        assert result["status"] == "queued"
+        await asyncio.wait_for(written.wait(), 5)
+        assert calls == [(["use token refresh"], MemoryContext.CODING, "u1")]
+    finally:
+        await server.stop_write_behind()
+
+
+async def test_close_flushes_sessions_and_releases_executors(tmp_path):
+    server = Mem0OrchestratorMCPServer()
+    server.session_store_path = str(tmp_path / "sessions.db")
+    await server._load_sessions()
+    server.coding_memory = StubMemory([hit("c1", 0.9)])
+    session_id = await server.create_session("u1", MemoryContext.CODING)
+    await server.search_memories("token refresh", MemoryContext.CODING, user_id="u1")
+
+    await server.close()
+
+    assert server.session_store is None
+    reopened = SessionStore(server.session_store_path)
+    rows = reopened.load_all()
+    reopened.close()
+    assert [(r["session_id"], r["memories_recalled"]) for r in rows] == [(session_id, 1)]
+    with pytest.raises(RuntimeError):
+        await server.executors[MemoryContext.CODING].run("read", "search", lambda: None)
@@ -0,0 +1,67 @@
+"""
+Tests for adaptive connection pool sizing
+"""
+
+from backend.core.pool_sizing import AdaptivePoolSizer
+
+
+def make_sizer(**kwargs) -> AdaptivePoolSizer:
+    options = {"min_size": 2, "max_size": 20, "initial": 8, "interval": 10.0, "min_samples": 5}
+    options.update(kwargs)
+    sizer = AdaptivePoolSizer(**options)
+    sizer._window_start = 0.0
+    return sizer
+
+
+def test_resizes_only_once_interval_elapsed():
+    sizer = make_sizer()
+    sizer.record_timeout()
+    assert sizer.maybe_resize(now=5.0) is None
+    assert sizer.maybe_resize(now=10.0) == 10
+
+
+def test_grows_on_slow_acquires():
+    sizer = make_sizer()
+    for _ in range(10):
+        sizer.record_acquire(wait_ms=120.0, in_use=8)
+
+    assert sizer.maybe_resize(now=10.0) == 10
+    assert sizer.grows == 1
+    assert sizer.last_p95_ms == 120.0
+
+
+def test_too_few_slow_samples_do_not_grow():
+    sizer = make_sizer()
+    for _ in range(3):
+        sizer.record_acquire(wait_ms=120.0, in_use=8)
+
+    assert sizer.maybe_resize(now=10.0) is None
+    assert sizer.limit == 8
+
+
+def test_shrinks_when_idle_but_not_below_peak_or_minimum():
+    sizer = make_sizer()
+    for _ in range(10):
+        sizer.record_acquire(wait_ms=1.0, in_use=1)
+    assert sizer.maybe_resize(now=10.0) == 6
+    assert sizer.shrinks == 1
+
+    for window in range(2, 20):
+        sizer.record_acquire(wait_ms=1.0, in_use=0)
+        sizer.maybe_resize(now=10.0 * window)
+    assert sizer.limit == 2
+
+
+def test_busy_pool_does_not_shrink():
+    sizer = make_sizer()
+    for _ in range(10):
+        sizer.record_acquire(wait_ms=1.0, in_use=6)
+    assert sizer.maybe_resize(now=10.0) is None
+
+
+def test_growth_is_capped_at_max_size():
+    sizer = make_sizer(initial=19)
+    sizer.record_timeout()
+    assert sizer.maybe_resize(now=10.0) == 20
+    sizer.record_timeout()
+    assert sizer.maybe_resize(now=20.0) is None
@@ -0,0 +1,45 @@
+"""
+Tests for PostgreSQL query latency windows
+"""
+
+from datetime import datetime
+
+from mcp_servers.postgresql.query_metrics import LatencyWindow, params_shape, percentiles
+
+
+def test_nearest_rank_percentiles():
+    values = [float(v) for v in range(1, 101)]
+    assert percentiles(values, (50, 95, 99, 100)) == [50.0, 95.0, 99.0, 100.0]
+    assert percentiles([], (50,)) == [0.0]
+
+
+def test_window_keeps_recent_samples_and_lifetime_totals():
+    window = LatencyWindow(size=4)
+    for ms in (100.0, 1.0, 2.0, 3.0, 4.0):
+        window.record(ms)
+
+    stats = window.describe()
+    assert list(window.samples) == [1.0, 2.0, 3.0, 4.0]
+    assert stats["count"] == 5
+    assert stats["avg_ms"] == 22.0
+    assert stats["max_ms"] == 100.0
+    assert stats["p50_ms"] == 2.0
+    assert stats["p99_ms"] == 4.0
+    assert window.percentile(95) == 4.0
+
+
+def test_merge_folds_samples_and_totals():
+    a, b = LatencyWindow(), LatencyWindow()
+    a.record(1.0)
+    b.record(9.0)
+    b.record(5.0)
+    a.merge(b)
+
+    assert a.count == 3
+    assert a.max_ms == 9.0
+    assert sorted(a.samples) == [1.0, 5.0, 9.0]
+
+
+def test_params_shape_never_includes_values():
+    shape = params_shape([None, [1, 2], "secret", b"xy", datetime(2024, 1, 1), 5])
+    assert shape == ["null", "list[2]", "str(6)", "bytes(2)", "datetime", "int"]
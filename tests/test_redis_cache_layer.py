@@ -0,0 +1,291 @@
+"""
+Tests for RedisCacheMCPServer against an in-process fakeredis server
+"""
+
+import asyncio
+import pickle
+import time
+
+import pytest
+
+from mcp_servers.redis.redis_cache_layer import (
+    RELEASE_LOCK_SCRIPT,
+    SCRIPT_SHAS,
+    CacheType,
+    ComputeSource,
+    RedisCacheMCPServer
+)
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+async def attached_server(fake_server) -> RedisCacheMCPServer:
+    cache = RedisCacheMCPServer()
+    await cache.attach_clients({
+        cache_type: fakeredis.aioredis.FakeRedis(server=fake_server, db=config["db"])
+        for cache_type, config in cache.cache_configs.items()
+    })
+    return cache
+
+
+@pytest.fixture
+def fake_server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+async def cache(fake_server):
+    cache = await attached_server(fake_server)
+    yield cache
+    await cache.close()
+
+
+def raw(cache: RedisCacheMCPServer, cache_type: CacheType = CacheType.CODING):
+    return cache.async_clients[cache_type]
+
+
+async def test_set_and_get_round_trip(cache):
+    assert await cache.set(CacheType.CODING, "file:a.py", {"symbols": ["main"]})
+    assert await cache.get(CacheType.CODING, "file:a.py") == {"symbols": ["main"]}
+    assert await cache.get(CacheType.CODING, "file:missing.py") is None
+    assert (cache.stats[CacheType.CODING].hits, cache.stats[CacheType.CODING].misses) == (1, 1)
+
+
+async def test_set_many_writes_one_pipeline_per_chunk(cache, monkeypatch):
+    pipelines = []
+    execute = cache._execute_with_invalidation
+
+    async def counting(cache_type, commands, *args, **kwargs):
+        pipelines.append(len([c for c in commands if c[0] == "setex"]))
+        return await execute(cache_type, commands, *args, **kwargs)
+
+    monkeypatch.setattr(cache, "_execute_with_invalidation", counting)
+    items = {f"k{i}": {"i": i} for i in range(5)}
+    assert await cache.set_many(CacheType.CODING, items, chunk_size=2)
+
+    assert pipelines == [2, 2, 1]
+    assert await cache.get_many(CacheType.CODING, list(items)) == items
+
+
+async def test_set_many_applies_per_key_ttls_with_jitter(cache):
+    jitter = cache.cache_configs[CacheType.CODING]["ttl_jitter"]
+    await cache.set_many(CacheType.CODING, {"short": 1, "long": 2}, ttl=1000, ttls={"short": 100})
+
+    short_ttl = await raw(cache).ttl("coding:short")
+    long_ttl = await raw(cache).ttl("coding:long")
+    assert 100 * (1 - jitter) - 1 <= short_ttl <= 100
+    assert 1000 * (1 - jitter) - 1 <= long_ttl <= 1000
+
+
+async def test_tag_sets_outlive_their_members(cache):
+    await cache.set_many(CacheType.CODING, {"a": 1}, ttl=10, tags=["repo:x"])
+    assert await raw(cache).ttl("coding:tag:repo:x") >= cache.cache_configs[CacheType.CODING]["ttl"] - 1
+
+
+async def test_invalidate_tags_removes_only_tagged_keys(cache):
+    await cache.set_many(CacheType.CODING, {"a": 1, "b": 2}, tags=["repo:x"])
+    await cache.set(CacheType.CODING, "c", 3, tags=["repo:y"])
+    await cache.set(CacheType.CODING, "d", 4)
+
+    assert await cache.invalidate_tags(CacheType.CODING, ["repo:x", "repo:unknown"]) == 2
+    assert await cache.get_many(CacheType.CODING, ["a", "b", "c", "d"]) == {"c": 3, "d": 4}
+    assert not await raw(cache).exists("coding:tag:repo:x")
+
+
+async def test_invalidate_tags_credits_the_budget(cache):
+    _, sizes_key, bytes_key, _ = cache._budget_keys(CacheType.CODING)
+    await cache.set(CacheType.CODING, "kept", "x" * 100)
+    kept_bytes = int(await raw(cache).get(bytes_key))
+
+    await cache.set_many(CacheType.CODING, {"a": "x" * 100, "b": "y" * 100}, tags=["t"])
+    await cache.invalidate_tags(CacheType.CODING, ["t"])
+
+    assert int(await raw(cache).get(bytes_key)) == kept_bytes
+    assert await raw(cache).hkeys(sizes_key) == [b"coding:kept"]
+
+
+async def test_writes_are_accounted_in_the_same_round_trip(cache, monkeypatch):
+    round_trips = []
+    execute, execute_pipeline = cache._execute, cache._execute_pipeline
+
+    async def counting_execute(cache_type, command, *args, **kwargs):
+        round_trips.append(command)
+        return await execute(cache_type, command, *args, **kwargs)
+
+    async def counting_pipeline(cache_type, commands, *args, **kwargs):
+        round_trips.append([command for command, _ in commands])
+        return await execute_pipeline(cache_type, commands, *args, **kwargs)
+
+    monkeypatch.setattr(cache, "_execute", counting_execute)
+    monkeypatch.setattr(cache, "_execute_pipeline", counting_pipeline)
+    await cache.set(CacheType.CODING, "a", 1)
+    await cache.set_many(CacheType.CODING, {"b": 2, "c": 3})
+
+    assert round_trips == [["setex", "evalsha"], ["setex", "setex", "evalsha"]]
+
+
+async def test_scripts_fall_back_to_eval_after_a_script_flush(cache):
+    _, sizes_key, bytes_key, _ = cache._budget_keys(CacheType.CODING)
+    await cache.set(CacheType.CODING, "kept", "x" * 100)
+    kept_bytes = int(await raw(cache).get(bytes_key))
+
+    # A restarted or failed-over server has an empty script cache
+    await raw(cache).script_flush()
+    await cache.set_many(CacheType.CODING, {"a": "x" * 100, "b": "y" * 100}, tags=["t"])
+    assert await raw(cache).hlen(sizes_key) == 3
+
+    await raw(cache).script_flush()
+    await cache.invalidate_tags(CacheType.CODING, ["t"])
+    assert int(await raw(cache).get(bytes_key)) == kept_bytes
+
+    async def producer():
+        return {"total": 1}
+
+    await raw(cache).script_flush()
+    assert await cache.get_or_compute(CacheType.AGGREGATION, "dashboard", producer) == {"total": 1}
+    assert not await raw(cache, CacheType.AGGREGATION).exists("aggregation:lock:dashboard")
+    assert await raw(cache).script_exists(SCRIPT_SHAS[RELEASE_LOCK_SCRIPT]) == [True]
+
+
+async def test_expired_keys_are_credited_on_the_next_write(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("mcp_servers.redis.redis_cache_layer.time.time", lambda: now[0])
+    _, sizes_key, bytes_key, expiry_key = cache._budget_keys(CacheType.CODING)
+
+    await cache.set(CacheType.CODING, "fresh", "y" * 100, ttl=600)
+    fresh_bytes = int(await raw(cache).get(bytes_key))
+    await cache.set(CacheType.CODING, "short", "x" * 100, ttl=10)
+    now[0] += 20  # "short" has expired in Redis by now
+    await cache.set(CacheType.CODING, "fresh", "y" * 100, ttl=600)
+
+    assert int(await raw(cache).get(bytes_key)) == fresh_bytes
+    assert await raw(cache).hkeys(sizes_key) == [b"coding:fresh"]
+    assert await raw(cache).zrange(expiry_key, 0, -1) == [b"coding:fresh"]
+
+
+async def test_get_or_compute_runs_one_producer_for_concurrent_misses(cache):
+    calls = []
+
+    async def producer():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"total": 42}
+
+    results = await asyncio.gather(*(
+        cache.get_or_compute(CacheType.AGGREGATION, "dashboard", producer, ttl=60) for _ in range(10)
+    ))
+    assert results == [{"total": 42}] * 10
+    assert len(calls) == 1
+
+    assert await cache.get_or_compute(CacheType.AGGREGATION, "dashboard", producer, ttl=60) == {"total": 42}
+    assert await cache.get(CacheType.AGGREGATION, "dashboard") == {"total": 42}
+    assert len(calls) == 1
+
+
+async def test_get_or_compute_waits_for_another_workers_lock(fake_server, cache):
+    other = await attached_server(fake_server)
+    lock_key = "aggregation:lock:dashboard"
+    await raw(cache, CacheType.AGGREGATION).set(lock_key, "other-worker", px=5000)
+
+    async def never_called():
+        raise AssertionError("the lock holder computes the value")
+
+    waiter = asyncio.create_task(
+        cache.get_or_compute_with_source(CacheType.AGGREGATION, "dashboard", never_called, ttl=60)
+    )
+    await asyncio.sleep(0.2)
+    assert not waiter.done()
+    assert cache.stats[CacheType.AGGREGATION].misses == 1  # the initial lookup, not the polls
+
+    # The holder writes its value, then releases the lock
+    await other.set(CacheType.AGGREGATION, "dashboard", {"total": 7}, 60)
+    await raw(cache, CacheType.AGGREGATION).delete(lock_key)
+    assert await asyncio.wait_for(waiter, 2) == ({"total": 7}, ComputeSource.COALESCED)
+    assert cache.stats[CacheType.AGGREGATION].hits == 1
+    await other.close()
+
+
+async def test_get_or_compute_reports_how_values_were_obtained(cache, monkeypatch):
+    async def producer():
+        await asyncio.sleep(0.05)
+        return {"total": 42}
+
+    results = await asyncio.gather(*(
+        cache.get_or_compute_with_source(CacheType.AGGREGATION, "dashboard", producer, ttl=60) for _ in range(5)
+    ))
+    sources = [source for _, source in results]
+    assert sorted(source.value for source in sources) == ["coalesced"] * 4 + ["computed"]
+
+    now = [time.time()]
+    monkeypatch.setattr("mcp_servers.redis.redis_cache_layer.time.time", lambda: now[0])
+    assert await cache.get_or_compute_with_source(
+        CacheType.AGGREGATION, "dashboard", producer, ttl=60, early_refresh_beta=0
+    ) == ({"total": 42}, ComputeSource.HIT)
+
+    now[0] += 61
+    await cache.set(CacheType.AGGREGATION, "dashboard", {"__swr__": 1, "value": {"total": 1}, "expires_at": now[0] - 1}, 60)
+    assert await cache.get_or_compute_with_source(
+        CacheType.AGGREGATION, "dashboard", producer, ttl=60, stale_ttl=60
+    ) == ({"total": 1}, ComputeSource.STALE)
+    await asyncio.gather(*cache._refresh_tasks)
+
+
+async def test_get_or_compute_computes_once_lock_is_released(cache):
+    lock_key = "aggregation:lock:dashboard"
+    await raw(cache, CacheType.AGGREGATION).set(lock_key, "crashed-worker", px=5000)
+
+    async def producer():
+        return {"total": 1}
+
+    waiter = asyncio.create_task(cache.get_or_compute(CacheType.AGGREGATION, "dashboard", producer, ttl=60))
+    await asyncio.sleep(0.1)
+    await raw(cache, CacheType.AGGREGATION).delete(lock_key)
+    assert await asyncio.wait_for(waiter, 2) == {"total": 1}
+
+
+async def test_stale_values_are_served_while_refreshing(cache, monkeypatch):
+    values = iter([{"v": 1}, {"v": 2}])
+
+    async def producer():
+        return next(values)
+
+    now = [1000.0]
+    monkeypatch.setattr("mcp_servers.redis.redis_cache_layer.time.time", lambda: now[0])
+    await cache.get_or_compute(CacheType.AGGREGATION, "k", producer, ttl=10, stale_ttl=60, early_refresh_beta=0)
+
+    now[0] += 20
+    assert await cache.get_or_compute(
+        CacheType.AGGREGATION, "k", producer, ttl=10, stale_ttl=60, early_refresh_beta=0
+    ) == {"v": 1}
+    await asyncio.gather(*cache._refresh_tasks)
+    assert await cache.get(CacheType.AGGREGATION, "k") == {"v": 2}
+
+
+async def test_stats_fall_back_quietly_without_info(cache, capsys):
+    await cache.set_many(CacheType.CODING, {"a": 1, "b": 2})
+    stats = await cache.get_stats(CacheType.CODING)
+
+    assert "Error reading Redis stats" not in capsys.readouterr().out
+    assert stats["keys_count"] == await raw(cache).dbsize()
+    assert stats["sets"] == 2
+
+
+async def test_legacy_pickles_read_as_misses_unless_enabled(cache, monkeypatch):
+    await raw(cache).set("coding:old", pickle.dumps({"v": 1}))
+    await cache.set(CacheType.CODING, "new", {"v": 2})
+    assert await cache.get_many(CacheType.CODING, ["old", "new"]) == {"old": None, "new": {"v": 2}}
+
+    monkeypatch.setenv("redis_cache_legacy_pickle", "true")
+    rollout = RedisCacheMCPServer()
+    await rollout.attach_clients(dict(cache.async_clients))
+    assert await rollout.get(CacheType.CODING, "old") == {"v": 1}
+
+
+async def test_invalidate_pattern_also_removes_untagged_aggregation_keys(cache):
+    agg = raw(cache, CacheType.AGGREGATION)
+    await cache.cache_aggregation("dashboard", "p1", {"total": 1})
+    await agg.set("aggregation:agg:dashboard:p1", b"old format")
+    await agg.set("aggregation:agg:dashboard:p2", b"other project")
+
+    assert await cache.invalidate_pattern(CacheType.AGGREGATION, "agg:dashboard:{p1}") == 2
+    assert await agg.keys("aggregation:agg:*") == [b"aggregation:agg:dashboard:p2"]
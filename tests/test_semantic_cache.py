@@ -0,0 +1,189 @@
+"""
+Tests for the Mem0 semantic search result cache
+"""
+
+import numpy as np
+import pytest
+
+from mcp_servers.mem0.semantic_cache import SemanticCache, VectorIndex, normalize_query
+
+RESULTS = [{"id": "m1", "content": "Q4 revenue was up"}, {"id": "m2", "content": "Q4 pipeline"}]
+
+
+def cached_search(cache: SemanticCache, query: str, user_id, limit: int = 10, results=RESULTS, vector=None):
+    token = cache.version_token(user_id)
+    cache.store(query, user_id, limit, results, token, vector)
+
+
+def rotated(vector: np.ndarray, cosine: float, seed: int = 1) -> np.ndarray:
+    """A unit vector at the given cosine similarity to vector"""
+    unit = vector / np.linalg.norm(vector)
+    other = np.random.default_rng(seed).standard_normal(unit.shape[0])
+    other -= (other @ unit) * unit
+    other /= np.linalg.norm(other)
+    return cosine * unit + np.sqrt(1 - cosine ** 2) * other
+
+
+BASE = np.random.default_rng(0).standard_normal(256)
+
+
+def test_normalization_folds_case_punctuation_and_spacing():
+    assert normalize_query("  Q4   Revenue?! ") == "q4 revenue"
+    assert normalize_query("Ｑ４ revenue") == "q4 revenue"
+
+
+def test_normalized_repeat_is_a_hit():
+    cache = SemanticCache("coding")
+    cached_search(cache, "Q4 revenue", "u1")
+
+    assert cache.lookup("q4 revenue?", "u1", 10) == RESULTS
+    assert cache.lookup("Q4 revenue", "u1", 1) == RESULTS[:1]
+    assert cache.describe()["hits"] == 2
+
+
+def test_entries_are_per_user_and_per_limit():
+    cache = SemanticCache("coding")
+    cached_search(cache, "Q4 revenue", "u1", limit=5)
+
+    assert cache.lookup("Q4 revenue", "u2", 5) is None
+    assert cache.lookup("Q4 revenue", None, 5) is None
+    assert cache.lookup("Q4 revenue", "u1", 10) is None
+
+
+def test_user_write_invalidates_that_users_searches_only():
+    cache = SemanticCache("coding")
+    cached_search(cache, "Q4 revenue", "u1")
+    cached_search(cache, "Q4 revenue", "u2")
+
+    cache.record_write("u1")
+    assert cache.lookup("Q4 revenue", "u1", 10) is None
+    assert cache.lookup("Q4 revenue", "u2", 10) == RESULTS
+
+
+def test_any_write_invalidates_unscoped_searches():
+    cache = SemanticCache("coding")
+    cached_search(cache, "Q4 revenue", None)
+
+    cache.record_write("u9")
+    assert cache.lookup("Q4 revenue", None, 10) is None
+
+
+def test_search_racing_a_write_is_not_cached():
+    cache = SemanticCache("coding")
+    token = cache.version_token("u1")
+    cache.record_write("u1")  # lands while the search is running
+    cache.store("Q4 revenue", "u1", 10, RESULTS, token)
+
+    assert cache.lookup("Q4 revenue", "u1", 10) is None
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("mcp_servers.mem0.semantic_cache.time.time", lambda: now[0])
+    cache = SemanticCache("coding", ttl=60)
+    cached_search(cache, "Q4 revenue", "u1")
+
+    now[0] += 61
+    assert cache.lookup("Q4 revenue", "u1", 10) is None
+
+
+def test_disabled_cache_never_stores_or_hits():
+    cache = SemanticCache("coding")
+    cache.configure(enabled=False)
+    cached_search(cache, "Q4 revenue", "u1")
+    cache.configure(enabled=True)
+
+    assert cache.lookup("Q4 revenue", "u1", 10) is None
+
+
+def test_similar_query_embedding_is_a_hit():
+    cache = SemanticCache("coding", threshold=0.95)
+    cached_search(cache, "Q4 revenue", "u1", vector=BASE)
+
+    assert cache.lookup("revenue in Q4", "u1", 10) is None
+    assert cache.lookup_similar(rotated(BASE, 0.98), "u1", 10) == RESULTS
+    stats = cache.describe()
+    assert stats["similar_hits"] == 1 and stats["misses"] == 0
+    assert stats["last_hit_similarity"] == pytest.approx(0.98, abs=1e-4)
+    assert stats["threshold"] == 0.95
+
+
+def test_embeddings_below_the_threshold_miss():
+    cache = SemanticCache("coding")
+    cached_search(cache, "Q4 revenue", "u1", vector=BASE)
+
+    assert cache.describe()["threshold"] == 0.97
+    assert cache.lookup_similar(rotated(BASE, 0.95), "u1", 10) is None
+    cache.configure(threshold=0.9)
+    assert cache.lookup_similar(rotated(BASE, 0.95), "u1", 10) == RESULTS
+    assert cache.describe()["misses"] == 1
+
+    with pytest.raises(ValueError):
+        cache.configure(threshold=1.5)
+
+
+def test_similar_entries_respect_user_limit_and_writes():
+    cache = SemanticCache("coding")
+    cached_search(cache, "Q4 revenue", "u1", limit=5, vector=BASE)
+    near = rotated(BASE, 0.99)
+
+    assert cache.lookup_similar(near, "u2", 5) is None
+    assert cache.lookup_similar(near, "u1", 10) is None
+    cache.record_write("u1")
+    assert cache.lookup_similar(near, "u1", 5) is None
+    assert cache.lookup_similar(None, "u1", 5) is None
+    assert cache.describe()["misses"] == 4
+
+
+def test_most_similar_entry_wins():
+    cache = SemanticCache("coding", threshold=0.9)
+    cached_search(cache, "far", "u1", results=[{"id": "far"}], vector=rotated(BASE, 0.92, seed=2))
+    cached_search(cache, "near", "u1", results=[{"id": "near"}], vector=rotated(BASE, 0.99, seed=3))
+
+    assert cache.lookup_similar(BASE, "u1", 10) == [{"id": "near"}]
+
+
+def test_vector_index_finds_close_neighbours_among_many():
+    rng = np.random.default_rng(7)
+    index = VectorIndex(capacity=1000)
+    vectors = [VectorIndex.unit(rng.standard_normal(256)) for _ in range(1000)]
+    for slot, vector in enumerate(vectors):
+        index.add(slot, vector)
+
+    found = sum(
+        index.search(VectorIndex.unit(rotated(vectors[slot], 0.98, seed=slot)), 0.97)[:1] != []
+        for slot in range(0, 1000, 10)
+    )
+    assert found >= 95
+    index.remove(0)
+    assert all(slot != 0 for _, slot in index.search(vectors[0], 0.5))
+
+
+@pytest.mark.parametrize("cached, asked", [
+    ("Q4 2023 revenue", "Q4 2024 revenue"),
+    ("which customers did renew", "which customers did not renew"),
+    ("status of ticket 1234", "status of ticket 1235"),
+    ("EMEA pipeline", "APAC pipeline"),
+    ("deals owned by alice", "deals owned by bob"),
+    ("alice paid bob", "bob paid alice"),
+])
+def test_exact_lookup_never_matches_different_text(cached, asked):
+    cache = SemanticCache("business")
+    cached_search(cache, cached, "u1")
+
+    assert cache.lookup(asked, "u1", 10) is None
+    assert cache.lookup(cached, "u1", 10) == RESULTS
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticCache("coding", capacity=2)
+    cached_search(cache, "first", "u1", vector=rotated(BASE, 0.0, seed=1))
+    cached_search(cache, "second", "u1", vector=BASE)
+    cache.lookup("first", "u1", 10)
+    cached_search(cache, "third", "u1", vector=rotated(BASE, 0.0, seed=2))
+
+    assert cache.lookup("second", "u1", 10) is None
+    assert cache.lookup_similar(BASE, "u1", 10) is None
+    assert cache.lookup("first", "u1", 10) == RESULTS
+    assert cache.describe()["entries"] == 2
+    assert cache.describe()["indexed"] == 2
@@ -0,0 +1,51 @@
+"""
+Tests for Mem0 session persistence
+"""
+
+from mcp_servers.mem0.session_store import SessionStore
+
+
+def session(session_id: str, started_at: str, **overrides):
+    row = {
+        "session_id": session_id,
+        "context": "coding",
+        "user_id": "u1",
+        "started_at": started_at,
+        "memories_added": 0,
+        "memories_recalled": 0,
+        "metadata": {"ide": "vscode"}
+    }
+    row.update(overrides)
+    return row
+
+
+def test_sessions_survive_reopening(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path)
+    store.save_many([
+        session("s2", "2024-01-02T00:00:00"),
+        session("s1", "2024-01-01T00:00:00", context="business", memories_added=3)
+    ])
+    store.close()
+
+    reopened = SessionStore(path)
+    loaded = reopened.load_all()
+    reopened.close()
+
+    assert [s["session_id"] for s in loaded] == ["s1", "s2"]
+    assert loaded[0]["context"] == "business"
+    assert loaded[0]["memories_added"] == 3
+    assert loaded[0]["metadata"] == {"ide": "vscode"}
+
+
+def test_save_replaces_and_delete_removes(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    store.save_many([session("s1", "2024-01-01T00:00:00"), session("s2", "2024-01-02T00:00:00")])
+    store.save_many([session("s1", "2024-01-01T00:00:00", memories_recalled=9)])
+    store.delete_many(["s2", "missing"])
+    store.save_many([])
+    store.delete_many([])
+
+    loaded = store.load_all()
+    store.close()
+    assert [(s["session_id"], s["memories_recalled"]) for s in loaded] == [("s1", 9)]
@@ -0,0 +1,119 @@
+"""
+Tests for the Mem0 write-behind queue
+"""
+
+import pytest
+
+from mcp_servers.mem0.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "write_behind.db")
+
+
+@pytest.fixture
+def queue(queue_path):
+    queue = WriteBehindQueue(queue_path, max_attempts=3, retry_base_delay=0.0)
+    yield queue
+    queue.close()
+
+
+def test_claim_returns_due_entries_oldest_first(queue):
+    first = queue.enqueue("coding", "u1", "first", {"file": "a.py"})
+    second = queue.enqueue("coding", "u1", "second")
+
+    claimed = queue.claim_batch(10)
+    assert [entry["id"] for entry in claimed] == [first["id"], second["id"]]
+    assert claimed[0]["metadata"] == {"file": "a.py"}
+    assert queue.status(first["id"])["status"] == "processing"
+    assert queue.claim_batch(10) == []
+
+
+def test_claim_respects_batch_limit(queue):
+    for i in range(5):
+        queue.enqueue("coding", "u1", f"memory {i}")
+    assert len(queue.claim_batch(2)) == 2
+    assert len(queue.claim_batch(10)) == 3
+
+
+def test_completed_entries_record_memory_id(queue):
+    entry = queue.enqueue("business", "u1", "renewal risk")
+    queue.claim_batch(1)
+    queue.finish_batch({entry["id"]: "mem-1"}, {})
+
+    status = queue.status(entry["id"])
+    assert (status["status"], status["memory_id"], status["attempts"]) == ("done", "mem-1", 1)
+    assert queue.next_due_in() is None
+
+
+def test_failures_retry_until_max_attempts(queue):
+    entry = queue.enqueue("coding", "u1", "flaky")
+    for attempt in range(1, 3):
+        assert [e["id"] for e in queue.claim_batch(1)] == [entry["id"]]
+        queue.finish_batch({}, {entry["id"]: "timeout"})
+        status = queue.status(entry["id"])
+        assert (status["status"], status["attempts"]) == ("queued", attempt)
+
+    queue.claim_batch(1)
+    queue.finish_batch({}, {entry["id"]: "timeout"})
+    status = queue.status(entry["id"])
+    assert (status["status"], status["error"]) == ("failed", "timeout")
+    assert queue.claim_batch(1) == []
+
+
+def test_retry_backoff_delays_the_entry(queue_path):
+    queue = WriteBehindQueue(queue_path, retry_base_delay=60.0)
+    entry = queue.enqueue("coding", "u1", "later")
+    queue.claim_batch(1)
+    queue.finish_batch({}, {entry["id"]: "error"})
+
+    assert queue.claim_batch(1) == []
+    assert 55.0 < queue.next_due_in() <= 60.0
+    queue.close()
+
+
+def test_duplicate_enqueue_returns_pending_entry(queue):
+    first = queue.enqueue("coding", "u1", "same", {"a": 1})
+    again = queue.enqueue("coding", "u1", "same", {"a": 1})
+    other_user = queue.enqueue("coding", "u2", "same", {"a": 1})
+
+    assert again == {"id": first["id"], "status": "queued", "duplicate": True}
+    assert other_user["id"] != first["id"]
+
+
+def test_done_entries_do_not_absorb_a_new_add(queue):
+    first = queue.enqueue("coding", "u1", "same")
+    queue.claim_batch(1)
+    assert queue.enqueue("coding", "u1", "same")["duplicate"] is True  # still processing
+    queue.finish_batch({first["id"]: "mem-1"}, {})
+
+    again = queue.enqueue("coding", "u1", "same")
+    assert again["duplicate"] is False
+    assert again["id"] != first["id"]
+
+
+def test_processing_entries_are_requeued_on_open(queue_path):
+    queue = WriteBehindQueue(queue_path)
+    entry = queue.enqueue("coding", "u1", "in flight")
+    queue.claim_batch(1)
+    queue.close()
+
+    reopened = WriteBehindQueue(queue_path)
+    assert reopened.status(entry["id"])["status"] == "queued"
+    assert [e["id"] for e in reopened.claim_batch(1)] == [entry["id"]]
+    reopened.close()
+
+
+def test_prune_drops_only_old_done_entries(queue):
+    done = queue.enqueue("coding", "u1", "done")
+    failed = queue.enqueue("coding", "u1", "failed")
+    queue.claim_batch(2)
+    queue.finish_batch({done["id"]: "mem-1"}, {})
+    for _ in range(3):
+        queue.finish_batch({}, {failed["id"]: "boom"})
+
+    assert queue.prune(older_than_seconds=-1) == 1
+    assert queue.status(done["id"]) is None
+    assert queue.status(failed["id"])["status"] == "failed"
+    assert queue.describe()["depth"]["failed"] == 1